@@ -30,6 +30,12 @@ class Agent(ABC):
     def ConnectToServer(self, host, port):
         self.client.Connect(host, port)
 
+    def ConnectToServerInProcess(self, server):
+        self.client.ConnectInProcess(server) # Same messages as over TCP, but exchanged through in-process queues
+
+    def JoinLocalServer(self, localServer):
+        return localServer.Join(self.client) # Take a seat at an in-process server (no sockets involved)
+
     def DisconnectFromServer(self):
         self.client.Disconnect()
 
@@ -0,0 +1,97 @@
+import threading
+import traceback # For debugging
+import numpy as np
+from doppelkopf.models.DNN import DNN
+from doppelkopf.utils.Console import Console
+from doppelkopf.data.Experience import Experience
+
+# Runs the gradient updates of a DNNTrainerRL on a thread of its own, so that playing never waits for training.
+# For every experience stored, 'updatesPerStep' updates (of one batch each) are made. Cards are picked with a copy of the DNN (the policy network),
+# which is synced after every 'numOfBatches' updates, i.e. as often as DNNTrainerRL.Train() changes the weights when training after each game
+class BackgroundTrainer():
+    THREAD_NAME = "Thread_Background_Training"
+
+    def __init__(self, trainer, updatesPerStep: float):
+        if updatesPerStep <= 0:
+            raise ValueError("'updatesPerStep' was %f, but must be greater than zero!" % updatesPerStep)
+        self.name = "BackgroundTrainer"
+        self.trainer = trainer
+        self.updatesPerStep = updatesPerStep
+        self.policyModel = DNN("Policy Network", trainer.learningRate, trainer.denseLayerUnits)
+        self.lockPolicyModel = threading.Lock()
+        self.bufferChanged = threading.Condition() # Guards the trainer's buffer as well as the step and update counters
+        self.numOfSteps = 0 # Experiences stored since Start()
+        self.numOfUpdates = 0 # Batches trained since Start()
+        self.roundLoss = 0.0
+        self.stopFlag = False
+        self.thread = None
+
+    def Start(self):
+        if self.thread is not None:
+            return False
+        self.syncPolicyModel()
+        with self.bufferChanged:
+            self.stopFlag = False
+            self.numOfSteps = 0
+            self.numOfUpdates = 0
+        self.roundLoss = 0.0
+        self.thread = threading.Thread(target=self.train, name=BackgroundTrainer.THREAD_NAME, daemon=True)
+        self.thread.start()
+        Console.WriteSuccess("Started (%.2f updates per step)" % self.updatesPerStep, self.name)
+        return True
+
+    def Stop(self):
+        if self.thread is None:
+            return False
+        with self.bufferChanged:
+            self.stopFlag = True
+            self.bufferChanged.notify_all()
+        self.thread.join() # Finishes the current update first
+        self.thread = None
+        Console.WriteSuccess("Stopped after %d updates for %d steps" % (self.numOfUpdates, self.numOfSteps), self.name)
+        return True
+
+    def Store(self, experience: Experience):
+        with self.bufferChanged:
+            self.trainer.buffer.PutNext(experience)
+            self.numOfSteps += 1
+            self.bufferChanged.notify()
+
+    def Predict(self, state: np.ndarray) -> np.ndarray:
+        x = np.expand_dims(state, axis=0) # Make the state 2D by adding the 'batch' dimension
+        with self.lockPolicyModel:
+            return self.policyModel.QValuesNumpy(x).reshape(-1)
+
+    def PolicyWeights(self) -> list:
+        with self.lockPolicyModel:
+            return self.policyModel.get_weights()
+
+    def syncPolicyModel(self):
+        weights = self.trainer.model.get_weights() # Only the training thread changes these, so no lock is needed to read them
+        with self.lockPolicyModel:
+            self.policyModel.set_weights(weights)
+
+    def mayUpdate(self) -> bool:
+        return self.stopFlag or (self.trainer.buffer.IsFull() and self.numOfUpdates < self.updatesPerStep * self.numOfSteps)
+
+    def train(self):
+        trainer = self.trainer
+        try:
+            while True:
+                with self.bufferChanged:
+                    self.bufferChanged.wait_for(self.mayUpdate) # Sleep until there are enough new experiences
+                    if self.stopFlag:
+                        return
+                    indices, weights, batch = trainer.buffer.SampleWeightedBatch(trainer.batchSize) # Sample under the lock (the batch is a copy), but calculate the gradients without it
+                    self.numOfUpdates += 1
+                loss, tdErrors = trainer.TrainBatch(*batch, weights)
+                with self.bufferChanged:
+                    trainer.buffer.UpdatePriorities(indices, tdErrors) # Slots overwritten in the meantime get these priorities as well, which is harmless
+                self.roundLoss += loss
+                if self.numOfUpdates % trainer.numOfBatches == 0: # A full round, just like one call of DNNTrainerRL.Train()
+                    trainer.lastLoss = self.roundLoss / trainer.numOfBatches
+                    self.roundLoss = 0.0
+                    self.syncPolicyModel()
+                    trainer.completeTraining()
+        except:
+            Console.WriteError(traceback.format_exc(), self.name)
\ No newline at end of file
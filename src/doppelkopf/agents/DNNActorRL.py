@@ -0,0 +1,99 @@
+import queue
+import traceback # For debugging
+import tensorflow as tf
+from typing import List
+from doppelkopf.utils.Console import Console
+from doppelkopf.data.Experience import Experience
+from doppelkopf.game.LocalServer import LocalServer
+from doppelkopf.agents.DNNTrainerRL import DNNTrainerRL
+from doppelkopf.agents.RulebasedPlayer import RulebasedPlayer
+
+# A self-play worker of a SelfPlayPool. Plays exactly like a DNNTrainerRL, but instead of training, it sends the experiences of each game to the learner
+# and picks up the learner's newest weights in between games
+class DNNActorRL(DNNTrainerRL):
+    EXPERIENCES = 0 # Message kinds on the experience queue
+    FINISHED = 1
+
+    def __init__(self, workerIndex: int, experienceQueue, weightsQueue, stopEvent, *trainerArguments):
+        super(DNNActorRL, self).__init__(*trainerArguments) # Same arguments as the learner
+        self.workerIndex = workerIndex
+        self.experienceQueue = experienceQueue
+        self.weightsQueue = weightsQueue
+        self.stopEvent = stopEvent
+        self.experiences: List[Experience] = []
+
+    # # # # # # # # # # # # # # # Only the learner trains, so actors neither keep a buffer nor calculate targets # # # # # # # # # # # # # # #
+    def instantiateBuffer(self):
+        return None
+
+    def instantiateTargetNetwork(self):
+        return None
+
+    def instantiateTrainStep(self):
+        return None
+
+    def storeExperience(self, experience: Experience):
+        self.experiences.append(experience)
+
+    def trainAfterGame(self):
+        self.experienceQueue.put((DNNActorRL.EXPERIENCES, self.workerIndex, self.experiences)) # The whole game in one message
+        self.experiences = []
+        self.tryReceiveWeights()
+        if self.stopEvent.is_set():
+            self.client.Stop()
+
+    def tryReceiveWeights(self):
+        latest = None
+        while True: # Only the newest weights matter, skip any older ones
+            try:
+                latest = self.weightsQueue.get_nowait()
+            except queue.Empty:
+                break
+        if latest is not None:
+            weights, self.epsilon = latest
+            self.model.set_weights(weights)
+            Console.WriteDebug("Received new weights from the learner", self.name)
+
+    def Statistics(self) -> dict:
+        # Everything the learner needs for its report, since it does not play any games itself
+        return {
+            "cardsPickedCounter": self.client.cardsPickedCounter,
+            "okCardCounter": self.client.okCardCounter,
+            "notInHandCounter": self.client.notInHandCounter,
+            "notAllowedCounter": self.client.notAllowedCounter,
+            "gamesCompletedCounter": self.client.gamesCompletedCounter,
+            "gamesWonCounter": self.client.gamesWonCounter,
+            "gamesLostCounter": self.client.gamesLostCounter,
+            "trickScores": self.trickScores,
+            "gameScores": self.gameScores,
+            "cardWasNotOkayCounters": self.cardWasNotOkayCounters,
+        }
+
+    @staticmethod
+    def RunWorker(workerIndex: int, trainerArguments: tuple, initialWeights: list, numOfGames, experienceQueue, weightsQueue, stopEvent):
+        # Entry point of a worker process: play 'numOfGames' games against 3 Dummy players at an in-process server
+        statistics = None
+        try:
+            try:
+                tf.config.set_visible_devices([], "GPU") # The workers only ever predict single states, which the CPU does just as well. The GPU is left to the learner
+                tf.config.threading.set_intra_op_parallelism_threads(1) # One core per worker, so that the workers do not compete for cores
+                tf.config.threading.set_inter_op_parallelism_threads(1)
+            except RuntimeError as e: # Raised if TensorFlow was already initialised in this process
+                Console.WriteWarning(e, "Worker %d" % workerIndex)
+            actor = DNNActorRL(workerIndex, experienceQueue, weightsQueue, stopEvent, *trainerArguments)
+            actor.model.set_weights(initialWeights)
+            actor.model.WarmUp() # Actors only predict, so there is no train step to compile
+            localServer = LocalServer("LocalServer %d" % workerIndex)
+            dummyPlayers: List[RulebasedPlayer] = []
+            for i in range(3):
+                dummyPlayers.append(RulebasedPlayer())
+                dummyPlayers[i].JoinLocalServer(localServer)
+            actor.JoinLocalServer(localServer)
+            actor.PlayGames(numOfGames, canBeInterrupted=False) # The learner takes care of interruptions (see stopEvent)
+            actor.DisconnectFromServer()
+            for dummyPlayer in dummyPlayers:
+                dummyPlayer.DisconnectFromServer()
+            statistics = actor.Statistics()
+        except:
+            Console.WriteError(traceback.format_exc(), "Worker %d" % workerIndex)
+        experienceQueue.put((DNNActorRL.FINISHED, workerIndex, statistics)) # Always report back, so that the learner does not wait forever
\ No newline at end of file
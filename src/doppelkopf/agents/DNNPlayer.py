@@ -1,6 +1,5 @@
 import numpy as np
 from typing import List
-from doppelkopf.models.DNN import DNN
 from doppelkopf.game.Card import Card
 from doppelkopf.utils.File import File
 from doppelkopf.game.Client import Client
@@ -9,25 +8,39 @@ from doppelkopf.utils.Helper import Helper
 from doppelkopf.utils.Console import Console
 from doppelkopf.game.GameState import GameState
 from doppelkopf.game.Doppelkopf import Doppelkopf
+from doppelkopf.models.NumpyDNN import NumpyDNN
 from doppelkopf.reports.DNNPlayReport import DNNPlayReport
 from doppelkopf.game.CardFeedback import CardFeedback
 
 class DNNPlayer(Agent):
     CARD_WAS_NOT_OK_VALUE = -100.0 # Set cards, that were not okay, to a high, negative number
 
-    def __init__(self, learningRate: float, loadWeightsPath: str, denseLayerUnits: List[int]):
+    def __init__(self, learningRate: float, loadWeightsPath: str, denseLayerUnits: List[int], inferenceServer=None):
         super(DNNPlayer, self).__init__() # Call base constructor
         self.loadWeightsPath = loadWeightsPath
         self.learningRate = learningRate
         self.denseLayerUnits = denseLayerUnits
-        self.model = DNN("DNNPlayer", learningRate, denseLayerUnits)
-        if not self.model.TryLoadWeights(loadWeightsPath):
-            Console.WriteWarning("Could not load weights from file! Player will likely not perform very well")
+        self.inferenceServer = inferenceServer # If given, predictions are batched with those of other agents and the InferenceServer's DNN is shared
+        if inferenceServer is not None:
+            self.model = inferenceServer.model
+        else:
+            self.model = DNNPlayer.CreateModel("DNNPlayer", learningRate, loadWeightsPath, denseLayerUnits)
         self.lastPredictions = None
         self.totalCardWasNotOkayCounter = 0
         self.cardWasNotOkayCounters = {}
         self.resetCardCounters()
 
+    @staticmethod
+    def CreateModel(name: str, learningRate: float, loadWeightsPath: str, denseLayerUnits: List[int]):
+        # Weights exported to a .npz file (see DNN.ExportNumpy()) are run by a NumpyDNN, so TensorFlow is not even imported
+        if NumpyDNN.IsExport(loadWeightsPath):
+            return NumpyDNN.Load(loadWeightsPath, name)
+        from doppelkopf.models.DNN import DNN # Only import TensorFlow when it is needed
+        model = DNN(name, learningRate, denseLayerUnits)
+        if not model.TryLoadWeights(loadWeightsPath):
+            Console.WriteWarning("Could not load weights from file! Player will likely not perform very well")
+        return model
+
     def instantiateClient(self) -> Client: # is called in base class constructor
         return Client(
             onCardRequested=self.pickCard,
@@ -49,8 +62,7 @@ class DNNPlayer(Agent):
 
     def pickCard(self, state: GameState, wrongCardTypes: List[int]) -> Card:
         if self.lastPredictions is None: # If we do not have a prediction for this state yet, make one
-            x = np.expand_dims(state.Flat(), axis=0) # Make the state 2D by adding the 'batch' dimension
-            self.lastPredictions = self.model.QValuesNumpy(x).reshape(-1) # Contains 24 ones or zeros
+            self.lastPredictions = self.predict(state) # Contains 24 ones or zeros
         # If we do not have a prediction yet, we also have not tried any
         #   cards in this state yet, so 'wrongCardTypes' is always empty
         #   (meaning we do not have to check whether the card we pick has been tried before)
@@ -61,9 +73,18 @@ class DNNPlayer(Agent):
         card = self.client.myPlayer.tryGetCardFromHand(cardType)
         return card # Try playing the picked card type
 
-    def PlayGames(self, numOfGames):
+    def predict(self, state: GameState) -> np.ndarray:
+        if self.inferenceServer is not None:
+            return self.inferenceServer.QValues(state.Flat()).copy() # Copy, since the entries are overwritten as soon as cards turn out to be not OK
+        x = np.expand_dims(state.Flat(), axis=0) # Make the state 2D by adding the 'batch' dimension
+        return self.model.QValuesNumpy(x).reshape(-1) # Make it 1D since we are dealing with a single state anyway
+
+    def WarmUp(self):
+        self.model.WarmUp() # Compile the prediction now rather than in the middle of the first game
+
+    def PlayGames(self, numOfGames, canBeInterrupted=True):
         self.resetCardCounters()
-        success = super(DNNPlayer, self).PlayGames(numOfGames) # Call base method
+        success = super(DNNPlayer, self).PlayGames(numOfGames, canBeInterrupted) # Call base method
         if self.totalCardWasNotOkayCounter > 0: # Only if there were any wrong cards to begin with...
             self.printCardCounters() # ... print the whole dictionary
         return success
@@ -132,8 +132,7 @@ class DNNPlayerRecorder(DNNPlayer):
 
     def pickCard(self, state: GameState, wrongCardTypes: List[int]) -> Card:
         if self.lastPredictions is None: # If we do not have a prediction for this state yet, make one
-            x = np.expand_dims(state.Flat(), axis=0) # Make the state 2D by adding the 'batch' dimension
-            self.lastPredictions = self.model.QValuesNumpy(x).reshape(-1) # Contains 24 ones or zeros
+            self.lastPredictions = self.predict(state) # Contains 24 ones or zeros
             self.predictionCopy = np.copy(self.lastPredictions) # Make a copy (shallow copy, but since array contains floats, it's equivalent to a deep copy)
             self.pickCardState = state
         cardType = int(np.argmax(self.lastPredictions)) # pick the one with the highest estimated 'legal' value
@@ -9,7 +9,7 @@ if gpus:
             tf.config.experimental.set_memory_growth(gpu, True)
     except RuntimeError as e:
         print(e)
-from typing import List
+from typing import Dict, List
 from doppelkopf.models.DNN import DNN
 from doppelkopf.game.Card import Card
 from doppelkopf.utils.File import File
@@ -24,19 +24,25 @@ from doppelkopf.game.Doppelkopf import Doppelkopf
 from doppelkopf.agents.EnumsRL import PickCardMode
 from doppelkopf.agents.DNNPlayer  import DNNPlayer
 from doppelkopf.game.CardFeedback import CardFeedback
-from doppelkopf.data.ReplayBuffer import ReplayBuffer
+from doppelkopf.data.RingReplayBuffer import RingReplayBuffer
+from doppelkopf.data.PrioritizedReplayBuffer import PrioritizedReplayBuffer
+from doppelkopf.agents.BackgroundTrainer import BackgroundTrainer
 from doppelkopf.reports.DNNTrainReportRL import DNNTrainReportRL
 
 class DNNTrainerRL(DNNPlayer):
     INVALID_CARD_REWARD = -1.0 # This may be subject to change
 
-    def __init__(self, learningRate: float, loadWeightsPath: str, saveWeightsPath: str, denseLayerUnits: List[int], copyWeightsInterval: int, bufferSize: int, batchSize: int, numOfBatches: int, discountFactor, epsilon, epsilonDecayRate, minimumEpsilon, rewardType):
+    def __init__(self, learningRate: float, loadWeightsPath: str, saveWeightsPath: str, denseLayerUnits: List[int], copyWeightsInterval: int, bufferSize: int, batchSize: int, numOfBatches: int, discountFactor, epsilon, epsilonDecayRate, minimumEpsilon, rewardType, updatesPerStep: float = None, prioritizedReplay: bool = False, stateBufferSize: int = None):
         super(DNNTrainerRL, self).__init__(learningRate, loadWeightsPath, denseLayerUnits) # Call base constructor (creates DNN and LSTMModel)
+        if not isinstance(self.model, DNN):
+            raise ValueError("Exported weights (%s) can only be played with, not trained. Load the weights they were exported from instead!" % loadWeightsPath)
         # # # # # # # # # # # # # # # Create target Network for target calculation # # # # # # # # # # # # # # #
         self.saveWeightsPath = saveWeightsPath
         self.copyWeightsInterval = copyWeightsInterval
         self.bufferSize = bufferSize
-        self.buffer = ReplayBuffer(cacheSize=self.bufferSize)
+        self.stateBufferSize = stateBufferSize # The number of distinct states the buffer can hold. Experiences share states, so this may be smaller than 'bufferSize'
+        self.prioritizedReplay = prioritizedReplay # If True, experiences with large TD-errors are sampled more often
+        self.buffer = self.instantiateBuffer() # All of its memory is allocated right here
         self.batchSize = batchSize
         self.numOfBatches = numOfBatches # The number of batches sampled after every completed game
         if numOfBatches <= 0:
@@ -51,16 +57,35 @@ class DNNTrainerRL(DNNPlayer):
         self.pickCardMode = PickCardMode.EXPLORATION
         self.acceptedCards: List[Card] = [] # The card(s) that was/were last picked by the player/trainer
         self.pickCardStates: List[GameState] = [] # The state(s) where the player/trainer is ordered to pick a card
+        self.invalidCardTypes: Dict[int, List[int]] = {} # In RewardMode.PER_GAME: The invalid cards picked in each of the pickCardStates (by index)
         self.rewardFunc = None
         self.trainingCounter = 0 # A counter for how often we call any of the Train() methods
         self.rewardType = rewardType
         self.rewardMode = None
         self.useTargetNetwork = False # Is assigned a reasonable value in the "setRewardType()" method
         self.setRewardType(rewardType) # Assigs self.useTargetNetwork as needed
-        self.targetNetwork = None
-        if self.useTargetNetwork:
-            self.targetNetwork = DNN("Target Network", learningRate, denseLayerUnits, loadWeightsPath=loadWeightsPath)
+        self.targetNetwork = self.instantiateTargetNetwork() if self.useTargetNetwork else None
         self.lastLoss = None
+        self.trainStep = self.instantiateTrainStep()
+        self.backgroundTrainer = BackgroundTrainer(self, updatesPerStep) if updatesPerStep is not None else None # If set, training runs alongside the games instead of after each game
+
+    def instantiateBuffer(self) -> RingReplayBuffer:
+        if self.prioritizedReplay:
+            return PrioritizedReplayBuffer(self.bufferSize, self.stateBufferSize)
+        return RingReplayBuffer(self.bufferSize, self.stateBufferSize)
+
+    def instantiateTargetNetwork(self) -> DNN:
+        return DNN("Target Network", self.learningRate, self.denseLayerUnits, loadWeightsPath=self.loadWeightsPath)
+
+    def instantiateTrainStep(self):
+        return tf.function(self.trainStepGraph, input_signature=[ # Fixed signature, so the graph is traced only once
+            tf.TensorSpec(shape=(None, GameState.SIZE_STATE), dtype=tf.float32), # states
+            tf.TensorSpec(shape=(None,), dtype=tf.int64), # actions
+            tf.TensorSpec(shape=(None,), dtype=tf.float32), # rewards
+            tf.TensorSpec(shape=(None, GameState.SIZE_STATE), dtype=tf.float32), # nextStates
+            tf.TensorSpec(shape=(None,), dtype=tf.bool), # hasNextState
+            tf.TensorSpec(shape=(None,), dtype=tf.float32) # weights
+        ])
 
     def instantiateClient(self) -> Client:
         return Client(
@@ -82,7 +107,7 @@ class DNNTrainerRL(DNNPlayer):
             reward = self.rewardFunc(isTrickWinner=isTrickWinner, isTeamMateTrickWinner=isTeamMateTrickWinner, trickValue=trickValue)
             #Console.WriteInfo("Reward was %f" % reward, self.name)
             newExperience = Experience(state.Flat(), action, reward, None) # In this reward mode, next states don't matter
-            self.buffer.PutNext(newExperience)
+            self.storeExperience(newExperience)
             Console.WriteDebug("Added new experience to buffer: %s" % (newExperience), self.name + " onTrickCompleted()")
             self.pickCardStates.clear()
             self.acceptedCards.clear()
@@ -91,19 +116,42 @@ class DNNTrainerRL(DNNPlayer):
         super(DNNTrainerRL, self).onGameCompleted(isGameWinner, score)
         if self.rewardMode == RewardMode.PER_GAME:
             reward = self.rewardFunc(isGameWinner=isGameWinner, score=score)
-            for i, (state, pickedCard) in enumerate(zip(self.pickCardStates, self.acceptedCards)):
-                nextState = self.pickCardStates[i + 1].Flat() if (i + 1) < len(self.pickCardStates) else None
+            flatStates = [state.Flat() for state in self.pickCardStates] # Flatten each state once. Experiences of the same state share its array
+            for i, pickedCard in enumerate(self.acceptedCards):
+                # Store the invalid cards of a state right before its valid one, so the buffer keeps just one copy of that state
+                for cardType in self.invalidCardTypes.get(i, []):
+                    self.storeExperience(Experience(flatStates[i], cardType, DNNTrainerRL.INVALID_CARD_REWARD, None))
+                nextState = flatStates[i + 1] if (i + 1) < len(flatStates) else None
                 action = pickedCard.cardType
-                newExperience = Experience(state.Flat(), action, reward, nextState)
-                self.buffer.PutNext(newExperience)
+                newExperience = Experience(flatStates[i], action, reward, nextState)
+                self.storeExperience(newExperience)
                 Console.WriteDebug("Added new experience to buffer: %s" % (newExperience), self.name + " onGameCompleted()")
             self.pickCardStates.clear()
             self.acceptedCards.clear()
+            self.invalidCardTypes.clear()
         self.applyEpsilonDecay() # ToDo: Decide whether to apply epsilon decay depending on win/lose scenario (or reward based)
+        self.trainAfterGame()
+
+    def storeExperience(self, experience: Experience):
+        if self.backgroundTrainer is not None:
+            self.backgroundTrainer.Store(experience) # Also wakes up the training thread
+        else:
+            self.buffer.PutNext(experience)
+
+    def trainAfterGame(self):
+        if self.backgroundTrainer is not None:
+            return # The training thread keeps up with the experiences by itself
         if self.buffer.IsFull(): # Only once the buffer is full, start training
             self.Train() # Train a handful of batches
         else:
             Console.WriteInfo("Cannot train yet, buffer only has %d experiences" % (self.buffer.Size()), self.name)
+
+    def LearnFromGame(self, experiences: List[Experience]):
+        # For learners that do not play themselves (see SelfPlayPool): Take the experiences of a game played elsewhere and train just like after a game of our own
+        for experience in experiences:
+            self.storeExperience(experience)
+        self.applyEpsilonDecay()
+        self.trainAfterGame()
     
     def onCardWasOk(self, state: GameState, card: Card, feedback: CardFeedback):
         self.acceptedCards.append(card) # Only accepted cards are added to the list
@@ -112,7 +160,7 @@ class DNNTrainerRL(DNNPlayer):
             reward = self.rewardFunc(feedback) # Get reward for this (valid) card
             action = card.cardType
             newExperience = Experience(state.Flat(), action, reward, None) # In this reward mode, next states don't matter
-            self.buffer.PutNext(newExperience)
+            self.storeExperience(newExperience)
             Console.WriteDebug("Added new experience to buffer: %s" % (newExperience), self.name + " onCardWasOk()")
 
     def onCardWasNotOkay(self, state: GameState, card: Card, feedback: CardFeedback, trickIndex: int):
@@ -127,12 +175,21 @@ class DNNTrainerRL(DNNPlayer):
         # In RewardMode.PER_TRICK, all previous tricks have already been processed, but this trick cannot be processed, 
         #   as it is incomplete until all players have picked a valid card. So we just process the invalid card here and 
         #   wait for a valid one to ba played
-        # In RewardMode.PER_GAME, the game is not complete, so it cannot be processed yet. However, this card can.
+        # In RewardMode.PER_GAME, the game is not complete, so it cannot be processed yet. However, this card can. It is stored along with
+        #   the rest of the game, though, next to the valid card of the same state (see onGameCompleted())
+        if self.rewardMode == RewardMode.PER_GAME:
+            self.invalidCardTypes.setdefault(len(self.pickCardStates) - 1, []).append(card.cardType)
+            return
         reward = DNNTrainerRL.INVALID_CARD_REWARD
         newExperience = Experience(state.Flat(), card.cardType, reward, None) # In either reward mode, invalid cards have no next state
-        self.buffer.PutNext(newExperience)
+        self.storeExperience(newExperience)
         Console.WriteDebug("Added new experience to buffer: %s" % (newExperience), self.name + " onCardWasNotOkay()")
 
+    def predict(self, state: GameState) -> np.ndarray:
+        if self.backgroundTrainer is not None:
+            return self.backgroundTrainer.Predict(state.Flat()) # Never predict with the DNN that is being trained right now
+        return super(DNNTrainerRL, self).predict(state)
+
     def pickCardExploration(self, wrongCardTypes: List[int]) -> Card:
         cardTypes = [i for i in range(Card.NUM_CARDTYPES) if i not in wrongCardTypes] # List of all cardTypes that haven't been tried yet
         cardType = cardTypes[int(np.random.uniform(high=len(cardTypes)))] # Pick any card type from the list
@@ -141,8 +198,7 @@ class DNNTrainerRL(DNNPlayer):
     def pickCardExploitation(self, state: GameState, wrongCardTypes: List[int]) -> Card:
         # Do Exploitation
         if self.lastPredictions is None: # If we do not yet have a prediction for the current situation, make one
-            x = np.expand_dims(state.Flat(), axis=0) # Make the state 2D by adding the 'batch' dimension
-            self.lastPredictions = self.model.QValuesNumpy(x).reshape(-1) # Make it 1D since we are dealing with a single state anyway
+            self.lastPredictions = self.predict(state)
             # If we do not have a prediction yet, we have to make sure that any cards that
             #   may have been tried before (by exploration) are marked as invalid
             for wrongCardType in wrongCardTypes:
@@ -243,34 +299,27 @@ class DNNTrainerRL(DNNPlayer):
         if self.epsilon > self.minimumEpsilon:
             self.epsilon = max(self.epsilon * self.epsilonDecayRate, self.minimumEpsilon) # If epsilon after decay is smaller than minimum, choose minimum
 
-    def CalculateYValues(self, experiences: List[Experience], nextStateMask: List[int], modelEstimatesStates: np.ndarray, modelEstimatesNextStates: np.ndarray, targetNetworkEstimates: np.ndarray):
-        yActuals = []
-        targetMask = np.zeros(shape=modelEstimatesStates.shape).astype('bool')
-        for i, experience in enumerate(experiences):
-            target = experience.reward
-            targetMask[i, experience.action] = True
-            if self.useTargetNetwork:
-                nextStateIndex = nextStateMask[i]
-                Console.WriteDebug("'nextStateIndex' for experience %d is %s" % (i, str(nextStateIndex)), self.name)
-                if nextStateIndex is not None: # If we use a target network and there is a 'next state'
-                    qNetworkArgmax = np.argmax(modelEstimatesNextStates[nextStateIndex]) # Index of highest estimated Q-value for the next state
-                    Console.WriteDebug("'qNetworkArgmax' for experience %d is %s" % (i, str(qNetworkArgmax)), self.name)
-                    targetNetworkQValue = targetNetworkEstimates[nextStateIndex, qNetworkArgmax] # Q-value for next state, as estimated by Target network
-                    Console.WriteDebug("'targetNetworkQValue' for experience %d is %s" % (i, str(targetNetworkQValue)), self.name)
-                    target += self.discountFactor * targetNetworkQValue
-            yActuals.append(target)
-        return tf.constant(np.array(yActuals, dtype='float32')), tf.constant(targetMask)
+    def CalculateYValues(self, rewards: tf.Tensor, nextStates: tf.Tensor, hasNextState: tf.Tensor) -> tf.Tensor:
+        # Double DQN: the Q-network picks the best action in each next state, the target network estimates its value. Runs inside trainStep()
+        if not self.useTargetNetwork:
+            return rewards # In this reward mode, next states don't matter
+        qNetworkArgmax = tf.argmax(self.model.QValues(nextStates), axis=1) # Index of highest estimated Q-value for each next state
+        targetNetworkQValues = tf.gather(self.targetNetwork.QValues(nextStates), qNetworkArgmax, axis=1, batch_dims=1) # Q-values for the next states, as estimated by Target network
+        return rewards + self.discountFactor * tf.cast(hasNextState, tf.float32) * targetNetworkQValues # Terminal experiences only get their reward
 
     def Train(self):
         # Get random samples from the training set
-        Console.WriteDebug("Sampling %d samples from buffer" % (self.numOfSamples), self.name)
-        experiences = self.buffer.RandomBatch(self.numOfSamples) # Get a number of samples and use them for training
+        Console.WriteDebug("Sampling %d batches of %d samples from buffer" % (self.numOfBatches, self.batchSize), self.name)
         self.lastLoss = 0
         for i in range(self.numOfBatches):
-            start = i * self.batchSize
-            end = (i + 1) * self.batchSize
-            self.lastLoss += self.TrainExperiences(experiences[start:end])
+            indices, weights, batch = self.buffer.SampleWeightedBatch(self.batchSize)
+            loss, tdErrors = self.TrainBatch(*batch, weights)
+            self.buffer.UpdatePriorities(indices, tdErrors) # The TD-errors of this batch become its new priorities (prioritized replay only)
+            self.lastLoss += loss
         self.lastLoss /= self.numOfBatches
+        self.completeTraining()
+
+    def completeTraining(self):
         self.trainingCounter += 1
         if self.trainingCounter % self.copyWeightsInterval == (self.copyWeightsInterval - 1):
             if self.useTargetNetwork:
@@ -278,51 +327,55 @@ class DNNTrainerRL(DNNPlayer):
             self.model.TrySaveWeights(self.saveWeightsPath) # Store the weights every now and then so as to not lose progress if the program crashes
         Console.WriteSuccess("Batch-Training complete. Loss: %s" % (self.lastLoss), self.name)
 
-    def TrainExperiences(self, experiences: List[Experience]) -> np.ndarray:
-        states = [experience.state for experience in experiences]
-        states: np.ndarray = np.array(states) # Join all the states from all the experiences together
-        Console.WriteDebug("Constructed 'states' np-array of shape %s" % (str(states.shape)), self.name)
-        nextStates = None
-        nextStateMask = None
-        if self.useTargetNetwork:
-            nextStates = []
-            nextStateMask = []
-            for experience in experiences:
-                if experience.nextState is not None:
-                    nextStates.append(experience.nextState) # Only take the non-None 'next states'
-                    nextStateMask.append(len(nextStates) - 1) # Add the 'index' of the next state
-                else:
-                    nextStateMask.append(None) # Add 'None' to indicate that this experience has no 'next state'
-            nextStates = np.array(nextStates)
-            Console.WriteDebug("Constructed 'nextStates' np-array of shape %s along with a mask of length %d" % (str(nextStates.shape), len(nextStateMask)), self.name)
-        loss = None
+    def TrainBatch(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray, nextStates: np.ndarray, hasNextState: np.ndarray, weights: np.ndarray = None) -> tuple:
+        # Takes a batch as returned by RingReplayBuffer.SampleBatch(). With importance-sampling 'weights' (see PrioritizedReplayBuffer),
+        # each squared error is scaled by its weight. Returns the loss and the TD-errors
+        Console.WriteDebug("Training with 'states' of shape %s and 'nextStates' of shape %s" % (str(states.shape), str(nextStates.shape)), self.name)
+        if weights is None:
+            weights = np.ones(shape=(len(actions)), dtype=np.float32) # Plain mean squared error
+        loss, tdErrors = self.trainStep(states, actions, rewards, nextStates, hasNextState, weights)
+        return tf.keras.backend.eval(loss), tf.keras.backend.eval(tdErrors)
+
+    def trainStepGraph(self, states: tf.Tensor, actions: tf.Tensor, rewards: tf.Tensor, nextStates: tf.Tensor, hasNextState: tf.Tensor, weights: tf.Tensor):
+        # One gradient update for a whole batch. Compiled into a single graph by tf.function (see __init__())
+        yActuals = self.CalculateYValues(rewards, nextStates, hasNextState) # No gradients needed for the targets, so this stays outside of the tape
         with tf.GradientTape() as tape:
             modelEstimatesStates = self.model.QValues(states)
-            Console.WriteDebug("Got the Q-estimates for 'states': %s" % (modelEstimatesStates), self.name)
-            modelEstimatesNextStates = None
-            targetNetworkEstimates = None
-            if self.useTargetNetwork and len(nextStates) > 0: # Using the target network only makes sense if there are any 'next states' to work with
-                modelEstimatesNextStates = tf.keras.backend.eval(self.model.QValues(nextStates)) # Let the Q-network evaluate all the 'next states'
-                Console.WriteDebug("Got the Q-estimates for 'nextStates': %s" % (modelEstimatesNextStates), self.name)
-                targetNetworkEstimates = tf.keras.backend.eval(self.targetNetwork.QValues(nextStates)) # Let the Target-network evaluate all the 'next states'
-                Console.WriteDebug("Got the Target Q-estimates for 'nextStates': %s" % (targetNetworkEstimates), self.name)
-            yActuals, targetMask = self.CalculateYValues(experiences, nextStateMask, tf.keras.backend.eval(modelEstimatesStates), modelEstimatesNextStates, targetNetworkEstimates) # Evaluate the Tensors to get numpy arrays
-            Console.WriteDebug("Constructed the target values and got: %s" % (yActuals), self.name)
-            yPredicts = modelEstimatesStates[targetMask]
-            Console.WriteDebug("Selected the predictions using the target mask and got: %s" % (yPredicts), self.name)
-            loss = tf.keras.losses.MeanSquaredError()(yActuals, yPredicts) # https://www.tensorflow.org/api_docs/python/tf/keras/losses/MeanSquaredError            
+            yPredicts = tf.gather(modelEstimatesStates, actions, axis=1, batch_dims=1) # Only the Q-value of the action taken is trained
+            tdErrors = yActuals - yPredicts
+            loss = tf.reduce_mean(weights * tf.square(tdErrors))
         gradients = tape.gradient(loss, self.model.trainable_variables) # Get gradients for LSTM's trainable variables
         self.model.ApplyGradients(gradients) # Apply those gradients for the calculated loss value
-        return tf.keras.backend.eval(loss)
+        return loss, tdErrors
 
     def DoReinforcementLearning(self, numberOfGames):
         self.buffer.ClearAll()
         # # # # # # # # # # # # # # # Play games and store their recordings in buffer, then train with said buffer at the end of each game # # # # # # # # # # # # # # # 
         self.trainingCounter = 0
+        self.StartBackgroundTraining()
         self.PlayGames(numberOfGames)
+        self.StopBackgroundTraining()
         # # # # # # # # # # # # # # # Save weights to file # # # # # # # # # # # # # # #
         self.model.TrySaveWeights(self.saveWeightsPath)
         return self.lastLoss
+
+    def StartBackgroundTraining(self):
+        if self.backgroundTrainer is not None:
+            self.backgroundTrainer.Start()
+
+    def StopBackgroundTraining(self):
+        if self.backgroundTrainer is not None:
+            self.backgroundTrainer.Stop()
+
+    def WarmUp(self):
+        super(DNNTrainerRL, self).WarmUp()
+        if self.backgroundTrainer is not None:
+            self.backgroundTrainer.policyModel.WarmUp()
+        self.trainStep.get_concrete_function() # Only traces the train step, no weights are changed
+
+    def PolicyWeights(self) -> list:
+        # The weights cards are picked with. While training in the background, self.model changes with every update
+        return self.backgroundTrainer.PolicyWeights() if self.backgroundTrainer is not None else self.model.get_weights()
     #endregion
 
     def resetCardCounters(self):
@@ -0,0 +1,116 @@
+import queue
+import threading
+import multiprocessing
+from typing import List
+from doppelkopf.utils.Console import Console
+from doppelkopf.agents.EnumsRL import PickCardMode
+from doppelkopf.agents.DNNActorRL import DNNActorRL
+from doppelkopf.agents.DNNTrainerRL import DNNTrainerRL
+
+# Actor/learner training: A number of worker processes (see DNNActorRL) play games against Dummy players, each with its own CPU copy of the DNN.
+# The experiences of every game are streamed to the learner (the DNNTrainerRL handed in), which owns the replay buffer, trains after every game
+# just like DNNTrainerRL.DoReinforcementLearning() does and sends refreshed weights back every 'copyWeightsInterval' trainings
+class SelfPlayPool():
+    RECEIVE_TIMEOUT = 1.0 # Seconds between checks whether all workers are still alive
+
+    def __init__(self, trainer: DNNTrainerRL, numOfWorkers: int):
+        if numOfWorkers <= 0:
+            raise ValueError("'numOfWorkers' was %d, but must be at least one!" % numOfWorkers)
+        self.name = "SelfPlayPool"
+        self.trainer = trainer
+        self.numOfWorkers = numOfWorkers
+        self.context = multiprocessing.get_context("spawn") # TensorFlow does not survive a fork()
+        self.experienceQueue = None
+        self.weightsQueues = []
+        self.stopEvent = None
+        self.workers: List[multiprocessing.Process] = []
+        self.lastWeightsSent = 0 # The trainer's trainingCounter when weights were last sent
+
+    def trainerArguments(self) -> tuple:
+        trainer = self.trainer
+        return (trainer.learningRate, trainer.loadWeightsPath, trainer.saveWeightsPath, trainer.denseLayerUnits, trainer.copyWeightsInterval, trainer.bufferSize, trainer.batchSize, trainer.numOfBatches, trainer.discountFactor, trainer.epsilon, trainer.epsilonDecayRate, trainer.minimumEpsilon, trainer.rewardType)
+
+    @staticmethod
+    def splitGames(numOfGames, numOfWorkers: int) -> list:
+        if numOfGames is None:
+            return [None] * numOfWorkers # Play indefinitely
+        return [numOfGames // numOfWorkers + (1 if i < numOfGames % numOfWorkers else 0) for i in range(numOfWorkers)]
+
+    def startWorkers(self, numOfGames):
+        self.experienceQueue = self.context.Queue()
+        self.weightsQueues = [self.context.Queue() for _ in range(self.numOfWorkers)]
+        self.stopEvent = self.context.Event()
+        initialWeights = self.trainer.PolicyWeights() # All workers start with the learner's weights
+        for workerIndex, workerGames in enumerate(SelfPlayPool.splitGames(numOfGames, self.numOfWorkers)):
+            worker = self.context.Process(target=DNNActorRL.RunWorker, args=(workerIndex, self.trainerArguments(), initialWeights, workerGames, self.experienceQueue, self.weightsQueues[workerIndex], self.stopEvent), name="Worker %d" % workerIndex)
+            worker.start()
+            self.workers.append(worker)
+        Console.WriteSuccess("Started %d workers" % self.numOfWorkers, self.name)
+
+    def Stop(self):
+        self.stopEvent.set() # Every worker stops after its current game
+
+    def threadInterruptTraining(self):
+        Console.ReadInput("Press Enter to stop/end training\n") # Wait for user input
+        self.Stop()
+
+    def sendWeights(self):
+        weights = self.trainer.PolicyWeights()
+        self.lastWeightsSent = self.trainer.trainingCounter
+        for weightsQueue in self.weightsQueues:
+            weightsQueue.put((weights, self.trainer.epsilon)) # The learner's epsilon decays with the games of all workers
+        Console.WriteInfo("Sent new weights to %d workers" % self.numOfWorkers, self.name)
+
+    def mergeStatistics(self, statistics: dict):
+        trainer = self.trainer
+        for counter in ("cardsPickedCounter", "okCardCounter", "notInHandCounter", "notAllowedCounter", "gamesCompletedCounter", "gamesWonCounter", "gamesLostCounter"):
+            setattr(trainer.client, counter, getattr(trainer.client, counter) + statistics[counter]) # The learner's report covers the games of all workers
+        trainer.trickScores.extend(statistics["trickScores"])
+        trainer.gameScores.extend(statistics["gameScores"])
+        for trickIndex, entry in statistics["cardWasNotOkayCounters"].items():
+            for pickCardMode in (PickCardMode.EXPLORATION, PickCardMode.EXPLOITATION):
+                trainer.cardWasNotOkayCounters[trickIndex][pickCardMode] += entry[pickCardMode]
+        trainer.totalCardWasNotOkayCounter = sum(sum(entry.values()) for entry in trainer.cardWasNotOkayCounters.values())
+
+    def DoReinforcementLearning(self, numOfGames, canBeInterrupted=True):
+        trainer = self.trainer
+        trainer.buffer.ClearAll()
+        trainer.trainingCounter = 0
+        trainer.resetCardCounters()
+        self.lastWeightsSent = 0
+        trainer.StartBackgroundTraining() # If the trainer trains in the background, it only stores the experiences received here
+        self.startWorkers(numOfGames)
+        if canBeInterrupted:
+            thread = threading.Thread(target=self.threadInterruptTraining, daemon=True)
+            thread.start()
+        # # # # # # # # # # # # # # # Train with the experiences of all workers, until every worker has finished # # # # # # # # # # # # # # #
+        numOfFinishedWorkers = 0
+        numOfGamesReceived = 0
+        while numOfFinishedWorkers < self.numOfWorkers:
+            try:
+                kind, workerIndex, data = self.experienceQueue.get(timeout=SelfPlayPool.RECEIVE_TIMEOUT)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in self.workers): # Workers that were killed cannot report back
+                    Console.WriteError("All workers have died", self.name)
+                    break
+                continue
+            if kind == DNNActorRL.EXPERIENCES:
+                numOfGamesReceived += 1
+                trainer.LearnFromGame(data)
+                if trainer.trainingCounter - self.lastWeightsSent >= trainer.copyWeightsInterval:
+                    self.sendWeights()
+            else:
+                numOfFinishedWorkers += 1
+                if data is not None:
+                    self.mergeStatistics(data)
+                Console.WriteInfo("Worker %d has finished" % workerIndex, self.name)
+        trainer.StopBackgroundTraining()
+        for worker in self.workers:
+            worker.join()
+        for weightsQueue in self.weightsQueues:
+            weightsQueue.cancel_join_thread() # Weights that were not picked up anymore can be dropped
+        self.workers.clear()
+        Console.WriteSuccess("Trained with %d games from %d workers" % (numOfGamesReceived, self.numOfWorkers), self.name)
+        # # # # # # # # # # # # # # # Save weights to file # # # # # # # # # # # # # # #
+        trainer.model.TrySaveWeights(trainer.saveWeightsPath)
+        return trainer.lastLoss
\ No newline at end of file
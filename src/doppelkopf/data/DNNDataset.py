@@ -2,10 +2,9 @@ import numpy as np
 from typing import Tuple
 from doppelkopf.utils.Console import Console
 from doppelkopf.data.Dataset import Dataset
-from doppelkopf.game.CardFeedback import CardFeedback
-from doppelkopf.game.Team import Team
 from doppelkopf.game.Card import Card
-from doppelkopf.game.Player import Player
+from doppelkopf.game.Hand import Hand
+from doppelkopf.game.LegalMasks import LegalMasks
 from doppelkopf.game.GameState import GameState
 
 class DNNDataset(Dataset):
@@ -57,20 +56,15 @@ class DNNDataset(Dataset):
     def VerifyEntry(self, stateFlat, label) -> bool:
         isValid = True
         index = 0
-        player = Player(0)
-        teamRe, teamKontra = Team.createTeams()
         state = GameState.FromFlat(stateFlat, index)
-        player.handCards(state.playerDeck, teamRe, teamKontra) # Give cards to player
-        for card in Card.CARDTYPES:
-            feedback = player.getFeedback(card.cardType, state.currentStack[0] if len(state.currentStack) > 0 else None)
-            if feedback == CardFeedback.NOT_ALLOWED or feedback == CardFeedback.NOT_IN_HAND:
-                if label[card.cardType] != 0.0:
-                    Console.WriteError("Found a cardType labeled as %f instead of 0.0" % (label[card.cardType]))
-                    isValid = False
-            elif feedback == CardFeedback.OK or feedback == CardFeedback.OK_COULD_NOT_FOLLOW_SUIT:
-                if label[card.cardType] != 1.0:
-                    Console.WriteError("Found a cardType labeled as %f instead of 1.0" % (label[card.cardType]))
-                    isValid = False
+        isLegal = LegalMasks.ForHand(Hand(state.playerDeck), state.currentStack[0].cardType if len(state.currentStack) > 0 else None) > 0
+        for cardType in range(Card.NUM_CARDTYPES):
+            if not isLegal[cardType] and label[cardType] != 0.0:
+                Console.WriteError("Found a cardType labeled as %f instead of 0.0" % (label[cardType]))
+                isValid = False
+            elif isLegal[cardType] and label[cardType] != 1.0:
+                Console.WriteError("Found a cardType labeled as %f instead of 1.0" % (label[cardType]))
+                isValid = False
         return isValid
 
     def Verify(self):
@@ -58,6 +58,9 @@ class DataCache():
     def Get(self, key):
         return self.data[key]
 
+    def Contains(self, key) -> bool:
+        return key in self.data
+
     def CheckLengths(self):
         if len(self.data) != len(self.keyQueue):
             raise ValueError("data and keyQueue have different lengths: data (%d) vs. keyQueue(%d)" % (len(self.data), len(self.keyQueue)))
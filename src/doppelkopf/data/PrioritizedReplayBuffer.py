@@ -0,0 +1,59 @@
+import numpy as np
+from typing import Tuple
+from doppelkopf.data.SumTree import SumTree
+from doppelkopf.game.GameState import GameState
+from doppelkopf.data.RingReplayBuffer import RingReplayBuffer
+
+# Prioritized experience replay (Schaul et al., 2016): experiences are sampled in proportion to their priority, which is their last TD-error
+# raised to the power of 'alpha'. New experiences get the highest priority seen so far, so that each of them is trained at least once.
+# The bias this introduces is corrected by importance-sampling weights, whose exponent 'beta' is annealed towards 1
+class PrioritizedReplayBuffer(RingReplayBuffer):
+    PRIORITY_EPSILON = 1e-3 # Keeps experiences with a TD-error of zero from never being sampled again
+
+    def __init__(self, capacity: int, stateCapacity: int = None, alpha=0.6, beta=0.4, betaAnnealingSteps=100000, stateSize=GameState.SIZE_STATE, seed=None):
+        self.tree = SumTree(capacity) # Before the base constructor, which clears it and reports NumOfBytes()
+        super(PrioritizedReplayBuffer, self).__init__(capacity, stateCapacity, stateSize, seed)
+        self.alpha = alpha
+        self.beta = beta
+        self.betaIncrement = (1.0 - beta) / betaAnnealingSteps # Reaches 1 after 'betaAnnealingSteps' sampled batches
+        self.maxPriority = 1.0
+
+    def NumOfBytes(self) -> int:
+        return super(PrioritizedReplayBuffer, self).NumOfBytes() + self.tree.nodes.nbytes
+
+    def ClearAll(self):
+        super(PrioritizedReplayBuffer, self).ClearAll()
+        self.tree.Clear()
+        self.maxPriority = 1.0
+
+    def Put(self, state: np.ndarray, action: int, reward: float, nextState: np.ndarray = None):
+        index = self.numOfPuts % self.capacity
+        super(PrioritizedReplayBuffer, self).Put(state, action, reward, nextState)
+        self.tree.UpdateOne(index, self.maxPriority)
+
+    def drop(self, oldest: int):
+        dropped = np.arange(self.oldest, oldest) % self.capacity
+        self.tree.Update(dropped, np.zeros(shape=(len(dropped)))) # Never sample them again
+        super(PrioritizedReplayBuffer, self).drop(oldest)
+
+    def SampleIndices(self, batchSize: int) -> np.ndarray:
+        # Stratified: one sample from each of 'batchSize' equally large ranges of the total priority
+        segment = self.tree.Total() / batchSize
+        prefixSums = (np.arange(batchSize) + self.rng.random(batchSize)) * segment
+        indices = self.tree.Find(prefixSums)
+        indices[self.tree.Get(indices) == 0] = (self.numOfPuts - 1) % self.capacity # Rounding may end up at an empty slot next to the last experience
+        return indices
+
+    def SampleWeightedBatch(self, batchSize: int) -> Tuple[np.ndarray, np.ndarray, tuple]:
+        indices = self.SampleIndices(batchSize)
+        probabilities = self.tree.Get(indices) / self.tree.Total()
+        weights = (self.Size() * probabilities) ** (-self.beta)
+        weights /= weights.max() # Only ever scale the updates down
+        self.beta = min(1.0, self.beta + self.betaIncrement)
+        return indices, weights.astype(np.float32), self.Batch(indices)
+
+    def UpdatePriorities(self, indices: np.ndarray, tdErrors: np.ndarray):
+        priorities = (np.abs(tdErrors) + PrioritizedReplayBuffer.PRIORITY_EPSILON) ** self.alpha
+        isAlive = self.IsAlive(indices) # Experiences may have been dropped while the batch was being trained (see BackgroundTrainer)
+        self.tree.Update(indices[isAlive], priorities[isAlive])
+        self.maxPriority = max(self.maxPriority, float(priorities.max()))
\ No newline at end of file
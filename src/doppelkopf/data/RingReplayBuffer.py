@@ -0,0 +1,121 @@
+import numpy as np
+from typing import Tuple
+from doppelkopf.utils.Console import Console
+from doppelkopf.game.GameState import GameState
+from doppelkopf.data.Experience import Experience
+
+# A replay buffer of fixed size, that keeps all experiences in preallocated arrays and overwrites the oldest one when full.
+# States are stored only once, in a ring of their own, and experiences refer to them by index (like GameSequence.stateIndices/nextStateIndices):
+# - An experience with the same state as the one put before it shares its state (e.g. all invalid cards picked in one state)
+# - The next state of an experience is always the state of the experience put right after it (see DNNTrainerRL.onGameCompleted()),
+#   so only its index is kept. Until that experience arrives, the first one counts as terminal
+# Full arrays are only put together for the sampled batches. If the state ring is smaller than the experience ring ('stateCapacity'),
+# overwriting a state also drops all (older) experiences still referring to it
+class RingReplayBuffer():
+    NO_NEXT_STATE = -1
+
+    def __init__(self, capacity: int, stateCapacity: int = None, stateSize=GameState.SIZE_STATE, seed=None):
+        self.capacity = capacity
+        self.stateCapacity = stateCapacity if stateCapacity is not None else capacity # Never needs to be larger: each experience adds at most one state
+        if self.stateCapacity < 2:
+            raise ValueError("'stateCapacity' was %d, but must be at least 2!" % self.stateCapacity)
+        self.states = np.zeros(shape=(self.stateCapacity, stateSize), dtype=np.float32)
+        self.stateLastUsed = np.full(shape=(self.stateCapacity), fill_value=-1, dtype=np.int64) # Number of the newest experience referring to each state
+        self.stateIndices = np.zeros(shape=(capacity), dtype=np.int64)
+        self.actions = np.zeros(shape=(capacity), dtype=np.int64)
+        self.rewards = np.zeros(shape=(capacity), dtype=np.float32)
+        self.nextIndices = np.full(shape=(capacity), fill_value=RingReplayBuffer.NO_NEXT_STATE, dtype=np.int64) # Into 'states'
+        self.rng = np.random.default_rng(seed)
+        self.ClearAll()
+        Console.WriteInfo("Allocated %.1f MB for %d experiences and %d states" % (self.NumOfBytes() / (1 << 20), capacity, self.stateCapacity), type(self).__name__)
+
+    def NumOfBytes(self) -> int:
+        return self.states.nbytes + self.stateLastUsed.nbytes + self.stateIndices.nbytes + self.actions.nbytes + self.rewards.nbytes + self.nextIndices.nbytes
+
+    def ClearAll(self):
+        # Experiences are numbered in the order they were put. The one numbered n lives in slot n % capacity
+        self.numOfPuts = 0
+        self.oldest = 0 # Number of the oldest experience that has not been overwritten or dropped
+        self.isFull = False
+        self.stateWriteIndex = 0 # The slot the next new state goes to
+        self.lastStateIndex = None
+        self.lastState: np.ndarray = None # The state last put, as given (to skip comparing it with itself)
+        self.stateLastUsed.fill(-1)
+        self.pendingIndex = None # The slot of the last experience, if it is still waiting for its next state
+        self.pendingNextState: np.ndarray = None
+
+    def Size(self) -> int:
+        return self.numOfPuts - self.oldest
+
+    def IsFull(self) -> bool:
+        return self.isFull # Once anything had to be overwritten, the buffer stays full
+
+    def PutNext(self, experience: Experience):
+        self.Put(experience.state, experience.action, experience.reward, experience.nextState)
+
+    def Put(self, state: np.ndarray, action: int, reward: float, nextState: np.ndarray = None):
+        number = self.numOfPuts
+        index = number % self.capacity
+        if self.Size() == self.capacity:
+            self.oldest += 1 # Overwrite the oldest experience
+            self.isFull = True
+        if self.pendingIndex is not None: # The previous experience has a next state, which must be this experience's state
+            if state is not self.pendingNextState and not np.array_equal(state, self.pendingNextState):
+                raise ValueError("An experience with a next state must be followed by the experience of that next state")
+        stateIndex = self.putState(state, number)
+        if self.pendingIndex is not None and number - 1 >= self.oldest:
+            self.nextIndices[self.pendingIndex] = stateIndex
+        self.stateIndices[index] = stateIndex
+        self.actions[index] = action
+        self.rewards[index] = reward
+        self.nextIndices[index] = RingReplayBuffer.NO_NEXT_STATE
+        self.pendingIndex = index if nextState is not None else None
+        self.pendingNextState = nextState
+        self.numOfPuts += 1
+
+    def putState(self, state: np.ndarray, number: int) -> int:
+        # Returns the index of the stored state, which experience 'number' refers to from now on
+        if self.lastStateIndex is not None and (state is self.lastState or np.array_equal(state, self.states[self.lastStateIndex])):
+            stateIndex = self.lastStateIndex # Same state as before, share it
+        else:
+            stateIndex = self.stateWriteIndex
+            if self.stateLastUsed[stateIndex] >= self.oldest: # Still referred to, so drop every experience up to the last one that does
+                self.drop(self.stateLastUsed[stateIndex] + 1)
+            self.states[stateIndex] = state
+            self.stateWriteIndex = (stateIndex + 1) % self.stateCapacity
+            self.lastStateIndex = stateIndex
+        self.lastState = state
+        self.stateLastUsed[stateIndex] = number
+        return stateIndex
+
+    def drop(self, oldest: int):
+        self.oldest = oldest
+        self.isFull = True
+
+    def IsAlive(self, indices: np.ndarray) -> np.ndarray:
+        # Whether the experiences in these slots have neither been overwritten nor dropped
+        return (self.numOfPuts - 1 - indices) % self.capacity < self.Size()
+
+    def SampleIndices(self, batchSize: int) -> np.ndarray:
+        # With replacement, which costs O(batchSize) no matter how large the buffer is
+        return (self.oldest + self.rng.integers(0, self.Size(), size=batchSize)) % self.capacity
+
+    def Batch(self, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # Returns (states, actions, rewards, nextStates, hasNextState). All of them have one row per experience, so that batches always have the same shapes.
+        # Experiences without a next state get their own state as 'next state', which is masked out by 'hasNextState'
+        stateIndices = self.stateIndices[indices]
+        nextIndices = self.nextIndices[indices]
+        hasNextState = nextIndices != RingReplayBuffer.NO_NEXT_STATE
+        nextStates = self.states[np.where(hasNextState, nextIndices, stateIndices)]
+        return self.states[stateIndices], self.actions[indices], self.rewards[indices], nextStates, hasNextState
+
+    def SampleBatch(self, batchSize: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        return self.Batch(self.SampleIndices(batchSize))
+
+    def SampleWeightedBatch(self, batchSize: int) -> Tuple[np.ndarray, np.ndarray, tuple]:
+        # Returns (indices, importance-sampling weights, batch). Uniform samples need no weights
+        indices = self.SampleIndices(batchSize)
+        return indices, None, self.Batch(indices)
+
+    def UpdatePriorities(self, indices: np.ndarray, tdErrors: np.ndarray):
+        pass # Uniform sampling does not use priorities (see PrioritizedReplayBuffer)
\ No newline at end of file
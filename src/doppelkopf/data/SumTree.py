@@ -0,0 +1,47 @@
+import numpy as np
+
+# A binary tree over 'capacity' priorities, in which every node holds the sum of its children. Stored as one array: the root is node 1,
+# the children of node i are 2i and 2i+1 and the leaves start at 'numOfLeaves'. Updating a priority and finding the leaf for a prefix sum are O(log N).
+# Parents are always recalculated from their children (instead of adding differences), so rounding errors do not pile up
+class SumTree():
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.numOfLeaves = 1 << max(0, (capacity - 1).bit_length()) # The next power of two, so that all leaves are on the same level
+        self.nodes = np.zeros(shape=(2 * self.numOfLeaves), dtype=np.float64)
+
+    def Clear(self):
+        self.nodes.fill(0)
+
+    def Total(self) -> float:
+        return float(self.nodes[1])
+
+    def Get(self, indices: np.ndarray) -> np.ndarray:
+        return self.nodes[self.numOfLeaves + indices]
+
+    def UpdateOne(self, index: int, priority: float):
+        node = self.numOfLeaves + index
+        self.nodes[node] = priority
+        node //= 2
+        while node >= 1:
+            self.nodes[node] = self.nodes[2 * node] + self.nodes[2 * node + 1]
+            node //= 2
+
+    def Update(self, indices: np.ndarray, priorities: np.ndarray):
+        # Updates many priorities at once. Each level is recalculated with one array operation
+        self.nodes[self.numOfLeaves + indices] = priorities
+        nodes = np.unique((self.numOfLeaves + indices) // 2)
+        while len(nodes) > 0:
+            self.nodes[nodes] = self.nodes[2 * nodes] + self.nodes[2 * nodes + 1]
+            nodes = np.unique(nodes[nodes > 1] // 2) # Stop once the root is done
+
+    def Find(self, prefixSums: np.ndarray) -> np.ndarray:
+        # For each value in [0, Total()), returns the index of the leaf, at which the running sum of priorities exceeds that value
+        positions = np.ones(shape=(len(prefixSums)), dtype=np.int64)
+        remaining = np.array(prefixSums, dtype=np.float64)
+        while positions[0] < self.numOfLeaves: # All leaves are on the same level, so all positions descend in lockstep
+            left = 2 * positions
+            leftSums = self.nodes[left]
+            goRight = remaining >= leftSums
+            remaining -= leftSums * goRight
+            positions = left + goRight
+        return positions - self.numOfLeaves
\ No newline at end of file
@@ -0,0 +1,115 @@
+import socket
+import asyncio
+import threading
+import traceback # For debugging
+from typing import List
+from doppelkopf.utils.Console import Console
+from doppelkopf.game.GameTable import GameTable
+from doppelkopf.utils.SimpleMessaging import Message
+from doppelkopf.game.AsyncSocketSeat import AsyncSocketSeat
+
+# A Server, that hosts any number of tables on a single asyncio event loop. Every new Client is seated at the fullest table that still has a free seat,
+# and a new table is opened if there is none. Each table plays its games independently of the others (see GameTable), so a fleet of agents can play
+# hundreds of games at once. Clients connect exactly like they do to the threaded Server
+class AsyncServer():
+    THREAD_NAME_LOOP = "Thread_Event_Loop"
+
+    def __init__(self, name, host, port, deltaStates=False, maxTables=None):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.deltaStates = deltaStates # See Server
+        self.maxTables = maxTables # None for no limit
+        self.tables: List[GameTable] = []
+        self.tableTasks = {}
+        self.tableCounter = 0
+        self.loop: asyncio.AbstractEventLoop = None
+        self.stopEvent: asyncio.Event = None
+        self.started = threading.Event()
+        self.startError: Exception = None # Set if the socket could not be bound (e.g. because the port is in use)
+        self.threadLoop = None
+        self.lockStartStop = threading.Lock()
+        Console.WriteSuccess("Created", self.name)
+
+    def Start(self) -> bool:
+        with self.lockStartStop:
+            if self.threadLoop is not None:
+                return False
+            self.started.clear()
+            self.startError = None
+            self.threadLoop = threading.Thread(target=self.runLoop, name=AsyncServer.THREAD_NAME_LOOP)
+            self.threadLoop.start()
+            self.started.wait() # Return once the socket is bound
+            if self.startError is not None: # Raise the error to the caller, just like Server.Start() does
+                self.threadLoop.join()
+                self.threadLoop = None # So that the server can be started again
+                raise self.startError
+            return True
+
+    def runLoop(self):
+        try:
+            asyncio.run(self.Serve())
+        except Exception as error:
+            if error is not self.startError: # The start error is raised by Start() instead
+                Console.WriteError(traceback.format_exc(), self.name)
+
+    def Stop(self) -> bool:
+        with self.lockStartStop:
+            if self.threadLoop is None:
+                return False
+            self.loop.call_soon_threadsafe(self.stopEvent.set)
+            self.threadLoop.join()
+            self.threadLoop = None
+            return True
+
+    async def Serve(self):
+        # Runs until Stop() is called. Can also be awaited directly, if the caller already has an event loop
+        self.loop = asyncio.get_running_loop()
+        self.stopEvent = asyncio.Event()
+        try:
+            server = await asyncio.start_server(self.onClientConnected, self.host, self.port, family=socket.AF_INET)
+        except Exception as error:
+            self.startError = error
+            raise
+        finally:
+            self.started.set()
+        Console.WriteSuccess("Started on host '%s' port %d" % (self.host, self.port), self.name)
+        async with server:
+            await self.stopEvent.wait()
+        for task in self.tableTasks.values():
+            task.cancel()
+        await asyncio.gather(*self.tableTasks.values(), return_exceptions=True)
+        self.tables.clear()
+        self.tableTasks.clear()
+        Console.WriteSuccess("Stopped", self.name)
+
+    def NumOfGamesCompleted(self) -> int:
+        return sum(table.gamesCompleted for table in self.tables)
+
+    #region Lobby
+    def findTable(self) -> GameTable:
+        for table in [table for table in self.tables if self.tableTasks[table].done()]: # Forget tables that have crashed
+            self.tables.remove(table)
+            del self.tableTasks[table]
+        openTables = [table for table in self.tables if not table.IsFull()]
+        if len(openTables) > 0:
+            return max(openTables, key=lambda table: table.NumOfSeatsTaken()) # Fill up tables before opening new ones, so that games start as early as possible
+        if self.maxTables is not None and len(self.tables) >= self.maxTables:
+            return None
+        table = GameTable(self.tableCounter)
+        self.tableCounter += 1
+        self.tables.append(table)
+        self.tableTasks[table] = asyncio.create_task(table.Run())
+        return table
+
+    async def onClientConnected(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        seat = AsyncSocketSeat(reader, writer, self.deltaStates)
+        table = self.findTable()
+        if table is None: # If there is no available seat and no new table may be opened
+            Console.WriteWarning("All tables are full, rejecting %s" % str(seat.address), self.name)
+            seat.send(Message.DISCONNECT) # Inform client to disconnect this connection
+            await seat.Drain()
+            seat.Close()
+            return
+        table.Join(seat)
+    #endregion
\ No newline at end of file
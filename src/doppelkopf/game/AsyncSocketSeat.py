@@ -0,0 +1,42 @@
+import asyncio
+from doppelkopf.game.GameState import GameState
+from doppelkopf.game.SocketSeat import SocketSeat
+from doppelkopf.utils.SimpleMessaging import Message
+from doppelkopf.utils.SimpleMessaging import MessageType
+from doppelkopf.utils.SimpleMessaging import WireProtocol
+
+# A SocketSeat for the AsyncServer. Messages are written to the stream's buffer without blocking, only the chosen card is awaited
+class AsyncSocketSeat(SocketSeat):
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, deltaStates: bool = False):
+        super(AsyncSocketSeat, self).__init__(writer.get_extra_info('socket'), deltaStates)
+        self.reader = reader
+        self.writer = writer
+        self.address = writer.get_extra_info('peername')
+
+    def send(self, message: Message):
+        self.writer.write(WireProtocol.Encode(message))
+
+    async def Drain(self):
+        await self.writer.drain() # Wait until the buffered messages have (mostly) been sent
+
+    async def ReceiveMessage(self) -> Message:
+        # Raises asyncio.IncompleteReadError if the Client disconnected and ValueError if it sent garbage
+        header = await self.reader.readexactly(WireProtocol.HEADER.size)
+        messageType, payloadSize = WireProtocol.DecodeHeader(header)
+        payload = await self.reader.readexactly(payloadSize) if payloadSize > 0 else b''
+        return Message(messageType, WireProtocol.DecodePayload(messageType, payload))
+
+    def RequestCard(self, state: GameState, trickIndex: int) -> int:
+        raise RuntimeError("An AsyncSocketSeat can only be played with GameEngine.PlayGameAsync()")
+
+    async def RequestCardAsync(self, state: GameState, trickIndex: int) -> int:
+        await self.Drain()
+        message = await self.ReceiveMessage() # Recv() chosen card
+        while self.HandleSubscription(message):
+            message = await self.ReceiveMessage()
+        if message.messageType != MessageType.CHOSEN_CARD:
+            raise ValueError("Expected a message of type %s, but got %s instead" % (MessageType.CHOSEN_CARD, message.messageType))
+        return message.GetData()
+
+    def Close(self):
+        self.writer.close()
\ No newline at end of file
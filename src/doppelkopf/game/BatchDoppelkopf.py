@@ -0,0 +1,164 @@
+import numpy as np
+from typing import Tuple
+from doppelkopf.game.Card import Card
+from doppelkopf.game.GameState import GameState
+from doppelkopf.game.LegalMasks import LegalMasks
+from doppelkopf.game.GameStateBatch import GameStateBatch
+from doppelkopf.game.Doppelkopf import Doppelkopf
+from doppelkopf.game.CardFeedback import CardFeedback
+
+# Plays many games of Doppelkopf in lockstep. Instead of Player, Team and Card objects, all games are held in numpy arrays, so that every move is made in all games at once
+# Typical use: obs = Observations() -> one DNN.QValues(obs) call for all games -> mask with LegalMasks() -> Step(argmax) -> repeat until IsDone()
+class BatchDoppelkopf():
+    NUM_PLAYERS = Doppelkopf.MAX_PLAYERS_IN_GAME
+    DECK_CARDTYPES = np.repeat(np.arange(Card.NUM_CARDTYPES), 2) # Every cardType is in the deck twice: [0, 0, 1, 1, ..., 23, 23]
+    DECK_COPY = np.tile(np.arange(2), Card.NUM_CARDTYPES) # Whether a deck position is the first (0) or the second (1) copy of its cardType
+
+    def __init__(self, numOfGames: int, seed=None):
+        self.numOfGames = numOfGames
+        self.rng = np.random.default_rng(seed)
+        self.gameIndices = np.arange(numOfGames)
+        self.hands = np.zeros(shape=(numOfGames, BatchDoppelkopf.NUM_PLAYERS, Card.NUM_CARDTYPES), dtype=np.int8) # Number of cards of each cardType held by each player (0-2)
+        self.cardSupply = np.zeros(shape=(numOfGames, Card.NUM_CARDTYPES), dtype=np.int8) # Number of cards of each cardType that have not been played yet
+        self.stack = np.full(shape=(numOfGames, Doppelkopf.MAX_CARDS_PER_TRICK), fill_value=-1, dtype=np.int64) # cardTypes on the table, in the order they were played (-1 = empty)
+        self.stackSize = 0 # All games are in lockstep, so every stack holds the same number of cards
+        self.trickIndex = 0
+        self.leadingPlayers = np.zeros(shape=(numOfGames), dtype=np.int64) # Index of the player who started the current trick
+        self.currentPlayers = np.zeros(shape=(numOfGames), dtype=np.int64)
+        self.isRe = np.zeros(shape=(numOfGames, BatchDoppelkopf.NUM_PLAYERS), dtype=bool)
+        self.revealedRe = np.zeros(shape=(numOfGames, BatchDoppelkopf.NUM_PLAYERS), dtype=bool) # Players who have played a Queen of Clubs (and are thus known to be in team Re)
+        self.rePoints = np.zeros(shape=(numOfGames), dtype=np.int64)
+        self.kontraPoints = np.zeros(shape=(numOfGames), dtype=np.int64)
+        self.lastTrick: np.ndarray = None # The (N,4) stacks of the most recently completed trick
+        self.Reset()
+
+    def Reset(self):
+        self.dealCards()
+        self.cardSupply.fill(2) # All card types are in the deck twice
+        self.stack.fill(-1)
+        self.stackSize = 0
+        self.trickIndex = 0
+        self.leadingPlayers[:] = self.rng.integers(0, BatchDoppelkopf.NUM_PLAYERS, size=self.numOfGames) # Pick a random player to start the first trick
+        self.currentPlayers[:] = self.leadingPlayers
+        self.isRe[:] = self.hands[:, :, Card.QUEEN_OF_CLUBS_TYPE] > 0 # Whoever holds a Queen of Clubs is in team Re
+        self.revealedRe.fill(False)
+        self.rePoints.fill(0)
+        self.kontraPoints.fill(0)
+        self.lastTrick = None
+
+    def dealCards(self):
+        toDeal = self.gameIndices
+        while len(toDeal) > 0: # Reshuffle and re-deal until all dealt cards are valid
+            permutations = np.argsort(self.rng.random(size=(len(toDeal), len(BatchDoppelkopf.DECK_CARDTYPES))), axis=1) # One random permutation of the deck per game
+            dealtCardTypes = BatchDoppelkopf.DECK_CARDTYPES[permutations].reshape(len(toDeal), BatchDoppelkopf.NUM_PLAYERS, Doppelkopf.MAX_CARDS_PER_PLAYER)
+            hands = np.zeros(shape=(len(toDeal), BatchDoppelkopf.NUM_PLAYERS, Card.NUM_CARDTYPES), dtype=np.int8)
+            gameIndex, playerIndex, _ = np.indices(dealtCardTypes.shape)
+            np.add.at(hands, (gameIndex, playerIndex, dealtCardTypes), 1)
+            self.hands[toDeal] = hands
+            isInvalid = (hands[:, :, Card.QUEEN_OF_CLUBS_TYPE] == 2).any(axis=1) # A distribution is invalid if someone was dealt both Queens of Clubs
+            toDeal = toDeal[isInvalid]
+
+    def IsDone(self) -> bool:
+        return self.trickIndex >= Doppelkopf.MAX_CARDS_PER_PLAYER
+
+    def PlayOrders(self) -> np.ndarray:
+        return (self.leadingPlayers[:, np.newaxis] + np.arange(BatchDoppelkopf.NUM_PLAYERS)) % BatchDoppelkopf.NUM_PLAYERS # (N,4) player indices in the order they play in the current trick
+
+    def TeamAffiliations(self, playerIndices: np.ndarray) -> np.ndarray:
+        # Mirrors GameEngine.constructTeamAffiliations: Per position on the table, 1 for thyself or a known teammate, 0 otherwise.
+        # Teammates only become known to a Re player once the teammate plays a Queen of Clubs, Kontra players never learn about their teammate
+        playOrders = self.PlayOrders()
+        isSelf = playOrders == playerIndices[:, np.newaxis]
+        isObserverRe = self.isRe[self.gameIndices, playerIndices][:, np.newaxis]
+        isKnownRe = np.take_along_axis(self.revealedRe, playOrders, axis=1)
+        return (isSelf | (isObserverRe & isKnownRe)).astype(np.float32)
+
+    def Observations(self, playerIndices: np.ndarray = None) -> np.ndarray:
+        # (N,416) states in the layout of GameState.Flat(). The hand is listed ordered by cardType, rather than in the order it was dealt
+        if playerIndices is None:
+            playerIndices = self.currentPlayers
+        observations = np.zeros(shape=(self.numOfGames, GameState.SIZE_STATE), dtype=np.float32)
+        # # # # # # # # # # # # # # # Player deck # # # # # # # # # # # # # # #
+        hands = self.hands[self.gameIndices, playerIndices] # (N,24)
+        isHeld = hands[:, BatchDoppelkopf.DECK_CARDTYPES] > BatchDoppelkopf.DECK_COPY # (N,48): Whether the first/second copy of each cardType is in the hand
+        order = np.argsort(~isHeld, axis=1, kind="stable")[:, :Doppelkopf.MAX_CARDS_PER_PLAYER] # Deck positions of the held cards first, in cardType order
+        isSlotUsed = np.take_along_axis(isHeld, order, axis=1)
+        gameIndex, slotIndex = np.nonzero(isSlotUsed)
+        slotCardTypes = BatchDoppelkopf.DECK_CARDTYPES[order[gameIndex, slotIndex]]
+        observations[gameIndex, GameState.RANGE_START["playerDeck"] + slotIndex * Card.NUM_CARDTYPES + slotCardTypes] = 1
+        # # # # # # # # # # # # # # # Current stack # # # # # # # # # # # # # # #
+        for i in range(self.stackSize):
+            observations[self.gameIndices, GameState.RANGE_START["currentStack"] + i * Card.NUM_CARDTYPES + self.stack[:, i]] = 1
+        # # # # # # # # # # # # # # # Current player, card supply and team affiliations # # # # # # # # # # # # # # #
+        observations[self.gameIndices, GameState.RANGE_START["currentPlayer"] + self.currentPlayers] = 1
+        observations[:, GameState.RANGE_START["cardSupply"]:GameState.RANGE_END["cardSupply"]] = self.cardSupply
+        observations[:, GameState.RANGE_START["teamAffiliations"]:GameState.RANGE_END["teamAffiliations"]] = self.TeamAffiliations(playerIndices)
+        return observations
+
+    def StateBatch(self, playerIndices: np.ndarray = None) -> GameStateBatch:
+        # The observations of Observations(), along with the current legal masks (legal masks only apply to the current players)
+        legalMasks = self.LegalMasks() if playerIndices is None or np.array_equal(playerIndices, self.currentPlayers) else None
+        stateIndex = self.trickIndex * Doppelkopf.MAX_STATES_PER_TRICK + self.stackSize
+        return GameStateBatch(self.Observations(playerIndices), np.full(shape=(self.numOfGames), fill_value=stateIndex), legalMasks)
+
+    def followMasks(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Returns which cardTypes follow the leading card (N,24) and whether the current player is able to follow at all (N,)
+        hands = self.hands[self.gameIndices, self.currentPlayers]
+        if self.stackSize == 0: # The leading player may play anything
+            return np.ones(shape=hands.shape, dtype=bool), np.ones(shape=(self.numOfGames), dtype=bool)
+        follows = Doppelkopf.FOLLOWS[self.stack[:, 0]]
+        canFollow = ((hands > 0) & follows).any(axis=1)
+        return follows, canFollow
+
+    def LegalMasks(self) -> np.ndarray:
+        # Same as Doppelkopf.getLegalPlayableMask(), for the current player of every game
+        return LegalMasks.ForCounts(self.hands[self.gameIndices, self.currentPlayers], self.stack[:, 0])
+
+    def Feedback(self, cardTypes: np.ndarray) -> np.ndarray:
+        # Same as Player.getFeedback(), for the current player of every game. Returns the CardFeedback values as ints
+        hasCard = self.hands[self.gameIndices, self.currentPlayers, cardTypes] > 0
+        follows, canFollow = self.followMasks()
+        feedback = np.full(shape=(self.numOfGames), fill_value=CardFeedback.NOT_ALLOWED.value, dtype=np.int64)
+        feedback[follows[self.gameIndices, cardTypes]] = CardFeedback.OK.value
+        if self.stackSize > 0:
+            feedback[~canFollow] = CardFeedback.OK_COULD_NOT_FOLLOW_SUIT.value
+        feedback[~hasCard] = CardFeedback.NOT_IN_HAND.value
+        return feedback
+
+    def Step(self, cardTypes: np.ndarray):
+        # Plays one card in every game. Returns the trick winners' indices and the trick values once the trick is completed, (None, None) otherwise
+        cardTypes = np.asarray(cardTypes, dtype=np.int64)
+        feedback = self.Feedback(cardTypes)
+        isOk = (feedback == CardFeedback.OK.value) | (feedback == CardFeedback.OK_COULD_NOT_FOLLOW_SUIT.value)
+        if not isOk.all():
+            raise ValueError("Illegal cards in %d game(s), e.g. game %d: cardType %d" % (np.count_nonzero(~isOk), np.argmin(isOk), cardTypes[np.argmin(isOk)]))
+        self.hands[self.gameIndices, self.currentPlayers, cardTypes] -= 1
+        self.cardSupply[self.gameIndices, cardTypes] -= 1
+        self.stack[:, self.stackSize] = cardTypes
+        self.stackSize += 1
+        self.revealedRe[self.gameIndices, self.currentPlayers] |= cardTypes == Card.QUEEN_OF_CLUBS_TYPE
+        self.currentPlayers = (self.currentPlayers + 1) % BatchDoppelkopf.NUM_PLAYERS
+        if self.stackSize < Doppelkopf.MAX_CARDS_PER_TRICK:
+            return None, None
+        # # # # # # # # # # # # # # # Resolve the completed trick # # # # # # # # # # # # # # #
+        trickWinners = (self.leadingPlayers + Doppelkopf.TrickWinners(self.stack)) % BatchDoppelkopf.NUM_PLAYERS
+        trickValues = Card.VALUES[self.stack].sum(axis=1)
+        isReTrick = self.isRe[self.gameIndices, trickWinners]
+        self.rePoints += np.where(isReTrick, trickValues, 0)
+        self.kontraPoints += np.where(isReTrick, 0, trickValues)
+        self.lastTrick = self.stack.copy()
+        self.stack.fill(-1)
+        self.stackSize = 0
+        self.trickIndex += 1
+        self.leadingPlayers = trickWinners # The winner of this trick may start the next trick
+        self.currentPlayers = trickWinners.copy()
+        return trickWinners, trickValues
+
+    def IsReWinner(self) -> np.ndarray:
+        return self.rePoints > Doppelkopf.HALF_POINTS # Same as Doppelkopf.GetWinner(): Re needs more than half of the points
+
+    def IsGameWinner(self) -> np.ndarray:
+        return self.isRe == self.IsReWinner()[:, np.newaxis] # (N,4)
+
+    def Scores(self) -> np.ndarray:
+        return np.where(self.isRe, self.rePoints[:, np.newaxis], self.kontraPoints[:, np.newaxis]) # (N,4) Score of each player's team
\ No newline at end of file
@@ -0,0 +1,62 @@
+import numpy as np
+from typing import List
+from doppelkopf.game.Card import Card
+from doppelkopf.game.Seat import Seat
+from doppelkopf.game.Player import Player
+from doppelkopf.game.SeatType import SeatType
+from doppelkopf.game.GameState import GameState
+from doppelkopf.game.CardFeedback import CardFeedback
+
+# A Seat played by a built-in policy right on the Server's Player object: no Client, no messages and no states.
+# The policies are the same as those of RulebasedPlayer and RandomPlayer, they only need the hand and the leading card of the current trick
+class BotSeat(Seat):
+    def __init__(self, player: Player, seatType: SeatType):
+        if seatType == SeatType.REMOTE:
+            raise ValueError("A BotSeat needs a built-in policy, not %s" % seatType)
+        self.player = player # The Server's own player, the GameEngine keeps its hand up to date
+        self.seatType = seatType
+        self.remainingGames = float("inf") # Bots never run out of games (see Server.PlayGames())
+        self.leadingCard: Card = None
+        self.chosenCard: Card = None
+        self.wrongCardTypes: List[int] = []
+
+    def WantsStates(self) -> bool:
+        return False
+
+    def WantsRequestState(self) -> bool:
+        return False
+
+    def SendHand(self, cards: List[Card]):
+        self.leadingCard = None
+
+    def SendState(self, state: GameState, isFinalState: bool):
+        pass
+
+    def RequestCard(self, state: GameState, trickIndex: int) -> int:
+        if self.seatType == SeatType.RULEBASED:
+            self.chosenCard = self.player.tryFollowSuit(self.leadingCard) # To keep this game going, pick only valid cards
+        else:
+            cardTypes = [i for i in range(Card.NUM_CARDTYPES) if i not in self.wrongCardTypes] # List of all cardTypes that haven't been tried yet
+            self.chosenCard = self.player.tryGetCardFromHand(cardTypes[int(np.random.uniform(high=len(cardTypes)))])
+        return self.chosenCard.cardType
+
+    def SendFeedback(self, feedback: CardFeedback):
+        if feedback == CardFeedback.OK or feedback == CardFeedback.OK_COULD_NOT_FOLLOW_SUIT:
+            self.wrongCardTypes = []
+            if self.leadingCard is None:
+                self.leadingCard = self.chosenCard
+        else:
+            self.wrongCardTypes.append(self.chosenCard.cardType)
+
+    def SendCardPlayed(self, currentPlayerIndex: int, cardType: int, queenCounter: int):
+        if self.leadingCard is None:
+            self.leadingCard = Card.CARDTYPES[cardType]
+
+    def SendWasQueen(self, currentPlayerIndex: int, wasQueen: bool, queenCounter: int):
+        pass # The GameEngine already updates the perception of the Server's players
+
+    def SendTrickCompleted(self, isTrickWinner: bool, isTeamMateTrickWinner: bool, trickValue: int):
+        self.leadingCard = None
+
+    def SendGameCompleted(self, isGameWinner: bool, score: int):
+        pass
\ No newline at end of file
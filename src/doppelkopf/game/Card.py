@@ -94,4 +94,11 @@ Card.CARDTYPES = [
     Card(23, Card.suits[2], 9, 3, 0, False), #"9 of Hearts"
 ]
 
-Card.HIGHEST_CARD_VALUE = max(card.value for card in Card.CARDTYPES)
\ No newline at end of file
+Card.HIGHEST_CARD_VALUE = max(card.value for card in Card.CARDTYPES)
+# Per-cardType lookup arrays (indexed by cardType) for code that works on card types instead of Card objects
+Card.SUIT_INDICES = np.array([Card.suits.index(card.suit) for card in Card.CARDTYPES], dtype=np.int64) # 0 = Clubs, 1 = Spades, 2 = Hearts, 3 = Diamonds
+Card.IS_TRUMP = np.array([card.isTrump for card in Card.CARDTYPES], dtype=bool)
+Card.RANKS = np.array([card.rank for card in Card.CARDTYPES], dtype=np.int64)
+Card.VALUES = np.array([card.value for card in Card.CARDTYPES], dtype=np.int64)
+Card.TRUMP_SUIT_INDEX = len(Card.suits) # All trumps are treated as one additional suit when it comes to following suit
+Card.TRICK_SUITS = np.where(Card.IS_TRUMP, Card.TRUMP_SUIT_INDEX, Card.SUIT_INDICES) # The 'suit' a card demands to be followed with (trumps demand trumps)
\ No newline at end of file
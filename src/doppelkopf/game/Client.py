@@ -12,18 +12,28 @@ from doppelkopf.game.GameState import GameState
 from doppelkopf.game.Doppelkopf import Doppelkopf
 from doppelkopf.utils.SimpleMessaging import Message
 from doppelkopf.game.CardFeedback import CardFeedback
+from doppelkopf.game.GameStateMirror import GameStateMirror
 from doppelkopf.utils.SimpleMessaging import MessageType
 from doppelkopf.utils.SimpleMessaging import MessageStatus
 from doppelkopf.utils.SimpleMessaging import SimpleMessaging
+from doppelkopf.utils.SimpleMessaging import MessageReceiver
 
 class Client():
+    SUBSCRIPTION_SIZE = 10 # Games are subscribed to in batches. Stop() cancels the rest of the batch (see unsubscribe())
+
     def __init__(self, onCardRequested, onPlayerReceived=None, onPlayerListReceived=None, onGameStarted=None, onCardWasOk=None, onCardWasNotOk=None, onStateReceived=None, onTrickCompleted=None, onGameCompleted=None):
         self.mySocket = None
+        self.receiver: MessageReceiver = None # Reuses its buffer for all messages from the Server
+        self.localServer = None
         self.name = ""
         self.myPlayer: Player = None
         self.players: List[Player] = None
         self.teamRe: Team = None
         self.teamKontra: Team = None
+        self.mirror: GameStateMirror = None # Rebuilds the states if the Server only streams deltas
+        self.subscribedGames = 0 # The number of games the Server will still start for us without being asked again
+        self.isUnsubscribing = False # Whether we cancelled our subscription, but the Server has not answered yet
+        self.numOfGamesRequested = None
         if onCardRequested is None:
             raise RuntimeError("onCardRequested must not be None!")
         self.onCardRequested = onCardRequested # Callback function when the client needs to pick a card. Can't be None
@@ -33,6 +43,7 @@ class Client():
         self.onCardWasOk = onCardWasOk if onCardWasOk is not None else self.noop # Callback function when the chosen card was OK
         self.onCardWasNotOk = onCardWasNotOk if onCardWasNotOk is not None else self.noop # Callback function when the chosen card was not OK
         self.onStateReceived = onStateReceived if onStateReceived is not None else self.noop # Callback function when a game state is received
+        self.wantsStates = onStateReceived is not None # In-process servers skip building states for clients that never look at them
         self.onTrickCompleted = onTrickCompleted if onTrickCompleted is not None else self.noop # Callback function when a trick is completed
         self.onGameCompleted = onGameCompleted if onGameCompleted is not None else self.noop # Callback function when a game is completed
         # # # # # # # # # # # # # # # Counter # # # # # # # # # # # # # # #
@@ -52,22 +63,52 @@ class Client():
         # # # # # # # # # # # # # # # Connect to Server # # # # # # # # # # # # # # #
         self.mySocket = socket.socket(family=socket.AF_INET, type=socket.SOCK_STREAM)
         self.mySocket.setblocking(True)
+        SimpleMessaging.SetNoDelay(self.mySocket)
         self.mySocket.connect((host, port))
+        self.receiveSeat()
+
+    def ConnectInProcess(self, server):
+        # # # # # # # # # # # # # # # Connect to a Server in the same process through queues instead of a socket # # # # # # # # # # # # # # #
+        self.mySocket = server.ConnectInProcess()
+        self.receiveSeat()
+
+    def receiveSeat(self):
+        self.receiver = MessageReceiver(self.mySocket)
+        self.subscribedGames = 0 # A new seat comes without any subscription
+        self.isUnsubscribing = False
         # # # # # # # # # # # # # # # Receive 'this' player object # # # # # # # # # # # # # # #
-        self.myPlayer = SimpleMessaging.ReceiveMessageData(self.mySocket, MessageType.PLAYER_OBJECT) # Recv() player object
+        # The Server only sends indices and counts, the player and team objects are rebuilt locally
+        playerIndex = SimpleMessaging.ReceiveMessageData(self.receiver, MessageType.PLAYER_OBJECT) # Recv() player index
+        numOfPlayers = SimpleMessaging.ReceiveMessageData(self.receiver, MessageType.PLAYERLIST) # Recv() number of players
+        self.players = Player.createPlayers()
+        if numOfPlayers != len(self.players) or playerIndex >= numOfPlayers:
+            raise ValueError("Server sent player %d of %d, expected one of %d players" % (playerIndex, numOfPlayers, len(self.players)))
+        for player in self.players:
+            player.perceiveOtherPlayers(self.players) # Make each player aware of the others
+        self.myPlayer = self.players[playerIndex]
         self.name = "%s (Client %d)" % (self.myPlayer.name, self.myPlayer.index)
         Console.WriteDebug("This client is %s" % (self.myPlayer), self.name)
         self.onPlayerReceived(player=self.myPlayer) # Inform callback of player object
-        # # # # # # # # # # # # # # # Receive list of other players # # # # # # # # # # # # # # #
-        self.players = SimpleMessaging.ReceiveMessageData(self.mySocket, MessageType.PLAYERLIST) # Recv() player list
         Console.WriteDebug("Received players list from server: %s" %(self.players), self.name)
-        #self.myPlayer.perceiveOtherPlayers(self.players) # Perceive list of other players
         self.onPlayerListReceived(playerList=self.players) # Inform callback of player list
-        # # # # # # # # # # # # # # # Receive list of other players # # # # # # # # # # # # # # #
-        self.teamRe, self.teamKontra = SimpleMessaging.ReceiveMessageData(self.mySocket, MessageType.TEAMS) # Recv() and unpack teams-tuple
+        # # # # # # # # # # # # # # # Receive teams # # # # # # # # # # # # # # #
+        SimpleMessaging.ReceiveMessageData(self.receiver, MessageType.TEAMS) # Recv() the (empty) teams message
+        self.teamRe, self.teamKontra = Team.createTeams()
         Console.WriteDebug("Received teams from server: %s and %s" % (self.teamRe, self.teamKontra), self.name)
+        self.mirror = GameStateMirror(self.myPlayer, self.players)
         Console.WriteSuccess("Connected to server as player %d (%s)" % (self.myPlayer.index, self.myPlayer.name), self.name)
 
+    def ConnectLocal(self, localServer, player: Player, players: List[Player], teams: tuple):
+        # # # # # # # # # # # # # # # Take a seat at an in-process server (no socket involved) # # # # # # # # # # # # # # #
+        self.localServer = localServer
+        self.myPlayer = player
+        self.name = "%s (Client %d)" % (self.myPlayer.name, self.myPlayer.index)
+        self.onPlayerReceived(player=self.myPlayer) # Inform callback of player object
+        self.players = players
+        self.onPlayerListReceived(playerList=self.players) # Inform callback of player list
+        self.teamRe, self.teamKontra = teams
+        Console.WriteSuccess("Connected to %s as player %d (%s)" % (localServer.name, self.myPlayer.index, self.myPlayer.name), self.name)
+
     def Stop(self):
         with self.lockStopFlag: # Acquire lock before touching the stop flag
             self.stopFlag = True
@@ -83,11 +124,12 @@ class Client():
         self.gamesLostCounter = 0
         if numOfGames is not None and numOfGames <= 0: # If we are given an invalid number of games (zero or negative numbers)
             return False
+        self.numOfGamesRequested = numOfGames
         gameCounter = 1
         abort = False
         while True:
             with self.lockStopFlag:
-                if self.stopFlag:
+                if self.stopFlag and self.subscribedGames == 0: # Games that were already subscribed to are still played, since the Server starts them anyway
                     break # Break out of loop
             if numOfGames is not None and gameCounter > numOfGames: # If we have played as many games as requested
                 break # Break out of loop
@@ -112,121 +154,188 @@ class Client():
         return not abort # True if not aborted, False if aborted
 
     def PlayGame(self, g):
+        if self.localServer is not None: # If this client is seated at an in-process LocalServer, the LocalServer plays the whole game and calls our handlers directly
+            return self.localServer.PlayGame()
         try:
-            Doppelkopf.ResetBeforeGame(self.players, self.teamRe, self.teamKontra) # Before the game starts, reset() all player- and team-objects
-            ready = False
-            disconnect = False
-            selfShutdown = False
-            while not ready and not disconnect and not selfShutdown:
-                with self.lockStopFlag:
-                    if self.stopFlag:
-                        selfShutdown = True
-                SimpleMessaging.SendMessage(self.mySocket, Message.READY_TO_PLAY)
-                response = SimpleMessaging.ReceiveMessage(self.mySocket) # Wait for Server to respond
-                if response.messageType == MessageType.NOT_YET_READY:
-                    ready = False
-                elif response.messageType == MessageType.READY_TO_PLAY:
-                    ready = True
-                elif response.messageType == MessageType.DISCONNECT:
-                    disconnect = True
-                else:
-                    Console.WriteError("Unexpected message from Server: %s" % response, self.name)
-            if disconnect:
-                Console.WriteDebug("The Server is about to disconnect! Exiting game loop", self.name)
-                return False # Break out of the game loop
-            if selfShutdown:
+            if self.subscribedGames == 0:
+                self.subscribe(g)
+            if self.subscribedGames == 0: # If we were told to stop before subscribing
                 Console.WriteDebug("I was told to stop, so I stop!", self.name)
                 return False
-            Console.WriteDebug("The Server is ready to play another round", self.name)
+            if self.subscribedGames == 1: # Renew the subscription ahead of time, so that the Server can start the next game without waiting for us
+                self.subscribe(g + 1)
+            elif self.isStopped(): # Stop() takes effect after the current game, instead of after the whole subscription
+                self.unsubscribe()
             Console.WriteDebug("Starting game %d" % (g), self.name)
-            self.onGameStarted() # Callback
-            gameState = None
             # # # # # # # # # # # # # # # Receive cards from Server # # # # # # # # # # # # # # #
-            cards = SimpleMessaging.ReceiveMessageData(self.mySocket, MessageType.PLAYER_HAND) # Recv() player hand
+            expectedTypes = (MessageType.PLAYER_HAND, MessageType.NOT_YET_READY, MessageType.UNSUBSCRIBE, MessageType.DISCONNECT)
+            message = SimpleMessaging.ReceiveMessageOfTypes(self.receiver, expectedTypes) # Recv() player hand
+            while message.messageType == MessageType.NOT_YET_READY: # The table is incomplete, so the Server asks whether we are still waiting
+                if self.isStopped():
+                    self.unsubscribe()
+                SimpleMessaging.SendMessage(self.mySocket, Message.READY_TO_PLAY) # Every reminder is answered exactly once
+                message = SimpleMessaging.ReceiveMessageOfTypes(self.receiver, expectedTypes)
+            if message.messageType == MessageType.UNSUBSCRIBE: # The Server will not start another game for us
+                Console.WriteDebug("My subscription was cancelled, so I stop!", self.name)
+                self.subscribedGames = 0
+                self.isUnsubscribing = False
+                return True
+            if message.messageType == MessageType.DISCONNECT:
+                Console.WriteDebug("The Server is about to disconnect! Exiting game loop", self.name)
+                self.subscribedGames = 0 # The Server dropped our seat together with the subscription
+                return False # Break out of the game loop
+            cards = message.GetData()
             Console.WriteDebug("Received cards from server", self.name)
-            self.myPlayer.handCards(cards, self.teamRe, self.teamKontra)
+            self.receiveHand(cards)
+            self.mirror.Reset()
             for trickIndex in range(Doppelkopf.MAX_CARDS_PER_PLAYER): # Loop over the number of tricks
                 Console.WriteDebug("Starting trick %d" % (trickIndex + 1), self.name)
+                self.mirror.BeginTrick()
                 for _ in range(4): # Iterate over all 4 player moves within a trick
                     # # # # # # # # # # # # # # # Receive current game state from Server # # # # # # # # # # # # # # #
-                    gameState: GameState = SimpleMessaging.ReceiveMessageData(self.mySocket, MessageType.GAME_STATE) # Recv() Game State
+                    gameState: GameState = self.receiveSocketState() # Recv() Game State (or the delta to build it from)
                     Console.WriteDebug("Received GameState from server", self.name)
-                    self.onStateReceived(state=gameState, isFinalState=False) # Callback
+                    self.receiveState(gameState, isFinalState=False)
                     if gameState.currentPlayerIndex == self.myPlayer.index: # If it's this client's turn
-                        chosenCard = None
                         Console.WriteDebug("It seems to be my turn to pick a card", "Client #%d" % (self.myPlayer.index))
                         wrongCardTypes = []
                         while True:
-                            chosenCard = self.onCardRequested(state=gameState, wrongCardTypes=wrongCardTypes) # Callback
-                            if chosenCard.cardType in wrongCardTypes:
-                                Console.WriteError("The Agent picked a card (%s - %d) even though it was clearly forbidden by wrongCardTypes! Check your agent!" % (chosenCard, chosenCard.cardType), self.name)
-                                Console.WriteInfo("All cardTypes that are forbidden: ", self.name)
-                                for cardType in wrongCardTypes:
-                                    Console.WriteInfo("Forbidden cardType %d" % (cardType), self.name)
+                            chosenCard = self.chooseCard(gameState, wrongCardTypes)
                             # # # # # # # # # # # # # # # Send chosen card # # # # # # # # # # # # # # #
                             SimpleMessaging.SendMessage(self.mySocket, Message(MessageType.CHOSEN_CARD, chosenCard.cardType)) # Send() the chosen card type
                             Console.WriteDebug("Sent the chosen card %s to the Server!" %(chosenCard), self.name)
-                            self.cardsPickedCounter += 1
                             # # # # # # # # # # # # # # # Receive card feedback from Server # # # # # # # # # # # # # # #
-                            feedback = SimpleMessaging.ReceiveMessageData(self.mySocket, MessageType.CARDFEEDBACK) # Recv() Card Feedback
+                            feedback = SimpleMessaging.ReceiveMessageData(self.receiver, MessageType.CARDFEEDBACK) # Recv() Card Feedback
                             Console.WriteDebug("Received feedback from Server", self.name)
-                            if feedback == CardFeedback.NOT_ALLOWED or feedback == CardFeedback.NOT_IN_HAND:
-                                self.onCardWasNotOk(state=gameState, card=chosenCard, feedback=feedback, trickIndex=trickIndex) # Callback
-                                Console.WriteDebug("Card %s was not OK: %s. Adding it to the wrongCardTypes list" % (chosenCard, feedback), self.name)
-                                if feedback == CardFeedback.NOT_IN_HAND:
-                                    self.notInHandCounter += 1
-                                elif feedback == CardFeedback.NOT_ALLOWED:
-                                    self.notAllowedCounter += 1
-                                wrongCardTypes.append(chosenCard.cardType)
-                            else:
-                                self.onCardWasOk(state=gameState, card=chosenCard, feedback=feedback) # Callback
-                                Console.WriteDebug("Card %s was %s" % (chosenCard, feedback), self.name)
-                                self.okCardCounter += 1
-                                if not self.myPlayer.removeFirstOccurrence(chosenCard.cardType):
-                                    Console.WriteError("Failed to remove card from hand", self.name)
+                            if self.receiveFeedback(gameState, chosenCard, feedback, trickIndex, wrongCardTypes):
+                                self.mirror.CardPlayed(self.myPlayer.index, chosenCard.cardType)
                                 break # Break out of endless loop
-                        #gameState.currentStack.append(chosenCard) # Append the accepted card to stack
                     else: # If it is NOT our turn
-                        wasQueen, queenCounter = SimpleMessaging.ReceiveMessageData(self.mySocket, MessageType.WAS_QUEEN)
-                        if wasQueen: # If the current player actually played a Queen of Clubs
-                            self.myPlayer.perceiveTeam(self.players[gameState.currentPlayerIndex], self.teamRe) # Inform myPlayer that currentPlayer is team Re
-                            if queenCounter == 2 and self.myPlayer.team is self.teamKontra: # If both Queens have been played and iterPlayer is in team Kontra
-                                self.myPlayer.tryFindTeammate(self.teamRe, self.teamKontra)
+                        message = SimpleMessaging.ReceiveMessageOfTypes(self.receiver, (MessageType.WAS_QUEEN, MessageType.CARD_PLAYED))
+                        if message.messageType == MessageType.CARD_PLAYED:
+                            playerIndex, cardType, queenCounter = message.GetData()
+                            self.mirror.CardPlayed(playerIndex, cardType)
+                            self.receiveWasQueen(playerIndex, cardType == Card.QUEEN_OF_CLUBS_TYPE, queenCounter)
+                        else:
+                            wasQueen, queenCounter = message.GetData()
+                            self.receiveWasQueen(gameState.currentPlayerIndex, wasQueen, queenCounter)
                 # # # # # # # # # # # # # # # Receive final trick state # # # # # # # # # # # # # # #
-                finalTrickState: GameState = SimpleMessaging.ReceiveMessageData(self.mySocket, MessageType.GAME_STATE) # Recv() final game state
+                finalTrickState: GameState = self.receiveSocketState() # Recv() final game state
                 Console.WriteDebug("Received finalTrickState from server", self.name)
-                self.onStateReceived(state=finalTrickState, isFinalState=True)
+                self.receiveState(finalTrickState, isFinalState=True)
                 # # # # # # # # # # # # # # # Receive winner of this trick # # # # # # # # # # # # # # #
-                isTrickWinner: bool
-                isTeamMateTrickWinner: bool
-                isTrickWinner, isTeamMateTrickWinner, trickValue = SimpleMessaging.ReceiveMessageData(self.mySocket, MessageType.TRICK_COMPLETED) # Recv() index of winner of this trick
-                Console.WriteDebug("isTrickWinner: %s. isTeamMateTrickWinner: %s. TrickValue: %d" % (isTrickWinner, isTeamMateTrickWinner, trickValue), self.name)
-                if isTrickWinner:
-                    Console.WriteDebug("I won this trick!", self.name)
-                elif isTeamMateTrickWinner:
-                    Console.WriteDebug("My teammate won this trick!")
-                self.onTrickCompleted(isTrickWinner=isTrickWinner, isTeamMateTrickWinner=isTeamMateTrickWinner, trickValue=trickValue)
-            isGameWinner: bool
-            isGameWinner, score = SimpleMessaging.ReceiveMessageData(self.mySocket, MessageType.GAME_COMPLETED) # Recv() name of winner team of this game, along with the score of said team
-            if isGameWinner:
-                Console.WriteDebug("I'm part of the winning team!", self.name)
-                self.gamesWonCounter += 1
-            else:
-                Console.WriteDebug("Lost this one", self.name)
-                self.gamesLostCounter += 1
-            self.onGameCompleted(isGameWinner=isGameWinner, score=score)
-            self.gamesCompletedCounter += 1
+                isTrickWinner, isTeamMateTrickWinner, trickValue = SimpleMessaging.ReceiveMessageData(self.receiver, MessageType.TRICK_COMPLETED) # Recv() index of winner of this trick
+                self.receiveTrickCompleted(isTrickWinner, isTeamMateTrickWinner, trickValue)
+            isGameWinner, score = SimpleMessaging.ReceiveMessageData(self.receiver, MessageType.GAME_COMPLETED) # Recv() name of winner team of this game, along with the score of said team
+            self.receiveGameCompleted(isGameWinner, score)
+            self.subscribedGames -= 1
             return True
         except: # If an error is raised anywhere along the game:
             Console.WriteError(traceback.format_exc(), self.name)
             return False
+
+    def subscribe(self, firstGame: int):
+        # Subscribes to the next batch of games, starting with game number 'firstGame' of this PlayGames() call
+        with self.lockStopFlag:
+            if self.stopFlag:
+                return
+        numOfGames = Client.SUBSCRIPTION_SIZE
+        if self.numOfGamesRequested is not None:
+            numOfGames = min(numOfGames, self.numOfGamesRequested - firstGame + 1)
+        if numOfGames > 0:
+            SimpleMessaging.SendMessage(self.mySocket, Message(MessageType.SUBSCRIBE, numOfGames))
+            self.subscribedGames += numOfGames
+
+    def unsubscribe(self):
+        # Cancels the rest of the subscription. A game the Server has already started is still played, then the Server answers with UNSUBSCRIBE
+        if not self.isUnsubscribing:
+            SimpleMessaging.SendMessage(self.mySocket, Message.UNSUBSCRIBE)
+            self.isUnsubscribing = True
+
+    def isStopped(self) -> bool:
+        with self.lockStopFlag:
+            return self.stopFlag
+
+    def receiveSocketState(self) -> GameState:
+        message = SimpleMessaging.ReceiveMessageOfTypes(self.receiver, (MessageType.GAME_STATE, MessageType.STATE_DELTA))
+        if message.messageType == MessageType.STATE_DELTA: # Only the state's index and the current player were sent, the rest is known locally
+            stateIndex, currentPlayerIndex, isFinalState = message.GetData()
+            return self.mirror.State(stateIndex, currentPlayerIndex, isFinalState)
+        return message.GetData()
+
+    #region Handlers (called for every message of a game, regardless of whether it came from a socket or from a LocalServer)
+    def receiveHand(self, cards: List[Card]):
+        Doppelkopf.ResetBeforeGame(self.players, self.teamRe, self.teamKontra) # Before the game starts, reset() all player- and team-objects
+        self.onGameStarted() # Callback
+        self.myPlayer.handCards(cards, self.teamRe, self.teamKontra)
+
+    def receiveState(self, state: GameState, isFinalState: bool):
+        self.onStateReceived(state=state, isFinalState=isFinalState) # Callback
+
+    def chooseCard(self, state: GameState, wrongCardTypes: List[int]) -> Card:
+        chosenCard = self.onCardRequested(state=state, wrongCardTypes=wrongCardTypes) # Callback
+        if chosenCard.cardType in wrongCardTypes:
+            Console.WriteError("The Agent picked a card (%s - %d) even though it was clearly forbidden by wrongCardTypes! Check your agent!" % (chosenCard, chosenCard.cardType), self.name)
+            Console.WriteInfo("All cardTypes that are forbidden: ", self.name)
+            for cardType in wrongCardTypes:
+                Console.WriteInfo("Forbidden cardType %d" % (cardType), self.name)
+        self.cardsPickedCounter += 1
+        return chosenCard
+
+    def receiveFeedback(self, state: GameState, chosenCard: Card, feedback: CardFeedback, trickIndex: int, wrongCardTypes: List[int]) -> bool:
+        if feedback == CardFeedback.NOT_ALLOWED or feedback == CardFeedback.NOT_IN_HAND:
+            self.onCardWasNotOk(state=state, card=chosenCard, feedback=feedback, trickIndex=trickIndex) # Callback
+            Console.WriteDebug("Card %s was not OK: %s. Adding it to the wrongCardTypes list" % (chosenCard, feedback), self.name)
+            if feedback == CardFeedback.NOT_IN_HAND:
+                self.notInHandCounter += 1
+            elif feedback == CardFeedback.NOT_ALLOWED:
+                self.notAllowedCounter += 1
+            wrongCardTypes.append(chosenCard.cardType)
+            return False
+        self.onCardWasOk(state=state, card=chosenCard, feedback=feedback) # Callback
+        Console.WriteDebug("Card %s was %s" % (chosenCard, feedback), self.name)
+        self.okCardCounter += 1
+        if not self.myPlayer.removeFirstOccurrence(chosenCard.cardType):
+            Console.WriteError("Failed to remove card from hand", self.name)
+        return True
+
+    def receiveWasQueen(self, currentPlayerIndex: int, wasQueen: bool, queenCounter: int):
+        if wasQueen: # If the current player actually played a Queen of Clubs
+            self.myPlayer.perceiveTeam(self.players[currentPlayerIndex], self.teamRe) # Inform myPlayer that currentPlayer is team Re
+            if queenCounter == 2 and self.myPlayer.team is self.teamKontra: # If both Queens have been played and iterPlayer is in team Kontra
+                self.myPlayer.tryFindTeammate(self.teamRe, self.teamKontra)
+
+    def receiveTrickCompleted(self, isTrickWinner: bool, isTeamMateTrickWinner: bool, trickValue: int):
+        Console.WriteDebug("isTrickWinner: %s. isTeamMateTrickWinner: %s. TrickValue: %d" % (isTrickWinner, isTeamMateTrickWinner, trickValue), self.name)
+        if isTrickWinner:
+            Console.WriteDebug("I won this trick!", self.name)
+        elif isTeamMateTrickWinner:
+            Console.WriteDebug("My teammate won this trick!")
+        self.onTrickCompleted(isTrickWinner=isTrickWinner, isTeamMateTrickWinner=isTeamMateTrickWinner, trickValue=trickValue)
+
+    def receiveGameCompleted(self, isGameWinner: bool, score: int):
+        if isGameWinner:
+            Console.WriteDebug("I'm part of the winning team!", self.name)
+            self.gamesWonCounter += 1
+        else:
+            Console.WriteDebug("Lost this one", self.name)
+            self.gamesLostCounter += 1
+        self.onGameCompleted(isGameWinner=isGameWinner, score=score)
+        self.gamesCompletedCounter += 1
+    #endregion
         
     def Disconnect(self):
-        SimpleMessaging.SendMessage(self.mySocket, Message.DISCONNECT) # Inform server of our intention to disconnect
-        self.mySocket.close()
+        if self.localServer is not None:
+            self.localServer.Leave(self) # Free our seat at the in-process server
+            self.localServer = None
+        else:
+            SimpleMessaging.SendMessage(self.mySocket, Message.DISCONNECT) # Inform server of our intention to disconnect
+            self.mySocket.close()
+            self.receiver = None
         Console.WriteSuccess("Disconnected from Server", self.name)
         self.myPlayer = None
         self.players = None
+        self.mirror = None
         self.teamRe = None
         self.teamKontra = None
 
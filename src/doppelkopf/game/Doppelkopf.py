@@ -2,8 +2,8 @@ import numpy as np
 from typing import List
 from doppelkopf.game.Card import Card
 from doppelkopf.game.Player import Player
+from doppelkopf.game.LegalMasks import LegalMasks
 from doppelkopf.utils.Console import Console
-from doppelkopf.game.CardFeedback import CardFeedback
 
 class Doppelkopf():
     TOTAL_POINTS = 240
@@ -45,17 +45,29 @@ class Doppelkopf():
 
     @staticmethod
     def findBestCard(trickStack):
-        leadingCard = trickStack[0]
-        leadingSuit = leadingCard.suit # The first card played determines this trick's suit
-        bestCard = leadingCard # The first card's rank is automatically the best, unless one of the others is higher ranking or trumping
+        return Doppelkopf.TrickWinner([card.cardType for card in trickStack]) # Returns the index of the best card within the stack
+
+    @staticmethod
+    def TrickWinner(cardTypes) -> int:
+        leadingSuit = Card.SUIT_INDICES[cardTypes[0]] # The first card played determines this trick's suit
         bestCardIndex = 0 # The winner is, by default, the first player, unless someone else played a higher ranking (or trumping) card
-        for i in range(1, len(trickStack)): # Start at 1, since the first card has already been examined
-            card = trickStack[i]
-            if Doppelkopf.a_or_b(bestCard, card, leadingSuit) == card: #  if 'card' is better than 'best_card'
-                bestCard = card
+        for i in range(1, len(cardTypes)): # Start at 1, since the first card has already been examined
+            if Doppelkopf.BEATS[cardTypes[bestCardIndex], cardTypes[i], leadingSuit]: # If the i-th card beats the best card so far
                 bestCardIndex = i
         return bestCardIndex
 
+    @staticmethod
+    def TrickWinners(stacks: np.ndarray) -> np.ndarray:
+        # Same as TrickWinner(), but for many tricks at once: 'stacks' holds one trick (of cardTypes) per row
+        leadingSuits = Card.SUIT_INDICES[stacks[:, 0]]
+        bestCardIndices = np.zeros(shape=(len(stacks)), dtype=np.int64)
+        bestCardTypes = stacks[:, 0]
+        for i in range(1, stacks.shape[1]):
+            beats = Doppelkopf.BEATS[bestCardTypes, stacks[:, i], leadingSuits]
+            bestCardIndices = np.where(beats, i, bestCardIndices)
+            bestCardTypes = np.where(beats, stacks[:, i], bestCardTypes)
+        return bestCardIndices
+
     @staticmethod
     def a_or_b(a: Card, b: Card, leadingSuit):
         if a.isTrump and b.isTrump: # If both are trumps
@@ -65,8 +77,10 @@ class Doppelkopf():
                 return b if (b.rank < a.rank) else a
             elif a.suit == leadingSuit:
                 return a
-            elif b.suits == leadingSuit:
+            elif b.suit == leadingSuit:
                 return b
+            else: # If neither follows suit, the earlier card keeps the lead
+                return a
         elif a.isTrump and not b.isTrump:
             return a
         elif not a.isTrump and b.isTrump:
@@ -74,6 +88,16 @@ class Doppelkopf():
         Console.WriteError("Technically, neither card (%s or %s) won! Returning 'a' by default!" % (a, b), "Doppelkopf.a_or_b()")
         return a # Be default, a wins (this only happens if none of the above criteria applies here, which should never happen in the first place)
 
+    @staticmethod
+    def buildBeatsTable() -> np.ndarray:
+        beats = np.zeros(shape=(Card.NUM_CARDTYPES, Card.NUM_CARDTYPES, len(Card.suits)), dtype=bool)
+        for a in Card.CARDTYPES:
+            for b in Card.CARDTYPES:
+                for suitIndex, suit in enumerate(Card.suits):
+                    challenger = b.clone() # Use a clone, so that comparing a cardType to itself can be told apart
+                    beats[a.cardType, b.cardType, suitIndex] = Doppelkopf.a_or_b(a, challenger, suit) is challenger
+        return beats
+
     @staticmethod
     def GetTrickValue(trickStack):
         score = 0
@@ -99,9 +123,8 @@ class Doppelkopf():
 
     @staticmethod
     def getLegalPlayableMask(leadingCard: Card, player: Player) -> np.ndarray:
-        mask = np.zeros(len(Card.CARDTYPES), dtype=np.float32)
-        for card in Card.CARDTYPES:
-            feedback = player.getFeedback(card.cardType, leadingCard)
-            if feedback == CardFeedback.OK or feedback == CardFeedback.OK_COULD_NOT_FOLLOW_SUIT:
-                mask[card.cardType] = 1
-        return mask
\ No newline at end of file
+        return LegalMasks.ForHand(player.cards, leadingCard.cardType if leadingCard is not None else None) # Read-only, the mask is shared with everyone holding an equivalent hand
+
+# # # # # # # # # # # # # # # Lookup tables, built once from the rules in a_or_b() # # # # # # # # # # # # # # #
+Doppelkopf.BEATS = Doppelkopf.buildBeatsTable() # BEATS[a, b, s] is True if cardType b beats cardType a, given that suit s (see Card.SUIT_INDICES) was led
+Doppelkopf.FOLLOWS = Card.TRICK_SUITS[:, np.newaxis] == Card.TRICK_SUITS[np.newaxis, :] # FOLLOWS[leading, card] is True if playing cardType 'card' follows the suit of cardType 'leading'
\ No newline at end of file
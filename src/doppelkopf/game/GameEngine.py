@@ -0,0 +1,153 @@
+import numpy as np
+from typing import Dict, List
+from doppelkopf.game.Card import Card
+from doppelkopf.game.Seat import Seat
+from doppelkopf.game.Team import Team
+from doppelkopf.game.Player import Player
+from doppelkopf.utils.Console import Console
+from doppelkopf.game.GameState import GameState
+from doppelkopf.game.Doppelkopf import Doppelkopf
+from doppelkopf.game.CardFeedback import CardFeedback
+from doppelkopf.game.GameStateEncoder import GameStateEncoder
+
+# Plays games on the server side. How the players are reached is up to the Seat assigned to each of them
+class GameEngine():
+    def __init__(self, name):
+        self.name = name
+        self.players: List[Player] = Player.createPlayers()
+        Console.WriteDebug("%s players instantiated" % (len(self.players)), self.name)
+        for player in self.players:
+            player.perceiveOtherPlayers(self.players) # Make each player aware of the others
+        self.teamRe, self.teamKontra = Team.createTeams()
+        self.cardDeck = Card.createDeck()
+        self.cardSupply = np.zeros(shape=(Card.NUM_CARDTYPES), dtype=int) # An entry for every cardType between 0 and 2 (inclusive)
+        self.encoders: Dict[Player, GameStateEncoder] = {player: GameStateEncoder() for player in self.players} # Each player's states are encoded incrementally
+        self.gameCounter = 1
+
+    def PlayGame(self, seats: Dict[Player, Seat]) -> Team:
+        game = self.PlayGameSteps(seats)
+        try:
+            currentSeat, currentState, trickIndex = next(game)
+            while True:
+                currentSeat, currentState, trickIndex = game.send(currentSeat.RequestCard(currentState, trickIndex))
+        except StopIteration as gameOver:
+            return gameOver.value # The winning team
+
+    async def PlayGameAsync(self, seats: Dict[Player, Seat]) -> Team:
+        # Same as PlayGame(), but awaits the chosen cards, so that many games can be played concurrently on one event loop (see AsyncServer)
+        game = self.PlayGameSteps(seats)
+        try:
+            currentSeat, currentState, trickIndex = next(game)
+            while True:
+                currentSeat, currentState, trickIndex = game.send(await currentSeat.RequestCardAsync(currentState, trickIndex))
+        except StopIteration as gameOver:
+            return gameOver.value
+
+    def PlayGameSteps(self, seats: Dict[Player, Seat]):
+        # Plays one game as a generator: Whenever a card is needed, (seat, state, trickIndex) is yielded and the chosen cardType is expected to be sent back.
+        # Everything else is passed to the seats directly. Returns the winning team
+        # # # # # # # # # # # # # # # play games # # # # # # # # # # # # # # #
+        Console.WriteSuccess("Starting game %d" % (self.gameCounter), self.name)
+        gameStateIndex = 0
+        queenCounter = 0 # Counter for the number of Queen of Clubs, that have been played
+        cardSupply = self.cardSupply
+        cardSupply.fill(2) # Before each game, set the list of cards, that have already been played, to all two's because all card types are in the deck twice
+        Doppelkopf.ResetBeforeGame(self.players, self.teamRe, self.teamKontra) # Before the game starts, reset() all player- and team-objects
+        numOfCards = Doppelkopf.dealCards(self.players, self.teamRe, self.teamKontra, self.cardDeck)
+        for encoder in self.encoders.values():
+            encoder.Reset()
+        for iterPlayer, iterSeat in seats.items():
+            iterSeat.SendHand(list(iterPlayer.cards)) # Send() a copy of the player hand, so that the seat can never alter the server's hand
+        if Console.DEBUGGING:
+            Console.WriteDebug("Dealt cards to players: %s" % (self.players), self.name)
+        currentPlayer = self.players[int(np.random.randint(0, len(self.players)))] # Pick a random player to start the first trick (after that, the winner of each trick starts the next one)
+        for trickIndex in range(numOfCards): # Play as many tricks as each player holds cards
+            Console.WriteDebug("Starting trick %d. Starting player: %s" % (trickIndex + 1, currentPlayer.name), self.name)
+            stack: List[Card] = []
+            playOrder: List[Player] = []
+            temp: Player = currentPlayer
+            for _ in range(len(self.players)):
+                playOrder.append(temp)
+                temp = temp.nextPlayer
+            for _ in range(len(self.players)): # Do one move for each player
+                currentSeat = seats[currentPlayer]
+                currentState = None
+                for iterPlayer, iterSeat in seats.items(): # In each move, inform all players of the current game state and receive a response from the one player, whose turn it currently is
+                    isCurrentPlayer = iterPlayer is currentPlayer
+                    if iterSeat.WantsStates() or (isCurrentPlayer and iterSeat.WantsRequestState()): # Only construct states that are actually going to be used
+                        gameState = self.buildState(iterPlayer, iterSeat, gameStateIndex, stack, cardSupply, currentPlayer.index, playOrder, False)
+                        if iterSeat.WantsStates():
+                            iterSeat.SendState(gameState, False)
+                        if isCurrentPlayer:
+                            currentState = gameState
+                    if not iterSeat.WantsStates():
+                        iterSeat.SendStateDelta(gameStateIndex, currentPlayer.index, False)
+                gameStateIndex += 1
+                chosenCardType = None
+                feedback = None
+                while True:
+                    chosenCardType = yield currentSeat, currentState, trickIndex # Wait for the seat's choice
+                    feedback = currentPlayer.getFeedback(chosenCardType, stack[0] if len(stack) > 0 else None)
+                    currentSeat.SendFeedback(feedback)
+                    if feedback == CardFeedback.OK or feedback == CardFeedback.OK_COULD_NOT_FOLLOW_SUIT:
+                        break # Break out of loop
+                card = currentPlayer.tryGetCardFromHand(chosenCardType) # Try and get the card from the current player's hand (if current_player has it)
+                if currentPlayer.hasCardType(chosenCardType): # If current player has the card, remove it from his hand
+                    currentPlayer.removeFirstOccurrence(chosenCardType)
+                stack.append(card) # Append card to stack
+                cardSupply[chosenCardType] -= 1 # Decrease the card counter for this cardType to indicate that this card has been played
+                wasQueen = card.cardType == Card.QUEEN_OF_CLUBS_TYPE
+                if wasQueen:
+                    queenCounter += 1
+                for iterPlayer, iterSeat in seats.items():
+                    if iterPlayer is not currentPlayer: # ... which aren't the current player
+                        if wasQueen: # If a Queen of Clubs was played
+                            iterPlayer.perceiveTeam(currentPlayer, self.teamRe) # Inform player that currentPlayer is in team Re
+                            if queenCounter == 2 and iterPlayer.team is self.teamKontra: # If both Queens have been played and iterPlayer is in team Kontra
+                                iterPlayer.tryFindTeammate(self.teamRe, self.teamKontra)
+                        iterSeat.SendCardPlayed(currentPlayer.index, chosenCardType, queenCounter)
+                # After sending the game state to all players (and receiving a response from the one whose turn it is), increment to the next player
+                currentPlayer = currentPlayer.nextPlayer # Get the next player
+            for iterPlayer, iterSeat in seats.items(): # Iterate over all players and send them the final trick state before resetting for the next trick
+                if iterSeat.WantsStates():
+                    finalGameState = self.buildState(iterPlayer, iterSeat, gameStateIndex, stack, cardSupply, currentPlayer.index, playOrder, True)
+                    iterSeat.SendState(finalGameState, True) # Send() final game state
+                else:
+                    iterSeat.SendStateDelta(gameStateIndex, currentPlayer.index, True)
+            gameStateIndex += 1
+            # Now that all players have played a card, determine the winner of this trick
+            bestCardIndex = Doppelkopf.findBestCard(stack) # Returns the index of the best card within the stack
+            trickWinningPlayer: Player = playOrder[bestCardIndex] # Winner is the player's index who played the best card within the stack
+            trickWinningPlayer.team.AddTrick(stack)
+            trickValue = Doppelkopf.GetTrickValue(stack)
+            for iterPlayer, iterSeat in seats.items():
+                isTrickWinner = iterPlayer.index == trickWinningPlayer.index # If the trick was won by iterPlayer
+                isTeamMateTrickWinner = iterPlayer.isTeammate(trickWinningPlayer) if not isTrickWinner else False # If the trick was won by their (known!) teammate. Does not count as a win if the player is not aware that the winner is their teammate!
+                iterSeat.SendTrickCompleted(isTrickWinner, isTeamMateTrickWinner, trickValue)
+            Console.WriteDebug("Trick %d completed! Winner is: %s" % (trickIndex + 1, trickWinningPlayer.name), self.name)
+            currentPlayer = trickWinningPlayer # The winner of this trick may start the next trick
+        winningTeam = Doppelkopf.GetWinner(self.teamRe, self.teamKontra)
+        Console.WriteDebug("Game %d was won by team %s with %d points" % (self.gameCounter, winningTeam, winningTeam.Score()), self.name)
+        for iterPlayer, iterSeat in seats.items():
+            isGameWinner = iterPlayer.team == winningTeam
+            iterSeat.SendGameCompleted(isGameWinner, iterPlayer.team.Score())
+        self.gameCounter += 1 # Increment game counter
+        return winningTeam
+
+    def buildState(self, player: Player, seat: Seat, stateIndex: int, stack: List[Card], cardSupply: np.ndarray, currentPlayerIndex: int, playOrder: List[Player], isTerminal: bool) -> GameState:
+        teamAffiliations = GameEngine.constructTeamAffiliations(player, playOrder)
+        flat = self.encoders[player].Encode(player.cards, stack, cardSupply, currentPlayerIndex, teamAffiliations)
+        if not seat.KeepsStates(): # The state is encoded for the wire right away, so it may share the encoder's buffer and our lists
+            return GameState(stateIndex, player.cards, stack, cardSupply, currentPlayerIndex, teamAffiliations, isTerminal, flat)
+        return GameState(stateIndex, list(player.cards), list(stack), cardSupply, currentPlayerIndex, teamAffiliations, isTerminal, flat.copy()) # Snapshots, since the encoder reuses its buffer and the lists keep changing
+
+    @staticmethod
+    def constructTeamAffiliations(player: Player, playOrder: List[Player]) -> np.ndarray:
+        teamAffiliations = np.zeros(shape=(Doppelkopf.MAX_PLAYERS_IN_GAME), dtype=np.float32)
+        teamAffiliations[player.index] = 1 # 1 indicates thyself
+        for i, orderedPlayer in enumerate(playOrder):
+            if orderedPlayer.index == player.index or player.isTeammate(orderedPlayer): # if 'orderedPlayer' is 'player' OR if 'orderedPlayer' is a teammate of 'player'
+                teamAffiliations[i] = 1 # 1 indicates either thyself or a teammate
+            else:
+                teamAffiliations[i] = 0 # 0 indicates an opponent (or someone who's team affiliation is not yet known)
+        return teamAffiliations
\ No newline at end of file
@@ -30,13 +30,19 @@ class GameState():
 
     def __init__(self, index: int, playerDeck: List[Card], currentStack: List[Card], cardSupply: np.ndarray, currentPlayerIndex: int, teamAffiliations, isTerminal: bool, flat=None):
         self.index = index # All states are 'numbered' for better tracking
-        self.playerDeck = playerDeck.copy() # Keep copies of the original list
-        self.currentStack = currentStack.copy() # Keep copies of the original list
-        self.cardSupply = cardSupply.copy() # Keep a copy of the card supply at this time during the game
         self.currentPlayerIndex = currentPlayerIndex
         self.teamAffiliations = teamAffiliations
         self.isTerminal = isTerminal
-        self.flat = flat if flat is not None else self.flatten()
+        if flat is not None: # Whoever encoded the state already took care of snapshots (see GameEngine.buildState()), so everything is kept as is
+            self.playerDeck = playerDeck
+            self.currentStack = currentStack
+            self.cardSupply = flat[GameState.RANGE_START["cardSupply"]:GameState.RANGE_END["cardSupply"]] # A view of the encoded card supply
+            self.flat = flat
+        else:
+            self.playerDeck = playerDeck.copy() # Keep copies of the original list
+            self.currentStack = currentStack.copy() # Keep copies of the original list
+            self.cardSupply = cardSupply.copy() # Keep a copy of the card supply at this time during the game
+            self.flat = self.flatten()
         if not self.IsValid():
             Console.WriteWarning("This state is not valid: %s" % self)
 
@@ -80,78 +86,89 @@ class GameState():
         return GameState(index, playerDeck, stack, cardSupplySlice, currentPlayerIndex, teamAffiliationsSlice, isTerminal, flat)
 
     def flatten(self) -> np.ndarray:
-        result = []
+        return GameState.Encode(self.playerDeck, self.currentStack, self.cardSupply, self.currentPlayerIndex, self.teamAffiliations)
+
+    @staticmethod
+    def Encode(playerDeck: List[Card], currentStack: List[Card], cardSupply: np.ndarray, currentPlayerIndex: int, teamAffiliations, out: np.ndarray = None) -> np.ndarray:
+        # Writes the flat representation of a state into 'out' (or a new array). See GameStateEncoder for writing only what changed since the last state
+        if out is None:
+            out = np.zeros(shape=(GameState.SIZE_STATE), dtype=np.float32)
+        else:
+            out.fill(0)
         # # # # # # # # # # # # # # # Flatten player deck # # # # # # # # # # # # # # #
-        for card in self.playerDeck:
-            result.extend(card.Flat())
-        for _ in range(Doppelkopf.MAX_CARDS_PER_PLAYER - len(self.playerDeck)):
-            result.extend(Card.DUMMY_FLAT)
+        start = GameState.RANGE_START["playerDeck"]
+        for slot, card in enumerate(playerDeck):
+            out[start + slot * Card.NUM_CARDTYPES + card.cardType] = 1 # One-hot encoding of the card in this slot (unused slots remain all zeros)
         # # # # # # # # # # # # # # # Flatten current stack # # # # # # # # # # # # # # #
-        for card in self.currentStack:
-            result.extend(card.Flat())
-        for _ in range(Doppelkopf.MAX_PLAYERS_IN_GAME - len(self.currentStack)):
-            result.extend(Card.DUMMY_FLAT)
+        start = GameState.RANGE_START["currentStack"]
+        for slot, card in enumerate(currentStack):
+            out[start + slot * Card.NUM_CARDTYPES + card.cardType] = 1
         # # # # # # # # # # # # # # # Flatten current player # # # # # # # # # # # # # # #
-        result = np.array(result, dtype=np.float32)
-        flatPlayerIndex = np.zeros(shape=(Doppelkopf.MAX_PLAYERS_IN_GAME), dtype=np.float32)
-        flatPlayerIndex[self.currentPlayerIndex] = 1
-        result = np.concatenate((result, flatPlayerIndex))
-        # # # # # # # # # # # # # # # Flatten cardSupply # # # # # # # # # # # # # # #
-        result = np.concatenate((result, self.cardSupply), axis=0)
-        # # # # # # # # # # # # # # # Flatten team affiliations # # # # # # # # # # # # # # #
-        result = np.concatenate((result, self.teamAffiliations), axis=0)
-        return result
+        out[GameState.RANGE_START["currentPlayer"] + currentPlayerIndex] = 1
+        # # # # # # # # # # # # # # # Flatten cardSupply and team affiliations # # # # # # # # # # # # # # #
+        out[GameState.RANGE_START["cardSupply"]:GameState.RANGE_END["cardSupply"]] = cardSupply
+        out[GameState.RANGE_START["teamAffiliations"]:GameState.RANGE_END["teamAffiliations"]] = teamAffiliations
+        return out
 
     def Flat(self) -> np.ndarray:
         return self.flat
 
     @staticmethod
     def Random():
-        stateIndex = np.random.randint(0, Doppelkopf.MAX_STATES_PER_GAME) # Any number between 0 and 60
-        completedTricks = int(stateIndex / Doppelkopf.MAX_STATES_PER_TRICK) # integer division
-        stackSize = np.random.randint(0, Doppelkopf.MAX_PLAYERS_IN_GAME) # Any number between 0 and 3
-        currentPlayerIndex = np.random.randint(0, Doppelkopf.MAX_PLAYERS_IN_GAME) # Any player between 0 and 3 may start the trick
-        cardDeck = Card.createDeck().tolist()
-        cardsInHand = Doppelkopf.MAX_CARDS_PER_PLAYER - completedTricks # 12 - the number of completed tricks
-        # # # # # # # # # # # # # # # Construct player hand # # # # # # # # # # # # # # #
-        playerCards = []
-        for _ in range(cardsInHand):
-            cardIndex = int(np.random.randint(0, len(cardDeck)))
-            card = cardDeck[cardIndex]
-            cardDeck.remove(card)
-            playerCards.append(card)
-        # # # # # # # # # # # # # # # Construct cardSupply # # # # # # # # # # # # # # #
-        cardSupply = np.zeros(shape=(Card.NUM_CARDTYPES), dtype=np.int)
-        cardSupply.fill(2) # Fill the supply array with 2's to indicate that all cards are available
-        cardsAlreadyPlayed = completedTricks * Doppelkopf.MAX_CARDS_PER_TRICK + stackSize # number of tricks * 4 + the size of the current stack
-        cardTypes = np.array([card.cardType for card in cardDeck]) # All cards that haven't been assigned to the player yet
-        np.random.shuffle(cardTypes)
-        cardsPlayedTypes = cardTypes[:cardsAlreadyPlayed] # The first 'cardsAlreadyPlayed' indices of the remaining indices
-        for cardPlayedType in cardsPlayedTypes:
-            cardSupply[cardPlayedType] -= 1 # Any card, that has been played before, is decreased in supply by one
-        # # # # # # # # # # # # # # # Construct current stack # # # # # # # # # # # # # # #
-        currentStack = []
-        for _ in range(stackSize):
-            cardIndex = int(np.random.randint(0, len(cardDeck)))
-            card = cardDeck[cardIndex]
-            cardDeck.remove(card)
-            currentStack.append(card)
-            cardSupply[card.cardType] -= 1 # Any card, that has been played in this trick, is also decreased in supply by one
-        # # # # # # # # # # # # # # # Determine if state is terminal # # # # # # # # # # # # # # #
-        isTerminal = stackSize >= Doppelkopf.MAX_CARDS_PER_TRICK
-        # # # # # # # # # # # # # # # Construct team affiliations # # # # # # # # # # # # # # #
-        teamAffiliations = np.zeros(shape=(Doppelkopf.MAX_PLAYERS_IN_GAME), dtype=np.float32)
-        indices = np.arange(0, Doppelkopf.MAX_PLAYERS_IN_GAME)
-        np.random.shuffle(indices)
-        teamAffiliations[indices[:2]] = 1 # The first two random indices are marked as team 1, the others remain team 0
-        return GameState(stateIndex, playerCards, currentStack, cardSupply, currentPlayerIndex, teamAffiliations, isTerminal)
+        flats, stateIndices = GameState.RandomFlats(1)
+        return GameState.FromFlat(flats[0], int(stateIndices[0]))
 
     @staticmethod
     def RandomList(howMany):
-        l = []
-        for i in range(howMany):
-            l.append(GameState.Random())
-        return l
+        flats, stateIndices = GameState.RandomFlats(howMany)
+        return [GameState.FromFlat(flat, int(stateIndex)) for flat, stateIndex in zip(flats, stateIndices)]
+
+    @staticmethod
+    def RandomFlats(howMany: int, rng: np.random.Generator = None):
+        # Samples 'howMany' valid random states directly as a (howMany, 416) array, along with their state indices. No Card or GameState objects are created
+        if rng is None:
+            rng = np.random.default_rng(np.random.randint(0, 2**31 - 1)) # Derive the generator from numpy's global state, so that np.random.seed() still applies
+        rows = np.arange(howMany)
+        flats = np.zeros(shape=(howMany, GameState.SIZE_STATE), dtype=np.float32)
+        stateIndices = rng.integers(0, Doppelkopf.MAX_STATES_PER_GAME, size=howMany) # Any number between 0 and 59
+        completedTricks = stateIndices // Doppelkopf.MAX_STATES_PER_TRICK
+        stackSizes = rng.integers(0, Doppelkopf.MAX_PLAYERS_IN_GAME, size=howMany) # Any number between 0 and 3
+        currentPlayerIndices = rng.integers(0, Doppelkopf.MAX_PLAYERS_IN_GAME, size=howMany) # Any player between 0 and 3 may start the trick
+        cardsInHand = Doppelkopf.MAX_CARDS_PER_PLAYER - completedTricks # 12 - the number of completed tricks
+        cardsAlreadyPlayed = completedTricks * Doppelkopf.MAX_CARDS_PER_TRICK + stackSizes # number of tricks * 4 + the size of the current stack
+        # # # # # # # # # # # # # # # Shuffle one deck per state: The first cards form the hand, the next ones have been played (the last of which lie on the stack) # # # # # # # # # # # # # # #
+        deckCardTypes = np.repeat(np.arange(Card.NUM_CARDTYPES), 2)
+        decks = deckCardTypes[np.argsort(rng.random(size=(howMany, len(deckCardTypes))), axis=1)]
+        # # # # # # # # # # # # # # # Player hand # # # # # # # # # # # # # # #
+        for slot in range(Doppelkopf.MAX_CARDS_PER_PLAYER):
+            isUsed = slot < cardsInHand
+            flats[rows[isUsed], GameState.RANGE_START["playerDeck"] + slot * Card.NUM_CARDTYPES + decks[isUsed, slot]] = 1
+        # # # # # # # # # # # # # # # Current stack # # # # # # # # # # # # # # #
+        stackStart = cardsInHand + cardsAlreadyPlayed - stackSizes
+        for slot in range(Doppelkopf.MAX_PLAYERS_IN_GAME - 1):
+            isUsed = slot < stackSizes
+            flats[rows[isUsed], GameState.RANGE_START["currentStack"] + slot * Card.NUM_CARDTYPES + decks[isUsed, stackStart[isUsed] + slot]] = 1
+        # # # # # # # # # # # # # # # Current player # # # # # # # # # # # # # # #
+        flats[rows, GameState.RANGE_START["currentPlayer"] + currentPlayerIndices] = 1
+        # # # # # # # # # # # # # # # cardSupply: Every card that has been played (including those on the stack) is decreased in supply by one # # # # # # # # # # # # # # #
+        positions = np.arange(len(deckCardTypes))
+        isPlayed = (positions >= cardsInHand[:, np.newaxis]) & (positions < (cardsInHand + cardsAlreadyPlayed)[:, np.newaxis])
+        playedCounts = np.bincount((rows[:, np.newaxis] * Card.NUM_CARDTYPES + decks)[isPlayed], minlength=howMany * Card.NUM_CARDTYPES).reshape(howMany, Card.NUM_CARDTYPES)
+        flats[:, GameState.RANGE_START["cardSupply"]:GameState.RANGE_END["cardSupply"]] = 2 - playedCounts
+        # # # # # # # # # # # # # # # Team affiliations: Two random positions are marked as team 1, the others remain team 0 # # # # # # # # # # # # # # #
+        teamPositions = np.argsort(rng.random(size=(howMany, Doppelkopf.MAX_PLAYERS_IN_GAME)), axis=1)[:, :2]
+        flats[rows[:, np.newaxis], GameState.RANGE_START["teamAffiliations"] + teamPositions] = 1
+        return flats, stateIndices
+
+    @staticmethod
+    def RandomFlatStream(howMany: int = None, chunkSize: int = 10000, seed=None):
+        # Yields (flats, stateIndices) chunks of RandomFlats() until 'howMany' states have been produced (or forever, if 'howMany' is None)
+        rng = np.random.default_rng(seed)
+        produced = 0
+        while howMany is None or produced < howMany:
+            size = chunkSize if howMany is None else min(chunkSize, howMany - produced)
+            yield GameState.RandomFlats(size, rng)
+            produced += size
 
     def IsValid(self) -> bool:
         counter = np.zeros(Card.NUM_CARDTYPES)
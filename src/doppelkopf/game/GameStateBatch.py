@@ -0,0 +1,103 @@
+import numpy as np
+from typing import List
+from doppelkopf.game.Card import Card
+from doppelkopf.game.GameState import GameState
+from doppelkopf.game.Doppelkopf import Doppelkopf
+
+# Many game states in one contiguous (N,416) float32 array, with the per-state extras (index, current player, terminal flag and legal mask) kept in side arrays.
+# Rows can be viewed as GameState objects without copying, and the whole batch can be decoded at once (see Decode())
+class GameStateBatch():
+    def __init__(self, flats: np.ndarray, indices: np.ndarray = None, legalMasks: np.ndarray = None):
+        self.flats = np.ascontiguousarray(flats, dtype=np.float32)
+        numOfStates = len(self.flats)
+        self.indices = np.asarray(indices, dtype=np.int64) if indices is not None else np.arange(numOfStates, dtype=np.int64)
+        playerSlice = self.flats[:, GameState.RANGE_START["currentPlayer"]:GameState.RANGE_END["currentPlayer"]]
+        self.currentPlayerIndices = np.argmax(playerSlice, axis=1)
+        self.isTerminal = self.stackSlices().sum(axis=(1, 2)) >= Doppelkopf.MAX_PLAYERS_IN_GAME # Same rule as in GameState.FromFlat()
+        self.legalMasks = np.asarray(legalMasks, dtype=np.float32) if legalMasks is not None else None
+
+    @staticmethod
+    def FromStates(states: List[GameState], legalMasks: np.ndarray = None):
+        flats = np.empty(shape=(len(states), GameState.SIZE_STATE), dtype=np.float32)
+        for i, state in enumerate(states):
+            flats[i] = state.Flat()
+        return GameStateBatch(flats, [state.index for state in states], legalMasks)
+
+    def Size(self) -> int:
+        return len(self.flats)
+
+    def __len__(self):
+        return self.Size()
+
+    def __getitem__(self, i: int) -> GameState:
+        return GameStateRow(self, i)
+
+    def __iter__(self):
+        for i in range(self.Size()):
+            yield GameStateRow(self, i)
+
+    def Flats(self) -> np.ndarray:
+        return self.flats # Feed this straight into DNN.QValues()
+
+    #region Vectorized decoding (the inverse of GameState.flatten() for all states at once)
+    def deckSlices(self) -> np.ndarray:
+        return self.flats[:, GameState.RANGE_START["playerDeck"]:GameState.RANGE_END["playerDeck"]].reshape(-1, Doppelkopf.MAX_CARDS_PER_PLAYER, Card.NUM_CARDTYPES)
+
+    def stackSlices(self) -> np.ndarray:
+        return self.flats[:, GameState.RANGE_START["currentStack"]:GameState.RANGE_END["currentStack"]].reshape(-1, Doppelkopf.MAX_PLAYERS_IN_GAME, Card.NUM_CARDTYPES)
+
+    @staticmethod
+    def slotCardTypes(slots: np.ndarray) -> np.ndarray:
+        return np.where(slots.any(axis=2), np.argmax(slots, axis=2), -1) # The cardType in each slot, -1 for empty slots
+
+    def HandCardTypes(self) -> np.ndarray:
+        return GameStateBatch.slotCardTypes(self.deckSlices()) # (N,12)
+
+    def StackCardTypes(self) -> np.ndarray:
+        return GameStateBatch.slotCardTypes(self.stackSlices()) # (N,4), in the order the cards were played
+
+    def HandCounts(self) -> np.ndarray:
+        return self.deckSlices().sum(axis=1).astype(np.int8) # (N,24) number of cards held of each cardType
+
+    def CardSupply(self) -> np.ndarray:
+        return self.flats[:, GameState.RANGE_START["cardSupply"]:GameState.RANGE_END["cardSupply"]]
+
+    def TeamAffiliations(self) -> np.ndarray:
+        return self.flats[:, GameState.RANGE_START["teamAffiliations"]:GameState.RANGE_END["teamAffiliations"]]
+
+    def Decode(self) -> tuple:
+        return self.HandCardTypes(), self.StackCardTypes(), self.currentPlayerIndices, self.CardSupply(), self.TeamAffiliations(), self.isTerminal
+    #endregion
+
+# A single row of a GameStateBatch that behaves like a GameState. Flat() is a view into the batch (no copy), the card lists are decoded on first access
+class GameStateRow(GameState):
+    def __init__(self, batch: GameStateBatch, row: int):
+        self.batch = batch
+        self.row = row
+        self.index = int(batch.indices[row])
+        self.currentPlayerIndex = int(batch.currentPlayerIndices[row])
+        self.isTerminal = bool(batch.isTerminal[row])
+        self.flat = batch.flats[row]
+        self.cardSupply = self.flat[GameState.RANGE_START["cardSupply"]:GameState.RANGE_END["cardSupply"]]
+        self.teamAffiliations = self.flat[GameState.RANGE_START["teamAffiliations"]:GameState.RANGE_END["teamAffiliations"]]
+        self.decodedPlayerDeck: List[Card] = None
+        self.decodedCurrentStack: List[Card] = None
+
+    @staticmethod
+    def decodeCards(slots: np.ndarray) -> List[Card]:
+        return [Card.CARDTYPES[cardType].clone() for cardType in np.argmax(slots[slots.any(axis=1)], axis=1)]
+
+    @property
+    def playerDeck(self) -> List[Card]:
+        if self.decodedPlayerDeck is None:
+            self.decodedPlayerDeck = GameStateRow.decodeCards(self.batch.deckSlices()[self.row])
+        return self.decodedPlayerDeck
+
+    @property
+    def currentStack(self) -> List[Card]:
+        if self.decodedCurrentStack is None:
+            self.decodedCurrentStack = GameStateRow.decodeCards(self.batch.stackSlices()[self.row])
+        return self.decodedCurrentStack
+
+    def LegalMask(self) -> np.ndarray:
+        return self.batch.legalMasks[self.row] if self.batch.legalMasks is not None else None
\ No newline at end of file
@@ -0,0 +1,49 @@
+import numpy as np
+from typing import List
+from doppelkopf.game.Card import Card
+from doppelkopf.game.GameState import GameState
+
+# Encodes consecutive states of one player's game into the same 416-element buffer. Between two states usually only one card changes,
+# so only the slots of the player deck and the stack that actually differ are rewritten, instead of building a new array every time
+class GameStateEncoder():
+    def __init__(self, out: np.ndarray = None):
+        self.flat = out if out is not None else np.zeros(shape=(GameState.SIZE_STATE), dtype=np.float32)
+        self.deckCardTypes: List[int] = [] # The cardTypes currently encoded in the player deck slots
+        self.stackCardTypes: List[int] = [] # The cardTypes currently encoded in the stack slots
+        self.currentPlayerIndex = None
+        self.Reset()
+
+    def Reset(self):
+        self.flat.fill(0)
+        self.deckCardTypes.clear()
+        self.stackCardTypes.clear()
+        self.currentPlayerIndex = None
+
+    def Encode(self, playerDeck: List[Card], currentStack: List[Card], cardSupply: np.ndarray, currentPlayerIndex: int, teamAffiliations) -> np.ndarray:
+        # Returns the internal buffer, which is overwritten by the next call. Copy it if the state is to be kept
+        self.encodeCards(playerDeck, self.deckCardTypes, GameState.RANGE_START["playerDeck"])
+        self.encodeCards(currentStack, self.stackCardTypes, GameState.RANGE_START["currentStack"])
+        if currentPlayerIndex != self.currentPlayerIndex:
+            start = GameState.RANGE_START["currentPlayer"]
+            if self.currentPlayerIndex is not None:
+                self.flat[start + self.currentPlayerIndex] = 0
+            self.flat[start + currentPlayerIndex] = 1
+            self.currentPlayerIndex = currentPlayerIndex
+        # cardSupply and teamAffiliations are only 24 and 4 elements long: Comparing them would cost as much as copying them
+        self.flat[GameState.RANGE_START["cardSupply"]:GameState.RANGE_END["cardSupply"]] = cardSupply
+        self.flat[GameState.RANGE_START["teamAffiliations"]:GameState.RANGE_END["teamAffiliations"]] = teamAffiliations
+        return self.flat
+
+    def encodeCards(self, cards: List[Card], encodedCardTypes: List[int], start: int):
+        # Skip all slots that still hold the same card, then rewrite the remaining ones
+        slot = 0
+        common = min(len(cards), len(encodedCardTypes))
+        while slot < common and cards[slot].cardType == encodedCardTypes[slot]:
+            slot += 1
+        for i in range(slot, len(encodedCardTypes)):
+            self.flat[start + i * Card.NUM_CARDTYPES + encodedCardTypes[i]] = 0 # Clear the old card
+        del encodedCardTypes[slot:]
+        for i in range(slot, len(cards)):
+            cardType = cards[i].cardType
+            self.flat[start + i * Card.NUM_CARDTYPES + cardType] = 1
+            encodedCardTypes.append(cardType)
\ No newline at end of file
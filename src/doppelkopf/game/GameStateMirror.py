@@ -0,0 +1,45 @@
+import numpy as np
+from typing import List
+from doppelkopf.game.Card import Card
+from doppelkopf.game.Player import Player
+from doppelkopf.game.GameState import GameState
+from doppelkopf.game.GameEngine import GameEngine
+from doppelkopf.game.GameStateEncoder import GameStateEncoder
+
+# The client-side copy of a game, for Servers that stream deltas instead of states. Only the hand and the cards played (along with who played them)
+# are received, everything else is tracked here, so that the same GameStates the Server would have sent can be produced on demand
+class GameStateMirror():
+    def __init__(self, myPlayer: Player, players: List[Player]):
+        self.myPlayer = myPlayer # Its hand and its perceived teams are kept up to date by the Client
+        self.players = players
+        self.encoder = GameStateEncoder()
+        self.cardSupply = np.zeros(shape=(Card.NUM_CARDTYPES), dtype=int)
+        self.stack: List[Card] = []
+        self.playOrder: List[Player] = []
+        self.Reset()
+
+    def Reset(self):
+        self.encoder.Reset()
+        self.cardSupply.fill(2) # All card types are in the deck twice
+        self.stack.clear()
+        self.playOrder.clear()
+
+    def BeginTrick(self):
+        self.stack.clear()
+        self.playOrder.clear()
+
+    def CardPlayed(self, playerIndex: int, cardType: int):
+        self.stack.append(Card.CARDTYPES[cardType].clone())
+        self.cardSupply[cardType] -= 1
+
+    def Flat(self, currentPlayerIndex: int) -> np.ndarray:
+        # Returns the encoder's buffer, which is overwritten by the next call
+        if len(self.playOrder) == 0: # The first player of a trick determines the order for the whole trick
+            self.playOrder.extend(self.players[(currentPlayerIndex + i) % len(self.players)] for i in range(len(self.players)))
+        teamAffiliations = GameEngine.constructTeamAffiliations(self.myPlayer, self.playOrder)
+        return self.encoder.Encode(self.myPlayer.cards, self.stack, self.cardSupply, currentPlayerIndex, teamAffiliations)
+
+    def State(self, stateIndex: int, currentPlayerIndex: int, isFinalState: bool) -> GameState:
+        flat = self.Flat(currentPlayerIndex).copy()
+        teamAffiliations = flat[GameState.RANGE_START["teamAffiliations"]:GameState.RANGE_END["teamAffiliations"]]
+        return GameState(stateIndex, list(self.myPlayer.cards), list(self.stack), self.cardSupply, currentPlayerIndex, teamAffiliations, isFinalState, flat) # The Client may keep the state, so it gets its own lists
\ No newline at end of file
@@ -0,0 +1,126 @@
+import asyncio
+import traceback # For debugging
+from typing import Dict, List
+from doppelkopf.game.Player import Player
+from doppelkopf.utils.Console import Console
+from doppelkopf.game.GameEngine import GameEngine
+from doppelkopf.utils.SimpleMessaging import Message
+from doppelkopf.utils.SimpleMessaging import MessageType
+from doppelkopf.game.AsyncSocketSeat import AsyncSocketSeat
+
+# One table of the AsyncServer: Four seats and a GameEngine. Plays games back to back as long as all seats are taken and every Client has games left in its subscription
+class GameTable():
+    WAIT_FOR_CLIENTS_INTERVAL = 0.5 # Seconds between reminders to the subscribed Clients while the table is incomplete
+
+    def __init__(self, index: int):
+        self.index = index
+        self.name = "Table %d" % index
+        self.engine = GameEngine(self.name)
+        self.players: List[Player] = self.engine.players
+        self.playerSeatPairing: Dict[Player, AsyncSocketSeat] = {}
+        for player in self.players:
+            self.playerSeatPairing[player] = None
+        self.seatsChanged = asyncio.Event() # Set whenever a Client joins, so that a waiting table can check whether it is complete now
+        self.gamesCompleted = 0
+
+    def getFirstAvailablePlayer(self) -> Player:
+        for player, seat in self.playerSeatPairing.items():
+            if seat is None:
+                return player
+        return None
+
+    def NumOfSeatsTaken(self) -> int:
+        return sum(1 for seat in self.playerSeatPairing.values() if seat is not None)
+
+    def IsFull(self) -> bool:
+        return self.getFirstAvailablePlayer() is None
+
+    def Join(self, seat: AsyncSocketSeat) -> Player:
+        availablePlayer = self.getFirstAvailablePlayer()
+        if availablePlayer is None: # If there is no available player slot
+            return None
+        self.playerSeatPairing[availablePlayer] = seat
+        # # # # # # # # # # # # # # # Send player and team info to the new Client # # # # # # # # # # # # # # #
+        seat.send(Message(MessageType.PLAYER_OBJECT, availablePlayer))
+        seat.send(Message(MessageType.PLAYERLIST, self.players))
+        seat.send(Message(MessageType.TEAMS, (self.engine.teamRe, self.engine.teamKontra)))
+        self.seatsChanged.set()
+        Console.WriteSuccess("%s (%s) has joined" % (availablePlayer.name, seat.address), self.name)
+        return availablePlayer
+
+    def Leave(self, player: Player):
+        seat = self.playerSeatPairing[player]
+        if seat is not None:
+            seat.Close()
+            self.playerSeatPairing[player] = None # Mark this player's seat as 'None' to indicate that this player is available again
+            Console.WriteLine("Client %d (%s) has disconnected" % (player.index, player.name), self.name)
+
+    def Close(self):
+        for player in self.players:
+            self.Leave(player)
+
+    async def receiveSubscription(self, player: Player):
+        seat = self.playerSeatPairing[player]
+        try:
+            message = await seat.ReceiveMessage() # Wait for the Client to subscribe to more games
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            message = None
+        if message is None or message.messageType == MessageType.DISCONNECT: # If the Client wishes to disconnect (or simply vanished), free its seat
+            self.Leave(player)
+        elif seat.HandleSubscription(message):
+            seat.AcknowledgeUnsubscribe() # A stopped Client may cancel a subscription that has already run out
+        else:
+            Console.WriteError("Expected SUBSCRIBE or DISCONNECT from %s, got %s instead" % (player.name, message), self.name)
+            self.Leave(player)
+
+    async def remindWaitingClient(self, player: Player):
+        # A subscribed Client waits for its next hand and would not notice that the table is incomplete. It answers with READY_TO_PLAY, after cancelling its subscription if it was stopped meanwhile
+        seat = self.playerSeatPairing[player]
+        seat.send(Message.NOT_YET_READY)
+        try:
+            message = await seat.ReceiveMessage()
+            while seat.HandleSubscription(message):
+                message = await seat.ReceiveMessage()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            message = None
+        if message is not None and message.messageType == MessageType.READY_TO_PLAY:
+            seat.AcknowledgeUnsubscribe()
+            return
+        if message is not None and message.messageType != MessageType.DISCONNECT:
+            Console.WriteError("Expected READY_TO_PLAY from %s, got %s instead" % (player.name, message), self.name)
+        self.Leave(player)
+
+    async def waitUntilReady(self):
+        # Subscribed Clients are simply waiting for their next hand until the table is complete
+        while True:
+            self.seatsChanged.clear()
+            unsubscribed = [player for player, seat in self.playerSeatPairing.items() if seat is not None and seat.remainingGames == 0]
+            if len(unsubscribed) > 0:
+                await asyncio.gather(*(self.receiveSubscription(player) for player in unsubscribed))
+            if self.IsFull() and all(seat.remainingGames > 0 for seat in self.playerSeatPairing.values()):
+                return
+            try:
+                await asyncio.wait_for(self.seatsChanged.wait(), GameTable.WAIT_FOR_CLIENTS_INTERVAL) # Wait for another Client to join. Meanwhile, the subscribed Clients keep their seats
+            except asyncio.TimeoutError:
+                subscribed = [player for player, seat in self.playerSeatPairing.items() if seat is not None and seat.remainingGames > 0]
+                await asyncio.gather(*(self.remindWaitingClient(player) for player in subscribed))
+
+    async def Run(self):
+        try:
+            while True:
+                await self.waitUntilReady()
+                for seat in self.playerSeatPairing.values():
+                    seat.remainingGames -= 1
+                try:
+                    await self.engine.PlayGameAsync(self.playerSeatPairing)
+                    await asyncio.gather(*(seat.Drain() for seat in self.playerSeatPairing.values()))
+                    self.gamesCompleted += 1
+                except (asyncio.IncompleteReadError, ConnectionError, ValueError) as error: # A Client vanished or misbehaved in the middle of a game
+                    Console.WriteError("Game aborted: %s" % repr(error), self.name)
+                    self.Close() # The other Clients cannot continue this game either
+        except asyncio.CancelledError:
+            self.Close()
+            raise
+        except:
+            Console.WriteError(traceback.format_exc(), self.name)
+            self.Close()
\ No newline at end of file
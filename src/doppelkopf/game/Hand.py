@@ -0,0 +1,86 @@
+from typing import List
+from doppelkopf.game.Card import Card
+
+# The cards held by a player. Behaves like the plain list of Card objects it used to be, but additionally keeps the number of cards
+# of each cardType packed into an int (2 bits per cardType), so that lookups, legality and follow-suit checks are single bit operations
+class Hand(list):
+    BITS_PER_CARDTYPE = 2 # Every cardType is in the deck twice, so a count of 0-2 fits into 2 bits
+    COUNT_MASK = 3 # 0b11
+    TRICK_SUITS = Card.TRICK_SUITS.tolist() # Python ints are faster than numpy scalars for single lookups
+
+    def __init__(self, cards: List[Card] = ()):
+        super(Hand, self).__init__(cards)
+        self.counts = 0
+        for card in self:
+            self.counts += 1 << (Hand.BITS_PER_CARDTYPE * card.cardType)
+
+    def __reduce__(self):
+        return (Hand, (list(self),)) # Rebuild the counts from the cards when unpickled or copied
+
+    #region Bit operations
+    def Count(self, cardType: int) -> int:
+        return (self.counts >> (Hand.BITS_PER_CARDTYPE * cardType)) & Hand.COUNT_MASK
+
+    def HasCardType(self, cardType: int) -> bool:
+        return (self.counts >> (Hand.BITS_PER_CARDTYPE * cardType)) & Hand.COUNT_MASK != 0
+
+    def Presence(self) -> int:
+        return (self.counts | (self.counts >> 1)) & Hand.LOW_BITS # The lower bit of each 2-bit field is set if at least one card of that cardType is held
+
+    def CanFollow(self, leadingCardType: int) -> bool:
+        return self.Presence() & Hand.FOLLOW_MASKS[Hand.TRICK_SUITS[leadingCardType]] != 0
+
+    @staticmethod
+    def Follows(leadingCardType: int, cardType: int) -> bool:
+        return Hand.TRICK_SUITS[leadingCardType] == Hand.TRICK_SUITS[cardType]
+
+    def LegalBits(self, leadingCardType: int = None) -> int:
+        # The lower bit of each 2-bit field is set if that cardType may be played
+        presence = self.Presence()
+        if leadingCardType is None: # When leading the trick, anything may be played
+            return presence
+        following = presence & Hand.FOLLOW_MASKS[Hand.TRICK_SUITS[leadingCardType]]
+        return following if following != 0 else presence # If we cannot follow suit, anything may be played
+    #endregion
+
+    #region List operations (keep the counts up to date)
+    def append(self, card: Card):
+        super(Hand, self).append(card)
+        self.counts += 1 << (Hand.BITS_PER_CARDTYPE * card.cardType)
+
+    def insert(self, index: int, card: Card):
+        super(Hand, self).insert(index, card)
+        self.counts += 1 << (Hand.BITS_PER_CARDTYPE * card.cardType)
+
+    def extend(self, cards):
+        for card in cards:
+            self.append(card)
+
+    def __iadd__(self, cards):
+        self.extend(cards)
+        return self
+
+    def remove(self, card: Card):
+        super(Hand, self).remove(card)
+        self.counts -= 1 << (Hand.BITS_PER_CARDTYPE * card.cardType)
+
+    def pop(self, index: int = -1) -> Card:
+        card = super(Hand, self).pop(index)
+        self.counts -= 1 << (Hand.BITS_PER_CARDTYPE * card.cardType)
+        return card
+
+    def clear(self):
+        super(Hand, self).clear()
+        self.counts = 0
+
+    def __setitem__(self, index, value):
+        super(Hand, self).__setitem__(index, value)
+        self.__init__(list(self)) # Recount after arbitrary (slice) assignments
+
+    def __delitem__(self, index):
+        super(Hand, self).__delitem__(index)
+        self.__init__(list(self)) # Recount after arbitrary (slice) deletions
+    #endregion
+
+Hand.LOW_BITS = sum(1 << (Hand.BITS_PER_CARDTYPE * cardType) for cardType in range(Card.NUM_CARDTYPES)) # The lower bit of every 2-bit field
+Hand.FOLLOW_MASKS = [sum(1 << (Hand.BITS_PER_CARDTYPE * card.cardType) for card in Card.CARDTYPES if Hand.TRICK_SUITS[card.cardType] == trickSuit) for trickSuit in range(Card.TRUMP_SUIT_INDEX + 1)] # Per trick suit: the lower bit of every cardType that follows it
\ No newline at end of file
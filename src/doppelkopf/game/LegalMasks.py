@@ -0,0 +1,36 @@
+import threading
+import numpy as np
+from doppelkopf.game.Card import Card
+from doppelkopf.game.Hand import Hand
+from doppelkopf.data.DataCache import DataCache
+
+# Hands out legal-move masks (1 for every cardType that may be played, 0 otherwise). A mask only depends on the hand and the leading card,
+# so masks are memoised by the hand's legal bits (see Hand.LegalBits) in a bounded cache and shared between all callers. Shared masks are read-only!
+class LegalMasks():
+    MAX_CACHE_SIZE = 65536
+    SHIFTS = np.arange(Card.NUM_CARDTYPES, dtype=np.int64) * Hand.BITS_PER_CARDTYPE
+    cache = DataCache(MAX_CACHE_SIZE)
+    lockCache = threading.Lock() # Clients may run in several threads of the same process
+
+    @staticmethod
+    def ForHand(hand: Hand, leadingCardType: int = None) -> np.ndarray:
+        return LegalMasks.FromBits(hand.LegalBits(leadingCardType))
+
+    @staticmethod
+    def FromBits(legalBits: int) -> np.ndarray:
+        with LegalMasks.lockCache:
+            if LegalMasks.cache.Contains(legalBits):
+                return LegalMasks.cache.Get(legalBits)
+            mask = ((np.int64(legalBits) >> LegalMasks.SHIFTS) & 1).astype(np.float32)
+            mask.flags.writeable = False # The same array is handed to every caller asking for this mask
+            LegalMasks.cache.Put(legalBits, mask)
+            return mask
+
+    @staticmethod
+    def ForCounts(hands: np.ndarray, leadingCardTypes: np.ndarray) -> np.ndarray:
+        # Batched form: 'hands' holds the number of cards of each cardType (N,24), 'leadingCardTypes' the cardType that was led in each trick (N,), or -1 if nothing was led yet
+        isHeld = hands > 0
+        follows = Card.TRICK_SUITS[np.newaxis, :] == Card.TRICK_SUITS[leadingCardTypes][:, np.newaxis]
+        follows[leadingCardTypes < 0] = True # The leading player may play anything
+        canFollow = (isHeld & follows).any(axis=1)
+        return (isHeld & (follows | ~canFollow[:, np.newaxis])).astype(np.float32)
\ No newline at end of file
@@ -0,0 +1,43 @@
+from typing import List
+from doppelkopf.game.Card import Card
+from doppelkopf.game.Seat import Seat
+from doppelkopf.game.GameState import GameState
+from doppelkopf.game.CardFeedback import CardFeedback
+
+# A Seat, whose Client lives in the same process (see LocalServer). Every call is forwarded straight to the Client's handlers
+class LocalSeat(Seat):
+    def __init__(self, client):
+        self.client = client
+        self.chosenCard: Card = None
+        self.wrongCardTypes: List[int] = []
+        self.state: GameState = None
+        self.trickIndex = 0
+
+    def WantsStates(self) -> bool:
+        return self.client.wantsStates
+
+    def SendHand(self, cards: List[Card]):
+        self.client.receiveHand(cards)
+
+    def SendState(self, state: GameState, isFinalState: bool):
+        self.client.receiveState(state, isFinalState)
+
+    def RequestCard(self, state: GameState, trickIndex: int) -> int:
+        if state is not self.state: # A new move begins, so no card has been rejected yet
+            self.state = state
+            self.wrongCardTypes = []
+        self.trickIndex = trickIndex
+        self.chosenCard = self.client.chooseCard(state, self.wrongCardTypes)
+        return self.chosenCard.cardType
+
+    def SendFeedback(self, feedback: CardFeedback):
+        self.client.receiveFeedback(self.state, self.chosenCard, feedback, self.trickIndex, self.wrongCardTypes)
+
+    def SendWasQueen(self, currentPlayerIndex: int, wasQueen: bool, queenCounter: int):
+        self.client.receiveWasQueen(currentPlayerIndex, wasQueen, queenCounter)
+
+    def SendTrickCompleted(self, isTrickWinner: bool, isTeamMateTrickWinner: bool, trickValue: int):
+        self.client.receiveTrickCompleted(isTrickWinner, isTeamMateTrickWinner, trickValue)
+
+    def SendGameCompleted(self, isGameWinner: bool, score: int):
+        self.client.receiveGameCompleted(isGameWinner, score)
\ No newline at end of file
@@ -0,0 +1,65 @@
+import copy
+import traceback # For debugging
+from typing import Dict, List
+from doppelkopf.utils.Console import Console
+from doppelkopf.game.Player import Player
+from doppelkopf.game.LocalSeat import LocalSeat
+from doppelkopf.game.GameEngine import GameEngine
+
+# Plays games with Clients that live in the same process. No sockets, no threads and no pickling involved: the GameEngine calls the Clients' handlers directly
+class LocalServer():
+    def __init__(self, name="LocalServer"):
+        self.name = name
+        self.engine = GameEngine(self.name) # Holds the players and teams and plays the actual games
+        self.players: List[Player] = self.engine.players
+        self.teamRe, self.teamKontra = self.engine.teamRe, self.engine.teamKontra
+        self.playerSeatPairing: Dict[Player, LocalSeat] = {}
+        for player in self.players:
+            self.playerSeatPairing[player] = None
+        Console.WriteSuccess("Created", self.name)
+
+    def getFirstAvailablePlayer(self) -> Player:
+        for player, seat in self.playerSeatPairing.items():
+            if seat is None:
+                return player
+        return None
+
+    def IsFull(self) -> bool:
+        return self.getFirstAvailablePlayer() is None
+
+    def Join(self, client) -> bool:
+        availablePlayer = self.getFirstAvailablePlayer()
+        if availablePlayer is None: # If there is no available player slot
+            Console.WriteError("No seat left for another client", self.name)
+            return False
+        self.playerSeatPairing[availablePlayer] = LocalSeat(client)
+        # The client gets its own copies of the players and the teams, just like it would when rebuilding them after connecting through a socket
+        players = copy.deepcopy(self.players)
+        client.ConnectLocal(self, players[availablePlayer.index], players, copy.deepcopy((self.teamRe, self.teamKontra)))
+        Console.WriteSuccess("%s has joined the Server" % availablePlayer.name, self.name)
+        return True
+
+    def Leave(self, client):
+        for player, seat in self.playerSeatPairing.items():
+            if seat is not None and seat.client is client:
+                self.playerSeatPairing[player] = None # Mark this player's seat as 'None' to indicate that this player is available again
+                Console.WriteLine("Client %d (%s) has left" % (player.index, player.name), self.name)
+
+    def PlayGame(self) -> bool:
+        if not self.IsFull():
+            Console.WriteError("Cannot start a game before all seats are taken", self.name)
+            return False
+        try:
+            self.engine.PlayGame(self.playerSeatPairing)
+            return True
+        except: # If an error is raised anywhere along the game:
+            Console.WriteError(traceback.format_exc(), self.name)
+            return False
+
+    def PlayGames(self, numOfGames: int) -> int:
+        gamesCompleted = 0
+        for _ in range(numOfGames):
+            if not self.PlayGame():
+                break # Break out of loop
+            gamesCompleted += 1
+        return gamesCompleted
\ No newline at end of file
@@ -1,6 +1,7 @@
 import numpy as np
 from typing import List
 from doppelkopf.game.Card import Card
+from doppelkopf.game.Hand import Hand
 from doppelkopf.utils.Console import Console
 from doppelkopf.game.CardFeedback import CardFeedback
 
@@ -12,7 +13,7 @@ class Player():
         self.name = Player.NAMES[index]
         self.nextPlayer = None
         self.previousPlayer = None
-        self.cards: List[Card] = []
+        self.cards: Hand = Hand()
         self.team = None
         self.perceivedTeams = {}
 
@@ -90,11 +91,8 @@ class Player():
         return False
 
     def handCards(self, cards, teamRe, teamKontra) -> int:
-        self.cards = cards
-        queenCounter = 0
-        for card in self.cards:
-            if card.cardType == Card.QUEEN_OF_CLUBS_TYPE:
-                queenCounter += 1
+        self.cards = Hand(cards)
+        queenCounter = self.cards.Count(Card.QUEEN_OF_CLUBS_TYPE)
         hasQueenOfClubs = queenCounter > 0 # see if player has at least one queen of clubs
         if hasQueenOfClubs: # If player has at least one Queen of Clubs
             teamRe.AddMember(self)
@@ -107,6 +105,8 @@ class Player():
         return queenCounter
 
     def removeFirstOccurrence(self, cardType: int):
+        if not self.cards.HasCardType(cardType):
+            return False
         toDelete = None
         for card in self.cards:
             if card.cardType == cardType:
@@ -120,41 +120,26 @@ class Player():
     def canFollowCard(self, leadingCard: Card):
         if leadingCard is None:
             return True
-        for card in self.cards:
-            if leadingCard.isTrump: # If leading_card is a trump
-                if card.isTrump:
-                    return True
-            elif not card.isTrump: # If neither cards are trumps
-                if card.suit == leadingCard.suit:
-                    return True
-        return False
+        return self.cards.CanFollow(leadingCard.cardType) # Trumps follow trumps, plain cards follow plain cards of the same suit
 
     def hasCardType(self, cardType: int):
-        for card in self.cards:
-            if card.cardType == cardType:
-                return True
-        return False
+        return self.cards.HasCardType(cardType)
 
     def tryGetCardFromHand(self, cardType) -> Card:
-        for card in self.cards:
-            if card.cardType == cardType:
-                return card
+        if self.cards.HasCardType(cardType):
+            for card in self.cards:
+                if card.cardType == cardType:
+                    return card
         return Card.CARDTYPES[cardType].clone()
 
     def getFeedback(self, cardType: int, leadingCard: Card):
-        if not self.hasCardType(cardType):
+        if not self.cards.HasCardType(cardType):
             return CardFeedback.NOT_IN_HAND
-        card = self.tryGetCardFromHand(cardType)
         if leadingCard is None: # we are leading the trick, we can play anything
             return CardFeedback.OK
-        canFollow = self.canFollowCard(leadingCard)
-        if not canFollow: # If we cannot follow suit, we can play anything
+        if not self.cards.CanFollow(leadingCard.cardType): # If we cannot follow suit, we can play anything
             return CardFeedback.OK_COULD_NOT_FOLLOW_SUIT
-        else: # If we are able to follow along with leading_card
-            if leadingCard.isTrump: # If leading_card is trump
-                return CardFeedback.OK if card.isTrump else CardFeedback.NOT_ALLOWED # Only allow other trumps
-            else: # If leading_card is NOT a trump
-                return CardFeedback.OK if not card.isTrump and card.suit == leadingCard.suit else CardFeedback.NOT_ALLOWED # Only allow non-trump cards of the same suit
+        return CardFeedback.OK if Hand.Follows(leadingCard.cardType, cardType) else CardFeedback.NOT_ALLOWED # Only allow cards that follow leading_card (trumps on trumps, same suit on plain cards)
 
     def pickCardFromHand(self) -> Card: # Pick a random card from the current player hand
         return self.cards[np.random.randint(0, len(self.cards))]
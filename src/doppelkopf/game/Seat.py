@@ -0,0 +1,54 @@
+from typing import List
+from abc import ABC, abstractmethod
+from doppelkopf.game.Card import Card
+from doppelkopf.game.GameState import GameState
+from doppelkopf.game.CardFeedback import CardFeedback
+
+# A Seat is the GameEngine's view of whoever plays a player: A remote Client behind a socket, an in-process Client or a built-in policy
+# Make class abstract by inheriting from ABC (abc module)
+class Seat(ABC):
+    def WantsStates(self) -> bool:
+        return True # By default, every state is sent. Seats that have no use for them may opt out (the current player always receives its state)
+
+    def WantsRequestState(self) -> bool:
+        return True # Whether RequestCard() looks at the state it is given. If not, the state is not even built for seats that opted out of states
+
+    def KeepsStates(self) -> bool:
+        return True # Whether the seat holds on to the states it is given. If not, a state may share the encoder's buffer and the lists the GameEngine keeps changing
+
+    def SendStateDelta(self, stateIndex: int, currentPlayerIndex: int, isFinalState: bool):
+        pass # Called instead of SendState() for seats that opted out of states, so that they can follow the game from the cards played
+
+    def SendCardPlayed(self, currentPlayerIndex: int, cardType: int, queenCounter: int):
+        self.SendWasQueen(currentPlayerIndex, cardType == Card.QUEEN_OF_CLUBS_TYPE, queenCounter) # Only whether it was a Queen of Clubs matters, unless a seat needs the card itself
+
+    @abstractmethod
+    def SendHand(self, cards: List[Card]):
+        pass
+
+    @abstractmethod
+    def SendState(self, state: GameState, isFinalState: bool):
+        pass
+
+    @abstractmethod
+    def RequestCard(self, state: GameState, trickIndex: int) -> int:
+        pass
+
+    async def RequestCardAsync(self, state: GameState, trickIndex: int) -> int:
+        return self.RequestCard(state, trickIndex) # Seats that have to wait for their card (e.g. on a network) override this to not block the event loop
+
+    @abstractmethod
+    def SendFeedback(self, feedback: CardFeedback):
+        pass
+
+    @abstractmethod
+    def SendWasQueen(self, currentPlayerIndex: int, wasQueen: bool, queenCounter: int):
+        pass
+
+    @abstractmethod
+    def SendTrickCompleted(self, isTrickWinner: bool, isTeamMateTrickWinner: bool, trickValue: int):
+        pass
+
+    @abstractmethod
+    def SendGameCompleted(self, isGameWinner: bool, score: int):
+        pass
\ No newline at end of file
@@ -0,0 +1,7 @@
+from enum import Enum
+
+# Who plays a seat at the Server: a Client that connects (remotely or in process), or one of the built-in policies (see BotSeat)
+class SeatType(Enum):
+    REMOTE = "remote"
+    RULEBASED = "rulebased" # Same as RulebasedPlayer
+    RANDOM = "random" # Same as RandomPlayer
\ No newline at end of file
@@ -0,0 +1,107 @@
+from typing import List
+from doppelkopf.game.Card import Card
+from doppelkopf.game.Seat import Seat
+from doppelkopf.game.GameState import GameState
+from doppelkopf.game.CardFeedback import CardFeedback
+from doppelkopf.utils.SimpleMessaging import Message
+from doppelkopf.utils.SimpleMessaging import MessageType
+from doppelkopf.utils.SimpleMessaging import WireProtocol
+from doppelkopf.utils.SimpleMessaging import SimpleMessaging
+from doppelkopf.utils.SimpleMessaging import MessageReceiver
+
+# A Seat, whose Client is connected through a socket (see Server).
+# With deltaStates, no states are sent at all: the Client rebuilds them from its hand and the cards played (see GameStateMirror).
+# Messages are collected until the Client's next reply is needed (or the game ends) and then sent all at once
+class SocketSeat(Seat):
+    MAX_BUFFERED_BYTES = 1 << 16 # Flush early if this much is waiting, so that the Client can already start working through it
+
+    def __init__(self, clientSocket, deltaStates: bool = False):
+        self.clientSocket = clientSocket
+        self.receiver = MessageReceiver(clientSocket)
+        self.deltaStates = deltaStates
+        self.outbound: List[bytes] = []
+        self.outboundSize = 0
+        self.isDisconnected = False # Set once sending failed. Nothing is sent anymore and the Server frees the seat
+        self.remainingGames = 0 # The number of games the Client has subscribed to, but not yet played
+        self.isUnsubscribing = False # Whether the Client cancelled its subscription, but has not been answered yet
+
+    def WantsStates(self) -> bool:
+        return not self.deltaStates
+
+    def WantsRequestState(self) -> bool:
+        return False # The Client already has its state, the socket only carries the chosen card back
+
+    def KeepsStates(self) -> bool:
+        return False # Every state is encoded for the wire as soon as it is sent
+
+    def send(self, message: Message):
+        if self.isDisconnected:
+            return
+        data = WireProtocol.Encode(message)
+        self.outbound.append(data)
+        self.outboundSize += len(data)
+        if self.outboundSize >= SocketSeat.MAX_BUFFERED_BYTES:
+            self.Flush()
+
+    def Flush(self):
+        if len(self.outbound) > 0:
+            error = SimpleMessaging.SendBuffers(self.clientSocket, self.outbound)
+            self.outboundSize = 0
+            if error is not None: # The Client has vanished
+                self.isDisconnected = True
+
+    def SendHand(self, cards: List[Card]):
+        self.send(Message(MessageType.PLAYER_HAND, cards)) # Send() player hand to client
+
+    def SendState(self, state: GameState, isFinalState: bool):
+        self.send(Message(MessageType.GAME_STATE, state)) # Send() game state
+
+    def HandleSubscription(self, message: Message) -> bool:
+        # Subscriptions are renewed ahead of time and cancelled as soon as the Client is stopped, so they may arrive at any time. Returns False for any other message
+        if message.messageType == MessageType.SUBSCRIBE:
+            self.remainingGames += message.GetData()
+        elif message.messageType == MessageType.UNSUBSCRIBE:
+            self.remainingGames = 0 # A game that has already started is still played to the end
+            self.isUnsubscribing = True
+        else:
+            return False
+        return True
+
+    def AcknowledgeUnsubscribe(self):
+        # Only called in between games, so that the Client knows that no other hand is going to follow
+        if self.isUnsubscribing:
+            self.send(Message.UNSUBSCRIBE)
+            self.isUnsubscribing = False
+
+    def RequestCard(self, state: GameState, trickIndex: int) -> int:
+        self.Flush() # The Client needs everything up to now before it can answer
+        if self.isDisconnected:
+            raise ConnectionError("Cannot request a card from a Client that has disconnected")
+        expectedTypes = (MessageType.CHOSEN_CARD, MessageType.SUBSCRIBE, MessageType.UNSUBSCRIBE)
+        message = SimpleMessaging.ReceiveMessageOfTypes(self.receiver, expectedTypes) # Recv() chosen card
+        while self.HandleSubscription(message):
+            message = SimpleMessaging.ReceiveMessageOfTypes(self.receiver, expectedTypes)
+        return message.GetData()
+
+    def SendFeedback(self, feedback: CardFeedback):
+        self.send(Message(MessageType.CARDFEEDBACK, feedback)) # Send() feedback to client
+
+    def SendStateDelta(self, stateIndex: int, currentPlayerIndex: int, isFinalState: bool):
+        self.send(Message(MessageType.STATE_DELTA, (stateIndex, currentPlayerIndex, isFinalState)))
+
+    def SendCardPlayed(self, currentPlayerIndex: int, cardType: int, queenCounter: int):
+        if self.deltaStates:
+            self.send(Message(MessageType.CARD_PLAYED, (currentPlayerIndex, cardType, queenCounter)))
+        else:
+            super(SocketSeat, self).SendCardPlayed(currentPlayerIndex, cardType, queenCounter)
+
+    def SendWasQueen(self, currentPlayerIndex: int, wasQueen: bool, queenCounter: int):
+        self.send(Message(MessageType.WAS_QUEEN, (wasQueen, queenCounter)))
+
+    def SendTrickCompleted(self, isTrickWinner: bool, isTeamMateTrickWinner: bool, trickValue: int):
+        self.send(Message(MessageType.TRICK_COMPLETED, (isTrickWinner, isTeamMateTrickWinner, trickValue)))
+
+    def SendGameCompleted(self, isGameWinner: bool, score: int):
+        self.send(Message(MessageType.GAME_COMPLETED, (isGameWinner, score)))
+        self.AcknowledgeUnsubscribe() # If the Client cancelled its subscription during this game
+        self.Flush()
\ No newline at end of file
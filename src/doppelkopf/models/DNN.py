@@ -12,6 +12,7 @@ if gpus:
 from doppelkopf.game.Card import Card
 from doppelkopf.utils.Console import Console
 from doppelkopf.game.GameState import GameState
+from doppelkopf.models.NumpyDNN import NumpyDNN
 
 class DNN(tf.keras.Sequential):
     def __init__(self, name, learningRate, denseLayerUnits, inputSize=GameState.SIZE_STATE, outputSize=Card.NUM_CARDTYPES, loadWeightsPath=None):
@@ -22,6 +23,7 @@ class DNN(tf.keras.Sequential):
         self.add(tf.keras.layers.Dense(units=outputSize, name="Output")) # Last layer has no activation
         self.myOptimiser = tf.keras.optimizers.Adam(learning_rate=learningRate)
         self.compile(self.myOptimiser, loss=tf.keras.losses.mean_squared_error)
+        self.predictStep = tf.function(self.predictStepGraph, input_signature=[tf.TensorSpec(shape=(None, inputSize), dtype=tf.float32)]) # Traced once, for any batch size
         Console.WriteSuccess("Compiled", "DNN %s" % name)
         self.summary()
         if loadWeightsPath is not None:
@@ -40,6 +42,11 @@ class DNN(tf.keras.Sequential):
             Console.WriteError(e, self.name)
             return False
 
+    def ExportNumpy(self, exportPath):
+        # Writes the weights to a .npz file, which a NumpyDNN can load without TensorFlow
+        NumpyDNN.Save(exportPath, self.get_weights())
+        Console.WriteSuccess("Weights exported to %s" % exportPath, self.name)
+
     def TrySaveWeights(self, weightsPath):
         try:
             self.save_weights(weightsPath)
@@ -61,7 +68,14 @@ class DNN(tf.keras.Sequential):
         return output[:,:,index]
 
     def QValuesNumpy(self, inputs: np.ndarray) -> np.ndarray:
-        return tf.keras.backend.eval(self.QValues(inputs)) # Evaluate the tensor to get its values
+        return self.predictStep(np.asarray(inputs, dtype=np.float32)).numpy() # One graph call instead of running each layer eagerly
+
+    def predictStepGraph(self, inputs: tf.Tensor) -> tf.Tensor:
+        return self(inputs, training=False)
+
+    def WarmUp(self):
+        # Traces the compiled prediction up front, so that the first card picked does not have to wait for it
+        self.predictStep.get_concrete_function()
 
     def QValuesArgmaxNumpy(self, inputs: np.ndarray) -> int:
         return tf.keras.backend.eval(self.QValuesArgmax(inputs))
@@ -0,0 +1,113 @@
+import time
+import queue
+import asyncio
+import threading
+import traceback # For debugging
+import numpy as np
+from typing import List, Tuple
+from concurrent.futures import Future
+from doppelkopf.utils.Console import Console
+
+# Answers Q-value requests of many agents (or tables) with one shared DNN. Requests are collected into micro-batches: a batch is evaluated
+# as soon as it holds 'maxBatchSize' states or its first request has waited for 'maxWaitTime' seconds, whatever comes first.
+# Each request gets its own Future, so callers may block (QValues()), await (QValuesAsync()) or collect results later (Submit())
+class InferenceServer():
+    THREAD_NAME = "Thread_Inference"
+    STOP = None # Put on the request queue to wake up and end the inference thread
+
+    def __init__(self, model, maxBatchSize=64, maxWaitTime=0.002, name="InferenceServer"):
+        self.name = name
+        self.model = model # A DNN or a NumpyDNN
+        self.maxBatchSize = maxBatchSize
+        self.maxWaitTime = maxWaitTime # Seconds. The longest a request waits for others to join its batch
+        self.requests = queue.Queue()
+        self.batch = np.empty(shape=(maxBatchSize, model.input_shape[-1]), dtype=np.float32) # Reused for every batch
+        self.thread = None
+        # # # # # # # # # # # # # # # Statistics # # # # # # # # # # # # # # #
+        self.numOfRequests = 0
+        self.numOfBatches = 0
+        self.largestBatchSize = 0
+        self.busyTime = 0.0 # Seconds spent in the DNN
+        self.startTime = None
+
+    def Start(self):
+        if self.thread is not None:
+            return False
+        self.startTime = time.perf_counter()
+        self.thread = threading.Thread(target=self.serveRequests, name=InferenceServer.THREAD_NAME, daemon=True)
+        self.thread.start()
+        Console.WriteSuccess("Started (batches of up to %d states, waiting up to %.1f ms)" % (self.maxBatchSize, self.maxWaitTime * 1000), self.name)
+        return True
+
+    def Stop(self):
+        if self.thread is None:
+            return False
+        self.requests.put(InferenceServer.STOP)
+        self.thread.join()
+        self.thread = None
+        self.LogStatistics()
+        Console.WriteSuccess("Stopped", self.name)
+        return True
+
+    def Submit(self, state: np.ndarray) -> Future:
+        future = Future()
+        self.requests.put((state, future))
+        return future
+
+    def QValues(self, state: np.ndarray) -> np.ndarray:
+        return self.Submit(state).result() # The 24 Q-values of this single (flat) state
+
+    async def QValuesAsync(self, state: np.ndarray) -> np.ndarray:
+        return await asyncio.wrap_future(self.Submit(state)) # Does not block the event loop while waiting for the batch
+
+    def collectBatch(self, first: Tuple[np.ndarray, Future]) -> Tuple[List[Future], bool]:
+        futures = [first[1]]
+        self.batch[0] = first[0]
+        deadline = time.perf_counter() + self.maxWaitTime
+        while len(futures) < self.maxBatchSize:
+            try:
+                timeout = deadline - time.perf_counter()
+                request = self.requests.get_nowait() if timeout <= 0 else self.requests.get(timeout=timeout) # Once the time is up, only take what is already waiting
+            except queue.Empty:
+                break
+            if request is InferenceServer.STOP:
+                return futures, True
+            self.batch[len(futures)] = request[0]
+            futures.append(request[1])
+        return futures, False
+
+    def serveRequests(self):
+        stop = False
+        while not stop:
+            first = self.requests.get() # Sleep until there is something to do
+            if first is InferenceServer.STOP:
+                break
+            futures, stop = self.collectBatch(first)
+            try:
+                start = time.perf_counter()
+                qValues = self.model.QValuesNumpy(self.batch[:len(futures)]) # One call for the whole batch
+                self.busyTime += time.perf_counter() - start
+                for i, future in enumerate(futures):
+                    future.set_result(qValues[i])
+            except Exception as e:
+                Console.WriteError(traceback.format_exc(), self.name)
+                for future in futures:
+                    future.set_exception(e)
+            self.numOfRequests += len(futures)
+            self.numOfBatches += 1
+            self.largestBatchSize = max(self.largestBatchSize, len(futures))
+
+    def Statistics(self) -> dict:
+        elapsed = time.perf_counter() - self.startTime if self.startTime is not None else 0.0
+        return {
+            "requests": self.numOfRequests,
+            "batches": self.numOfBatches,
+            "averageBatchSize": self.numOfRequests / self.numOfBatches if self.numOfBatches > 0 else 0.0,
+            "largestBatchSize": self.largestBatchSize,
+            "requestsPerSecond": self.numOfRequests / elapsed if elapsed > 0 else 0.0,
+            "busyTime": self.busyTime,
+        }
+
+    def LogStatistics(self):
+        statistics = self.Statistics()
+        Console.WriteInfo("%d requests in %d batches (average batch size %.1f, largest %d). %.0f requests/s, %.1f s spent in the DNN" % (statistics["requests"], statistics["batches"], statistics["averageBatchSize"], statistics["largestBatchSize"], statistics["requestsPerSecond"], statistics["busyTime"]), self.name)
\ No newline at end of file
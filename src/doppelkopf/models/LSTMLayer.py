@@ -25,12 +25,18 @@ class LSTMLayer(tf.keras.layers.LSTM):
             self.useLastState = newValue
 
     def call(self, inputs, mask=None, training=None, initial_state=None):
+        if not tf.executing_eagerly(): # In a graph (e.g. fit() or predict()), the states are symbolic and must not be kept beyond it
+            return super(LSTMLayer, self).call(inputs=inputs, mask=mask, training=training, initial_state=initial_state)
         if self.useLastState:
             if self.lastHiddenState is not None and self.lastCellState is not None:
                 initial_state = [self.lastHiddenState, self.lastCellState]
         self.outputTensor, self.lastHiddenState, self.lastCellState = super(LSTMLayer, self).call(inputs=inputs, mask=mask, training=training, initial_state=initial_state)
         return self.outputTensor, self.lastHiddenState, self.lastCellState
 
+    def CallWithStates(self, inputs, hiddenState, cellState):
+        # Like call(), but the states are passed in and returned instead of kept, so that it can be compiled (see LSTMModel.predictStepGraph())
+        return super(LSTMLayer, self).call(inputs=inputs, initial_state=[hiddenState, cellState])
+
     def ResetInternalStates(self):
         self.lastHiddenState = None
         self.lastCellState = None
@@ -48,7 +48,9 @@ class LSTMModel(tf.keras.Model):
         self.outputUnits = outputUnits
         self.learningRate = learningRate
         self.myOptimizer = tf.keras.optimizers.Adam(learning_rate=self.learningRate)
-        self.compile(optimizer=self.myOptimizer, loss=tf.keras.losses.mean_squared_error, run_eagerly=True) # Should be enabled by default #tf.losses.mean_squared_error
+        self.compile(optimizer=self.myOptimizer, loss=tf.keras.losses.mean_squared_error) # fit() and evaluate() run as graphs #tf.losses.mean_squared_error
+        statesSignature = [tf.TensorSpec(shape=(None, lstmLayer.units), dtype=tf.float32) for lstmLayer in lstmLayers] # One per layer
+        self.predictStep = tf.function(self.predictStepGraph, input_signature=[tf.TensorSpec(shape=(None, None, inputSize), dtype=tf.float32), statesSignature, statesSignature]) # Traced once, for any batch size and sequence length
         Console.WriteSuccess("Compiled. Summary:", self.name)
         self.summary() # Print summary
         self.useLastState = False
@@ -127,7 +129,36 @@ class LSTMModel(tf.keras.Model):
         return output[:,:,index]
 
     def QValuesNumpy(self, inputs: np.ndarray, useLastState=False, mask=None) -> np.ndarray:
-        return tf.keras.backend.eval(self.QValues(inputs, useLastState, mask)) # Evaluate the tensor to get its values
+        if mask is not None:
+            return tf.keras.backend.eval(self.QValues(inputs, useLastState, mask)) # Masks are only supported eagerly
+        inputs = np.asarray(inputs, dtype=np.float32)
+        hiddenStates = []
+        cellStates = []
+        for lstmLayer in self.lstmLayers: # Start where the last call left off, or from zeros (just like the LSTM layers do by themselves)
+            if useLastState and lstmLayer.lastHiddenState is not None and lstmLayer.lastCellState is not None:
+                hiddenStates.append(lstmLayer.lastHiddenState)
+                cellStates.append(lstmLayer.lastCellState)
+            else:
+                hiddenStates.append(tf.zeros(shape=(inputs.shape[0], lstmLayer.units)))
+                cellStates.append(tf.zeros(shape=(inputs.shape[0], lstmLayer.units)))
+        self.SetUseLastState(useLastState)
+        out, hiddenStates, cellStates = self.predictStep(inputs, hiddenStates, cellStates)
+        self.SetStates(list(zip(hiddenStates, cellStates))) # Keep the states for the next call, as QValues() does
+        return out.numpy()
+
+    def predictStepGraph(self, inputs: tf.Tensor, hiddenStates: List[tf.Tensor], cellStates: List[tf.Tensor]):
+        out = inputs
+        newHiddenStates = []
+        newCellStates = []
+        for lstmLayer, hiddenState, cellState in zip(self.lstmLayers, hiddenStates, cellStates):
+            out, h, c = lstmLayer.CallWithStates(out, hiddenState, cellState)
+            newHiddenStates.append(h)
+            newCellStates.append(c)
+        return out, newHiddenStates, newCellStates
+
+    def WarmUp(self):
+        # Traces the compiled prediction up front, so that the first card picked does not have to wait for it
+        self.predictStep.get_concrete_function()
 
     def QValuesArgmaxNumpy(self, inputs: np.ndarray, useLastState=False, mask=None) -> int:
         return tf.keras.backend.eval(self.QValuesArgmax(inputs, useLastState, mask))
@@ -0,0 +1,50 @@
+import numpy as np
+from typing import List
+from doppelkopf.utils.Console import Console
+
+# Runs a trained DNN in plain NumPy: one matrix multiplication plus ReLU per hidden layer and a linear output layer, just like DNN does.
+# For players that never train (evaluation runs, rule checks, many parallel workers), which then do not need to import TensorFlow at all.
+# The weights come from a .npz file written by DNN.ExportNumpy() (or the ExportDNN program)
+class NumpyDNN():
+    FILE_EXTENSION = ".npz"
+
+    def __init__(self, name: str, weights: List[np.ndarray]):
+        self.name = name
+        self.kernels = [np.ascontiguousarray(kernel, dtype=np.float32) for kernel in weights[0::2]] # Same order as DNN.get_weights(): kernel, bias, kernel, bias, ...
+        self.biases = [np.asarray(bias, dtype=np.float32) for bias in weights[1::2]]
+        self.input_shape = (None, self.kernels[0].shape[0]) # Like a Keras model (see InferenceServer)
+        Console.WriteSuccess("Created with layers of %s units" % ([kernel.shape[1] for kernel in self.kernels]), self.name)
+
+    @staticmethod
+    def IsExport(path: str) -> bool:
+        return path is not None and path.endswith(NumpyDNN.FILE_EXTENSION)
+
+    @staticmethod
+    def Save(path: str, weights: List[np.ndarray]):
+        arrays = {}
+        for i in range(len(weights) // 2):
+            arrays["kernel%d" % i] = np.asarray(weights[2 * i], dtype=np.float32)
+            arrays["bias%d" % i] = np.asarray(weights[2 * i + 1], dtype=np.float32)
+        np.savez_compressed(path, **arrays)
+
+    @staticmethod
+    def Load(path: str, name="NumpyDNN"):
+        with np.load(path) as arrays:
+            weights = []
+            for i in range(len(arrays.files) // 2):
+                weights.append(arrays["kernel%d" % i])
+                weights.append(arrays["bias%d" % i])
+        Console.WriteSuccess("Weights loaded from %s" % path, name)
+        return NumpyDNN(name, weights)
+
+    def get_weights(self) -> List[np.ndarray]:
+        return [array for kernel, bias in zip(self.kernels, self.biases) for array in (kernel, bias)]
+
+    def QValuesNumpy(self, inputs: np.ndarray) -> np.ndarray:
+        out = np.asarray(inputs, dtype=np.float32)
+        for kernel, bias in zip(self.kernels[:-1], self.biases[:-1]):
+            out = np.maximum(out @ kernel + bias, 0) # ReLU
+        return out @ self.kernels[-1] + self.biases[-1] # Last layer has no activation
+
+    def WarmUp(self):
+        pass # Nothing to compile
\ No newline at end of file
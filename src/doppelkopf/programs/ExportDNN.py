@@ -0,0 +1,46 @@
+import sys
+import numpy as np
+from doppelkopf.models.DNN import DNN
+from doppelkopf.utils.Console import Console
+from doppelkopf.game.GameState import GameState
+from doppelkopf.models.NumpyDNN import NumpyDNN
+from doppelkopf.programs.Program import Program
+from doppelkopf.programs.Argument import Argument
+from doppelkopf.programs.OptionalArgument import OptionalArgument
+
+# Turns the weights of a trained DNN into a .npz file, which players can load into a NumpyDNN (see RunDNNPlayer) without TensorFlow
+class ExportDNN(Program):
+    def __init__(self):
+        requireds = [
+            Argument(name="loadWeightsPath", expectedType=str)
+        ]
+        optionals = [
+            OptionalArgument(name="exportPath", expectedType=str, defaultValue=None), # Defaults to 'loadWeightsPath' with '.npz' appended
+            OptionalArgument(name="denseLayerUnits", expectedType=list, defaultValue=[256, 128, 64]),
+        ]
+        super(ExportDNN, self).__init__(requireds, optionals)
+
+    def onRun(self):
+        # # # # # # # # # # # # # # # Get values from parameters # # # # # # # # # # # # # # #
+        loadWeightsPath = self.GetArgumentByName("loadWeightsPath")
+        exportPath = self.GetArgumentByName("exportPath")
+        denseLayerUnits = self.GetArgumentByName("denseLayerUnits")
+        if exportPath is None:
+            exportPath = loadWeightsPath + NumpyDNN.FILE_EXTENSION
+        # # # # # # # # # # # # # # # Load and export # # # # # # # # # # # # # # #
+        model = DNN("Export", 0.001, denseLayerUnits) # The learning rate does not matter, nothing is trained here
+        if not model.TryLoadWeights(loadWeightsPath):
+            Console.WriteError("Nothing was exported", "ExportDNN")
+            return
+        model.ExportNumpy(exportPath)
+        # # # # # # # # # # # # # # # Make sure both give the same estimates # # # # # # # # # # # # # # #
+        states, _ = GameState.RandomFlats(256)
+        difference = np.max(np.abs(model.QValuesNumpy(states) - NumpyDNN.Load(exportPath).QValuesNumpy(states)))
+        Console.WriteInfo("Largest difference between the estimates of the DNN and the export: %g" % difference, "ExportDNN")
+
+def main(args):
+    program = ExportDNN()
+    program.Run(args)
+
+if __name__ == '__main__':
+    main(sys.argv)
\ No newline at end of file
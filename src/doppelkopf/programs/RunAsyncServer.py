@@ -0,0 +1,35 @@
+import sys
+from doppelkopf.utils.Console import Console
+#Console.CurrentLevel = Console.LEVEL_OMIT_INFO
+from doppelkopf.game.AsyncServer import AsyncServer
+from doppelkopf.programs.Program import Program
+from doppelkopf.programs.OptionalArgument import OptionalArgument
+
+class RunAsyncServer(Program):
+    def __init__(self):
+        optionals = [
+            OptionalArgument(name="host", expectedType=str, defaultValue="localhost"),     
+            OptionalArgument(name="port", expectedType=int, defaultValue=8088),
+            OptionalArgument(name="deltaStates", expectedType=bool, defaultValue=False), # Stream only the cards played, the clients rebuild the states
+            OptionalArgument(name="maxTables", expectedType=int, defaultValue=0), # 0 for no limit
+        ]
+        super(RunAsyncServer, self).__init__([], optionals) # Call base constuctor
+
+    def onRun(self):
+        # # # # # # # # # # # # # # # Get values from parameters # # # # # # # # # # # # # # #
+        host = self.GetArgumentByName("host")
+        port = self.GetArgumentByName("port")
+        deltaStates = self.GetArgumentByName("deltaStates")
+        maxTables = self.GetArgumentByName("maxTables")
+        # # # # # # # # # # # # # # # Run AsyncServer # # # # # # # # # # # # # # #
+        server = AsyncServer("AsyncServer", host, port, deltaStates=deltaStates, maxTables=maxTables if maxTables > 0 else None)
+        server.Start()
+        Console.ReadInput("Press Enter to Stop the Server\n")
+        server.Stop()
+
+def main(args):
+    program = RunAsyncServer()
+    program.Run(args)
+
+if __name__ == '__main__':
+    main(sys.argv)
\ No newline at end of file
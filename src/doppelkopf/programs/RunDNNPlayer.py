@@ -1,8 +1,13 @@
 import sys
+import threading
+from typing import List
 from doppelkopf.utils.Console import Console
 #Console.CurrentLevel = Console.LEVEL_OMIT_INFO
 from doppelkopf.programs.Program import Program
 from doppelkopf.agents.DNNPlayer import DNNPlayer
+from doppelkopf.models.InferenceServer import InferenceServer
+from doppelkopf.game.LocalServer import LocalServer
+from doppelkopf.agents.RulebasedPlayer import RulebasedPlayer
 from doppelkopf.programs.OptionalArgument import OptionalArgument
 
 class RunDNNPlayer(Program):
@@ -15,6 +20,8 @@ class RunDNNPlayer(Program):
             OptionalArgument(name="loadWeightsPath", expectedType=str, defaultValue=None),
             OptionalArgument(name="denseLayerUnits", expectedType=list, defaultValue=[256, 128, 64]),
             OptionalArgument(name="logFile", expectedType=str, defaultValue=None),
+            OptionalArgument(name="inProcess", expectedType=bool, defaultValue=False),
+            OptionalArgument(name="numOfAgents", expectedType=int, defaultValue=1), # More than one agent share a DNN and have their predictions batched by an InferenceServer
         ]
         super(RunDNNPlayer, self).__init__([], optionals)
 
@@ -27,13 +34,53 @@ class RunDNNPlayer(Program):
         loadWeightsPath = self.GetArgumentByName("loadWeightsPath")
         denseLayerUnits = self.GetArgumentByName("denseLayerUnits")
         logFile = self.GetArgumentByName("logFile")
+        inProcess = self.GetArgumentByName("inProcess")
+        numOfAgents = self.GetArgumentByName("numOfAgents")
+        if numOfAgents > 1:
+            self.runAgentsBatched(numOfAgents, host, port, numOfGames, learningRate, loadWeightsPath, denseLayerUnits, logFile, inProcess)
+            return
         # # # # # # # # # # # # # # # Run DNN Agent # # # # # # # # # # # # # # #
         player = DNNPlayer(learningRate, loadWeightsPath, denseLayerUnits) # Use default parameters for learningRate and batchSize because this script does not perform any training anyway
-        player.ConnectToServer(host, port) # Connect to Server
-        player.PlayGames(numOfGames)
+        player.WarmUp()
+        self.runAgent(player, host, port, numOfGames, logFile, inProcess, canBeInterrupted=True)
+
+    def runAgentsBatched(self, numOfAgents, host, port, numOfGames, learningRate, loadWeightsPath, denseLayerUnits, logFile, inProcess):
+        # # # # # # # # # # # # # # # One DNN for all agents, their requests are answered in batches # # # # # # # # # # # # # # #
+        model = DNNPlayer.CreateModel("Shared DNN", learningRate, loadWeightsPath, denseLayerUnits) # A NumpyDNN, if the weights were exported to a .npz file
+        model.WarmUp()
+        inferenceServer = InferenceServer(model)
+        inferenceServer.Start()
+        players = [DNNPlayer(learningRate, loadWeightsPath, denseLayerUnits, inferenceServer=inferenceServer) for _ in range(numOfAgents)]
+        playerThreads = [threading.Thread(target=self.runAgent, args=(player, host, port, numOfGames, logFile, inProcess, False)) for player in players]
+        for playerThread in playerThreads:
+            playerThread.start()
+        thread = threading.Thread(target=self.threadInterruptAgents, args=(players,), daemon=True) # One input thread for all agents, since they share the console
+        thread.start()
+        for playerThread in playerThreads:
+            playerThread.join()
+        inferenceServer.Stop() # Also logs how well the requests were batched
+
+    def threadInterruptAgents(self, players: List[DNNPlayer]):
+        Console.ReadInput("Press Enter to stop/end gameplay\n") # Wait for user input
+        for player in players:
+            player.client.Stop() # Every agent stops after its current game
+
+    def runAgent(self, player: DNNPlayer, host, port, numOfGames, logFile, inProcess, canBeInterrupted):
+        dummyPlayers = []
+        if inProcess: # Play against 3 rule-based players at an in-process server instead of connecting to a Server
+            localServer = LocalServer()
+            for _ in range(3):
+                dummyPlayers.append(RulebasedPlayer())
+                dummyPlayers[-1].JoinLocalServer(localServer)
+            player.JoinLocalServer(localServer)
+        else:
+            player.ConnectToServer(host, port) # Connect to Server
+        player.PlayGames(numOfGames, canBeInterrupted)
         if logFile is not None:
             player.LogReport(logFile, numOfGames)
         player.DisconnectFromServer() # Disconnect from Server
+        for dummyPlayer in dummyPlayers:
+            dummyPlayer.DisconnectFromServer()
 
 def main(args):
     program = RunDNNPlayer()
@@ -9,6 +9,10 @@ from doppelkopf.programs.Program import Program
 from doppelkopf.programs.Argument import Argument
 from doppelkopf.agents.DNNTrainerRL import RewardType
 from doppelkopf.agents.DNNTrainerRL import DNNTrainerRL
+from doppelkopf.agents.SelfPlayPool import SelfPlayPool
+from doppelkopf.game.Server import Server
+from doppelkopf.game.SeatType import SeatType
+from doppelkopf.game.LocalServer import LocalServer
 from doppelkopf.agents.RulebasedPlayer import RulebasedPlayer
 from doppelkopf.programs.OptionalArgument import OptionalArgument
 
@@ -34,6 +38,13 @@ class RunDNNTrainerRL(Program):
             OptionalArgument(name="minimumEpsilon", expectedType=float, defaultValue=0.05),
             OptionalArgument(name="rewardType", expectedType=RewardType, defaultValue=RewardType.PER_VALID_CARD),
             OptionalArgument(name="logFile", expectedType=str, defaultValue=None),
+            OptionalArgument(name="inProcess", expectedType=bool, defaultValue=False),
+            OptionalArgument(name="queues", expectedType=bool, defaultValue=False), # Run a Server in this process and exchange all messages through queues instead of TCP
+            OptionalArgument(name="startDummyPlayers", expectedType=bool, defaultValue=True), # Set to False if the Server already seats its own bots (see RunServer's 'seats')
+            OptionalArgument(name="numOfWorkers", expectedType=int, defaultValue=0), # If greater than 0, this many processes play games in parallel, while this process only trains
+            OptionalArgument(name="updatesPerStep", expectedType=float, defaultValue=None), # If set, train on a background thread with this many batches per experience, instead of after each game
+            OptionalArgument(name="prioritizedReplay", expectedType=bool, defaultValue=False), # Sample experiences in proportion to their last TD-error
+            OptionalArgument(name="stateBufferSize", expectedType=int, defaultValue=None), # Distinct states the buffer can hold (defaults to bufferSize). Experiences share states, so less is usually enough
         ]
         super(RunDNNTrainerRL, self).__init__(required, optionals) # Call base constructor
 
@@ -56,6 +67,13 @@ class RunDNNTrainerRL(Program):
         minimumEpsilon = self.GetArgumentByName("minimumEpsilon")
         rewardType = self.GetArgumentByName("rewardType")
         logFile = self.GetArgumentByName("logFile")
+        inProcess = self.GetArgumentByName("inProcess")
+        queues = self.GetArgumentByName("queues")
+        startDummyPlayers = self.GetArgumentByName("startDummyPlayers")
+        numOfWorkers = self.GetArgumentByName("numOfWorkers")
+        updatesPerStep = self.GetArgumentByName("updatesPerStep")
+        prioritizedReplay = self.GetArgumentByName("prioritizedReplay")
+        stateBufferSize = self.GetArgumentByName("stateBufferSize")
         # # # # # # # # # # # # # # # Create agent # # # # # # # # # # # # # # #
         trainer = DNNTrainerRL(
             learningRate,
@@ -70,12 +88,25 @@ class RunDNNTrainerRL(Program):
             epsilon,
             epsilonDecayRate,
             minimumEpsilon,
-            rewardType
+            rewardType,
+            updatesPerStep,
+            prioritizedReplay,
+            stateBufferSize
         )
+        trainer.WarmUp() # Compile the predict and train steps before the first game starts
+        if numOfWorkers > 0:
+            self.trainInParallel(trainer, numOfGames, numOfWorkers, logFile)
+            return
+        if inProcess:
+            self.trainInProcess(trainer, numOfGames, logFile)
+            return
+        if queues:
+            self.trainWithQueues(trainer, numOfGames, logFile)
+            return
         # # # # # # # # # # # # # # # Start Dummy players in threads # # # # # # # # # # # # # # #
         dummyPlayers: List[RulebasedPlayer] = []
         dummyPlayerThreads: List[threading.Thread] = []
-        for i in range(3):
+        for i in range(3 if startDummyPlayers else 0):
             dummyPlayers.append(RulebasedPlayer())
             dummyPlayerThreads.append(threading.Thread(target=self.threadRunDummyPlayer, args=(dummyPlayers[i], host, port, numOfGames)))
             dummyPlayerThreads[i].start()
@@ -86,10 +117,45 @@ class RunDNNTrainerRL(Program):
             trainer.LogReport(logFile, numOfGames, lastloss)
         trainer.DisconnectFromServer()
         # # # # # # # # # # # # # # # End Dummy player threads # # # # # # # # # # # # # # #
-        for i in range(3):
+        for i in range(len(dummyPlayers)):
             dummyPlayers[i].client.Stop()
             dummyPlayerThreads[i].join()
 
+    def trainInParallel(self, trainer: DNNTrainerRL, numOfGames, numOfWorkers, logFile):
+        # # # # # # # # # # # # # # # Each worker process plays at its own in-process server, the trainer only learns from their experiences # # # # # # # # # # # # # # #
+        pool = SelfPlayPool(trainer, numOfWorkers)
+        lastloss = pool.DoReinforcementLearning(numOfGames)
+        if logFile is not None:
+            trainer.LogReport(logFile, numOfGames, lastloss)
+
+    def trainInProcess(self, trainer: DNNTrainerRL, numOfGames, logFile):
+        # # # # # # # # # # # # # # # Seat trainer and Dummy players at an in-process server (no sockets, no threads) # # # # # # # # # # # # # # #
+        localServer = LocalServer()
+        dummyPlayers: List[RulebasedPlayer] = []
+        for i in range(3):
+            dummyPlayers.append(RulebasedPlayer())
+            dummyPlayers[i].JoinLocalServer(localServer)
+        trainer.JoinLocalServer(localServer)
+        # # # # # # # # # # # # # # # Train the agent # # # # # # # # # # # # # # #
+        lastloss = trainer.DoReinforcementLearning(numOfGames) # The trainer drives the games, the Dummy players are called back by the server
+        if logFile is not None:
+            trainer.LogReport(logFile, numOfGames, lastloss)
+        trainer.DisconnectFromServer()
+        for dummyPlayer in dummyPlayers:
+            dummyPlayer.DisconnectFromServer()
+
+    def trainWithQueues(self, trainer: DNNTrainerRL, numOfGames, logFile):
+        # # # # # # # # # # # # # # # Start a Server without a socket. The trainer connects through in-process queues, the Dummy players are bots on the Server # # # # # # # # # # # # # # #
+        server = Server("Server", None, None, numOfClientsRequired=1, seatTypes=[SeatType.REMOTE, SeatType.RULEBASED, SeatType.RULEBASED, SeatType.RULEBASED])
+        server.Start()
+        # # # # # # # # # # # # # # # Train the agent # # # # # # # # # # # # # # #
+        trainer.ConnectToServerInProcess(server)
+        lastloss = trainer.DoReinforcementLearning(numOfGames)
+        if logFile is not None:
+            trainer.LogReport(logFile, numOfGames, lastloss)
+        trainer.DisconnectFromServer()
+        server.Stop()
+
     def threadRunDummyPlayer(self, dummyPlayer: RulebasedPlayer, host: str, port: int, numOfGames):
         dummyPlayer.ConnectToServer(host, port)
         dummyPlayer.PlayGames(numOfGames, canBeInterrupted=False)
@@ -2,6 +2,7 @@ import sys
 from doppelkopf.utils.Console import Console
 #Console.CurrentLevel = Console.LEVEL_OMIT_INFO
 from doppelkopf.game.Server import Server
+from doppelkopf.game.SeatType import SeatType
 from doppelkopf.programs.Program import Program
 from doppelkopf.programs.OptionalArgument import OptionalArgument
 
@@ -10,6 +11,8 @@ class RunServer(Program):
         optionals = [
             OptionalArgument(name="host", expectedType=str, defaultValue="localhost"),     
             OptionalArgument(name="port", expectedType=int, defaultValue=8088),
+            OptionalArgument(name="deltaStates", expectedType=bool, defaultValue=False), # Stream only the cards played, the clients rebuild the states
+            OptionalArgument(name="seats", expectedType=list, defaultValue=["remote", "remote", "remote", "remote"]), # One of 'remote', 'rulebased' or 'random' per seat. Bots play on the server itself
         ]
         super(RunServer, self).__init__([], optionals) # Call base constuctor
 
@@ -17,8 +20,10 @@ class RunServer(Program):
         # # # # # # # # # # # # # # # Get values from parameters # # # # # # # # # # # # # # #
         host = self.GetArgumentByName("host")
         port = self.GetArgumentByName("port")
+        deltaStates = self.GetArgumentByName("deltaStates")
+        seatTypes = [SeatType(seat) for seat in self.GetArgumentByName("seats")]
         # # # # # # # # # # # # # # # Run Server # # # # # # # # # # # # # # #
-        server = Server("Server", host, port, numOfClientsRequired=4)
+        server = Server("Server", host, port, numOfClientsRequired=4, deltaStates=deltaStates, seatTypes=seatTypes)
         server.Start()
         Console.ReadInput("Press Enter to Stop the Server\n")
         server.Stop()
@@ -0,0 +1,59 @@
+import queue
+
+# One end of an in-process connection, that can be used wherever SimpleMessaging expects a socket. The bytes written to one end are put
+# into the other end's queue, so Server and Client exchange exactly the same messages as over TCP, but without the kernel's network stack
+class QueueSocket():
+    def __init__(self):
+        self.inbound = queue.SimpleQueue() # Chunks of bytes sent by the peer. None marks that the peer has closed its end
+        self.peer: QueueSocket = None
+        self.pending = memoryview(b'') # The part of the current chunk that has not been received yet
+        self.isClosed = False
+        self.isPeerClosed = False
+
+    @staticmethod
+    def Pair() -> tuple:
+        a = QueueSocket()
+        b = QueueSocket()
+        a.peer = b
+        b.peer = a
+        return a, b
+
+    def sendall(self, data):
+        if self.isClosed:
+            raise ConnectionError("Cannot send on a closed QueueSocket")
+        self.peer.inbound.put(bytes(data))
+
+    def sendmsg(self, buffers) -> int:
+        data = b''.join(buffers)
+        self.sendall(data)
+        return len(data)
+
+    def recv_into(self, view, numOfBytes=0) -> int:
+        if len(self.pending) == 0:
+            if self.isPeerClosed:
+                return 0
+            chunk = self.inbound.get() # Blocks until the peer sends something
+            if chunk is None:
+                self.isPeerClosed = True
+                return 0 # Just like a socket, 0 bytes signal that the connection was closed
+            self.pending = memoryview(chunk)
+        numOfBytes = min(len(view), len(self.pending)) if numOfBytes <= 0 else min(numOfBytes, len(view), len(self.pending))
+        view[:numOfBytes] = self.pending[:numOfBytes]
+        self.pending = self.pending[numOfBytes:]
+        return numOfBytes
+
+    def recv(self, numOfBytes: int) -> bytes:
+        buffer = bytearray(numOfBytes)
+        received = self.recv_into(memoryview(buffer))
+        return bytes(buffer[:received])
+
+    def setblocking(self, flag: bool):
+        pass # Always blocking
+
+    def setsockopt(self, *args):
+        pass # There is no Nagle's algorithm to turn off
+
+    def close(self):
+        if not self.isClosed:
+            self.isClosed = True
+            self.peer.inbound.put(None)
\ No newline at end of file
@@ -1,6 +1,11 @@
-import pickle
+import struct
+import socket as sockets
+import numpy as np
 from enum import Enum
+from doppelkopf.game.Card import Card
 from doppelkopf.utils.Console import Console
+from doppelkopf.game.GameState import GameState
+from doppelkopf.game.CardFeedback import CardFeedback
 
 class Ping_Pong_Type(Enum):
     PING = 0
@@ -10,7 +15,7 @@ class Ping_Pong_Type(Enum):
 class MessageType(Enum):
     DISCONNECT = 0
     READY_TO_PLAY = 1
-    NOT_YET_READY = 2
+    NOT_YET_READY = 2 # Sent to subscribed Clients while their table is incomplete. They answer with READY_TO_PLAY (after UNSUBSCRIBE, if they were stopped)
     PING = 3
     PONG = 4
     PLAYER_OBJECT = 5
@@ -23,6 +28,10 @@ class MessageType(Enum):
     TRICK_COMPLETED = 12
     GAME_COMPLETED = 13
     WAS_QUEEN = 14
+    STATE_DELTA = 15 # Replaces GAME_STATE when the Server streams deltas (see GameStateMirror)
+    CARD_PLAYED = 16 # Replaces WAS_QUEEN when the Server streams deltas
+    SUBSCRIBE = 17 # The Client wants to play the given number of games. The Server starts each of them as soon as the previous one ended
+    UNSUBSCRIBE = 18 # The Client cancels the rest of its subscription. The Server answers with UNSUBSCRIBE once it will not start another game for the Client
 
     def to_int(self):
         return self.value
@@ -37,9 +46,6 @@ class MessageStatus(Enum):
         return self.value
 
 class Message():
-    NEGOTIATION_MSG_SIZE = 4 # Allows the message size to be a maximum of 2,147,483,647 bytes (2.14 Gigabytes). If that's not enough, use a value of 8 (would allow for 9,223,372.03 Terabytes)
-    BYTE_ORDER = 'big'
-    
     def __init__(self, messageType: MessageType, data):
         self.messageType = messageType
         self.data = data
@@ -68,18 +74,116 @@ Message.PONG = Message(MessageType.PONG, "Pong x")
 Message.DISCONNECT = Message(MessageType.DISCONNECT, "Stop")
 Message.READY_TO_PLAY = Message(MessageType.READY_TO_PLAY, "Ready")
 Message.NOT_YET_READY = Message(MessageType.NOT_YET_READY, "Not yet ready")
+Message.UNSUBSCRIBE = Message(MessageType.UNSUBSCRIBE, "Unsubscribe")
+
+# Turns Messages into compact bytes and back. Every message starts with a fixed header (message type and payload length), followed by a payload
+# of struct-packed ints or, for game states, the raw little-endian float32 flat vector. Nothing received from the network is ever unpickled:
+# players and teams are sent as plain indices and counts and rebuilt on the receiving end (see Client.Connect())
+class WireProtocol():
+    HEADER = struct.Struct('<BI') # Message type (1 byte) and payload length (4 bytes)
+    MAX_PAYLOAD_SIZE = 1 << 16 # No valid message comes anywhere close to this, so anything larger is treated as garbage
+    INDEX = struct.Struct('<B') # A single small int (player index, number of players, cardType or feedback)
+    STATE_INDEX = struct.Struct('<I')
+    WAS_QUEEN = struct.Struct('<?B') # wasQueen, queenCounter
+    TRICK_COMPLETED = struct.Struct('<??H') # isTrickWinner, isTeamMateTrickWinner, trickValue
+    GAME_COMPLETED = struct.Struct('<?H') # isGameWinner, score
+    STATE_DELTA = struct.Struct('<IB?') # stateIndex, currentPlayerIndex, isFinalState
+    CARD_PLAYED = struct.Struct('<BBB') # playerIndex, cardType, queenCounter
+    SUBSCRIBE = struct.Struct('<I') # numOfGames
+    FLAT_DTYPE = np.dtype('<f4')
+    SIZE_FLAT = GameState.SIZE_STATE * FLAT_DTYPE.itemsize
+    NO_DATA = (MessageType.DISCONNECT, MessageType.READY_TO_PLAY, MessageType.NOT_YET_READY, MessageType.UNSUBSCRIBE, MessageType.TEAMS) # The teams are rebuilt by the client
+
+    @staticmethod
+    def Encode(message: Message) -> bytes:
+        payload = WireProtocol.encodePayload(message.messageType, message.GetData())
+        return WireProtocol.HEADER.pack(message.messageType.value, len(payload)) + payload
+
+    @staticmethod
+    def DecodeHeader(header: bytes) -> tuple:
+        messageTypeValue, payloadSize = WireProtocol.HEADER.unpack(header)
+        if payloadSize > WireProtocol.MAX_PAYLOAD_SIZE:
+            raise ValueError("Payload of %d bytes exceeds the maximum of %d bytes" % (payloadSize, WireProtocol.MAX_PAYLOAD_SIZE))
+        return MessageType(messageTypeValue), payloadSize
+
+    @staticmethod
+    def encodePayload(messageType: MessageType, data) -> bytes:
+        if messageType in WireProtocol.NO_DATA:
+            return b''
+        elif messageType == MessageType.PING or messageType == MessageType.PONG:
+            return str(data).encode('utf-8')
+        elif messageType == MessageType.PLAYER_OBJECT:
+            return WireProtocol.INDEX.pack(data.index) # Only the player's index
+        elif messageType == MessageType.PLAYERLIST:
+            return WireProtocol.INDEX.pack(len(data)) # Only the number of players
+        elif messageType == MessageType.PLAYER_HAND:
+            return bytes(card.cardType for card in data) # One byte per card
+        elif messageType == MessageType.GAME_STATE:
+            return WireProtocol.STATE_INDEX.pack(data.index) + np.asarray(data.Flat(), dtype=WireProtocol.FLAT_DTYPE).tobytes()
+        elif messageType == MessageType.CHOSEN_CARD:
+            return WireProtocol.INDEX.pack(data)
+        elif messageType == MessageType.CARDFEEDBACK:
+            return WireProtocol.INDEX.pack(data.value)
+        elif messageType == MessageType.TRICK_COMPLETED:
+            return WireProtocol.TRICK_COMPLETED.pack(*data)
+        elif messageType == MessageType.GAME_COMPLETED:
+            return WireProtocol.GAME_COMPLETED.pack(*data)
+        elif messageType == MessageType.WAS_QUEEN:
+            return WireProtocol.WAS_QUEEN.pack(*data)
+        elif messageType == MessageType.STATE_DELTA:
+            return WireProtocol.STATE_DELTA.pack(*data)
+        elif messageType == MessageType.CARD_PLAYED:
+            return WireProtocol.CARD_PLAYED.pack(*data)
+        elif messageType == MessageType.SUBSCRIBE:
+            return WireProtocol.SUBSCRIBE.pack(data)
+        raise ValueError("Cannot encode message type %s" % messageType)
+
+    @staticmethod
+    def DecodePayload(messageType: MessageType, payload: bytes):
+        if messageType in WireProtocol.NO_DATA:
+            return None
+        elif messageType == MessageType.PING or messageType == MessageType.PONG:
+            return bytes(payload).decode('utf-8')
+        elif messageType == MessageType.PLAYER_OBJECT or messageType == MessageType.PLAYERLIST or messageType == MessageType.CHOSEN_CARD:
+            return WireProtocol.INDEX.unpack(payload)[0] # Player index, number of players or cardType
+        elif messageType == MessageType.PLAYER_HAND:
+            if any(cardType >= Card.NUM_CARDTYPES for cardType in payload):
+                raise ValueError("Received an invalid cardType in a player hand")
+            return [Card.CARDTYPES[cardType].clone() for cardType in payload]
+        elif messageType == MessageType.GAME_STATE:
+            if len(payload) != WireProtocol.STATE_INDEX.size + WireProtocol.SIZE_FLAT:
+                raise ValueError("Received a game state of %d bytes, expected %d" % (len(payload), WireProtocol.STATE_INDEX.size + WireProtocol.SIZE_FLAT))
+            index = WireProtocol.STATE_INDEX.unpack_from(payload)[0]
+            flat = np.frombuffer(payload, dtype=WireProtocol.FLAT_DTYPE, offset=WireProtocol.STATE_INDEX.size).astype(np.float32) # astype() copies into a writable, native array
+            return GameState.FromFlat(flat, index)
+        elif messageType == MessageType.CARDFEEDBACK:
+            return CardFeedback(WireProtocol.INDEX.unpack(payload)[0])
+        elif messageType == MessageType.TRICK_COMPLETED:
+            return WireProtocol.TRICK_COMPLETED.unpack(payload)
+        elif messageType == MessageType.GAME_COMPLETED:
+            return WireProtocol.GAME_COMPLETED.unpack(payload)
+        elif messageType == MessageType.WAS_QUEEN:
+            return WireProtocol.WAS_QUEEN.unpack(payload)
+        elif messageType == MessageType.STATE_DELTA:
+            return WireProtocol.STATE_DELTA.unpack(payload)
+        elif messageType == MessageType.CARD_PLAYED:
+            playerIndex, cardType, queenCounter = WireProtocol.CARD_PLAYED.unpack(payload)
+            if cardType >= Card.NUM_CARDTYPES:
+                raise ValueError("Received an invalid cardType %d" % cardType)
+            return playerIndex, cardType, queenCounter
+        elif messageType == MessageType.SUBSCRIBE:
+            return WireProtocol.SUBSCRIBE.unpack(payload)[0]
+        raise ValueError("Cannot decode message type %s" % messageType)
 
 # Provides simple wrappers for sending and receiving messages, without need of instantiation
 class SimpleMessaging():
+    MAX_BUFFERS_PER_SEND = 512 # Stay well below the operating system's limit for a single sendmsg() (IOV_MAX, usually 1024)
+
     @staticmethod
     def SendMessage(socket, message: Message):
         try:
             #socket.settimeout(timeout)            
-            message_bytes = pickle.dumps(message) # Picke the message to turn it into a bytes-object
-            #msg = struct.pack('>I', len(message)) + message # Each message is prefixed with its own length
-            msg = bytearray()
-            msg.extend(len(message_bytes).to_bytes(Message.NEGOTIATION_MSG_SIZE, Message.BYTE_ORDER)) # Add the length of the pickled message to 'msg'
-            msg.extend(message_bytes) # Add the actual pickled message to 'msg'
+            msg = WireProtocol.Encode(message) # Header (type and payload length) followed by the payload
             socket.sendall(msg) # sendall() blocks until all bytes are sent or an error is thrown
             message.Set_Status(MessageStatus.SENT)
             return None
@@ -88,38 +192,55 @@ class SimpleMessaging():
             Console.WriteError("Encountered Error while sending: %s\nError Message: %s" % (message, error), "SimpleMessaging.SendMessage()")
             return error
 
-    # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
-    # # https://stackoverflow.com/questions/17667903/python-socket-receive-large-amount-of-data # #
-    # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
-    @staticmethod
-    def recvall(socket, n_bytes):
-        data = bytearray()
-        while len(data) < n_bytes:
-            packet = socket.recv(n_bytes - len(data))
-            if not packet:
-                return None
-            data.extend(packet)
-        return data
-    
     @staticmethod
-    def ReceiveMessage(socket) -> Message:
+    def SendBuffers(socket, buffers: list):
+        # Sends several already encoded messages with as few syscalls as possible. Empties 'buffers'. Like SendMessage(), returns the error if sending failed
         try:
-            #socket.settimeout(timeout)            
-            raw_length = SimpleMessaging.recvall(socket, Message.NEGOTIATION_MSG_SIZE)
-            if not raw_length:
+            if not hasattr(socket, "sendmsg"): # Not available on every platform (e.g. Windows)
+                socket.sendall(b''.join(buffers))
                 return None
-            #message_length = struct.unpack('>I', raw_length)[0]
-            message_length = int.from_bytes(raw_length, Message.BYTE_ORDER)
-            message = SimpleMessaging.recvall(socket, message_length)
-            message = pickle.loads(message) # Unpickle the bytes-object to get the original message object
-            return message
-        except Exception as error:
-            Console.WriteError("Encountered Error while receiving\nError Message: %s" % error, "SimpleMessaging.ReceiveMessage()")
+            first = 0 # The first buffer that has not been sent completely. Sent buffers are skipped instead of removed, which would take quadratic time
+            while first < len(buffers):
+                sent = socket.sendmsg(buffers[first:first + SimpleMessaging.MAX_BUFFERS_PER_SEND]) # Gathers all buffers into one write (like writev()), but may send only part of them
+                while first < len(buffers) and sent >= len(buffers[first]):
+                    sent -= len(buffers[first])
+                    first += 1
+                if sent > 0:
+                    buffers[first] = buffers[first][sent:]
             return None
+        except Exception as error:
+            Console.WriteError("Encountered Error while sending %d buffered messages\nError Message: %s" % (len(buffers), error), "SimpleMessaging.SendBuffers()")
+            return error
+        finally:
+            buffers.clear()
+
+    @staticmethod
+    def SetNoDelay(socket):
+        socket.setsockopt(sockets.IPPROTO_TCP, sockets.TCP_NODELAY, 1) # Small messages are sent right away instead of being held back by Nagle's algorithm
+
+    @staticmethod
+    def ReceiveMessage(socket) -> Message:
+        return SimpleMessaging.receiverFor(socket).ReceiveMessage()
+
+    @staticmethod
+    def receiverFor(socket):
+        # Connections that receive many messages keep their own MessageReceiver (and thus their buffer). Anything else gets a temporary one
+        return socket if isinstance(socket, MessageReceiver) else MessageReceiver(socket)
+
+    @staticmethod
+    def ReceiveMessageOfTypes(socket, expectedTypes) -> Message:
+        message = SimpleMessaging.receiverFor(socket).ReceiveMessage()
+        if message is None:
+            Console.WriteError("Expected a message of one of the types %s, but got None" % (expectedTypes,), "SimpleMessaging.ReceiveMessageOfTypes()")
+            raise ValueError("Expected a message of one of the types %s, but got None" % (expectedTypes,))
+        if message.messageType not in expectedTypes:
+            Console.WriteError("Expected a message of one of the types %s, but got %s instead" % (expectedTypes, message.messageType), "SimpleMessaging.ReceiveMessageOfTypes()")
+            raise ValueError("Expected a message of one of the types %s, but got %s instead" % (expectedTypes, message.messageType))
+        return message
 
     @staticmethod
     def ReceiveMessageData(socket, expectedType):
-        message = SimpleMessaging.ReceiveMessage(socket)
+        message = SimpleMessaging.receiverFor(socket).ReceiveMessage()
         if message is not None:
             if message.messageType == expectedType:
                 return message.GetData()
@@ -128,4 +249,52 @@ class SimpleMessaging():
                 raise ValueError("Expected a message of type %s, but got %s instead" % (expectedType, message.messageType))
         else:
             Console.WriteError("Expected a message of type %s, but got None" % (expectedType), "SimpleMessaging.ReceiveMessageData()")
-            raise ValueError("Expected a message of type %s, but got None"  % (expectedType))
\ No newline at end of file
+            raise ValueError("Expected a message of type %s, but got None"  % (expectedType))
+
+# Receives the messages of one connection into a buffer that is allocated once and reused for every message (recv_into() instead of recv() and
+# concatenation). Game states are the only large messages, so their flat vector is received straight into the array that the GameState keeps
+class MessageReceiver():
+    INITIAL_BUFFER_SIZE = 256 # Grows on demand, up to WireProtocol.MAX_PAYLOAD_SIZE
+
+    def __init__(self, socket):
+        self.socket = socket
+        self.buffer = bytearray(MessageReceiver.INITIAL_BUFFER_SIZE)
+        self.view = memoryview(self.buffer)
+
+    def receiveInto(self, view: memoryview) -> bool:
+        received = 0
+        while received < len(view):
+            numOfBytes = self.socket.recv_into(view[received:])
+            if numOfBytes == 0: # The connection was closed
+                return False
+            received += numOfBytes
+        return True
+
+    def ReceiveMessage(self) -> Message:
+        try:
+            header = self.view[:WireProtocol.HEADER.size]
+            if not self.receiveInto(header):
+                return None
+            messageType, payloadSize = WireProtocol.DecodeHeader(header)
+            if messageType == MessageType.GAME_STATE and payloadSize == WireProtocol.STATE_INDEX.size + WireProtocol.SIZE_FLAT:
+                return self.receiveState()
+            if payloadSize > len(self.buffer):
+                self.buffer = bytearray(payloadSize)
+                self.view = memoryview(self.buffer)
+            payload = self.view[:payloadSize]
+            if not self.receiveInto(payload):
+                return None
+            return Message(messageType, WireProtocol.DecodePayload(messageType, payload)) # The payload is only a view into the buffer, so it is decoded right away
+        except Exception as error:
+            Console.WriteError("Encountered Error while receiving\nError Message: %s" % error, "MessageReceiver.ReceiveMessage()")
+            return None
+
+    def receiveState(self) -> Message:
+        stateIndex = self.view[:WireProtocol.STATE_INDEX.size]
+        if not self.receiveInto(stateIndex):
+            return None
+        flat = np.empty(shape=(GameState.SIZE_STATE), dtype=WireProtocol.FLAT_DTYPE) # The state keeps this array, so it has to be a new one anyway
+        if not self.receiveInto(memoryview(flat).cast('B')):
+            return None
+        index = WireProtocol.STATE_INDEX.unpack(stateIndex)[0]
+        return Message(MessageType.GAME_STATE, GameState.FromFlat(flat.astype(np.float32, copy=False), index)) # No copy on little-endian machines
\ No newline at end of file